@@ -20,6 +20,9 @@ setup(
             'ipdb',
             'pylint',
             'pytest'
+        ],
+        'orjson': [
+            'orjson'
         ]
     },
     entry_points="""
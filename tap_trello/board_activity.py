@@ -0,0 +1,73 @@
+from datetime import timedelta
+from typing import Dict, Iterable, Optional
+
+import singer
+from singer import utils
+
+LOGGER = singer.get_logger()
+
+BOARDS = "boards"
+# Days after which the full table children of every board are synced again, changed or not
+DEFAULT_REFRESH_DAYS = 7
+
+
+class BoardActivity:
+    """
+    Change detection of the boards from their `dateLastActivity`, recorded in
+    the `boards` bookmark by each successful sync of the full table children
+    listed in `streams`. A board whose activity is the one recorded has not
+    changed since, so these children may skip it, unless a full refresh is due.
+    ~~~
+    The activity seen during a sync is only committed to the state once the sync
+    is complete, so an interrupted sync checks the same boards again.
+    """
+
+    def __init__(self, state: Dict, stream_names: Iterable[str], refresh_days: int = DEFAULT_REFRESH_DAYS,
+                 now=None) -> None:
+        self.state = state
+        self.stream_names = sorted(stream_names)
+        self.now = now or utils.now()
+
+        bookmark = singer.get_bookmark(state, BOARDS, "board_activity") or {}
+        last_full_refresh = singer.get_bookmark(state, BOARDS, "last_full_refresh")
+        self.full_refresh = (
+            last_full_refresh is None
+            or utils.strptime_to_utc(last_full_refresh) <= self.now - timedelta(days=refresh_days))
+        # Only the streams which were synced along with the recorded activity may rely on it
+        self.tracked_streams = set(singer.get_bookmark(state, BOARDS, "board_activity_streams") or [])
+        self.recorded = {} if self.full_refresh else bookmark
+        self.seen = {}
+        self.skipped_boards = 0
+
+    def is_unchanged(self, board: Dict, stream_name: str) -> bool:
+        """
+        Whether `stream_name` was synced for the board since its last activity
+        """
+        activity = board.get("dateLastActivity")
+        return (stream_name in self.tracked_streams and activity is not None
+                and self.recorded.get(board["id"]) == activity)
+
+    def record(self, board: Dict, synced: bool, skipped: bool = False) -> None:
+        """
+        Record the activity of a board, unless it was not synced for every stream
+        (e.g. when resuming an interrupted sync) so its changes are looked for again
+        """
+        self.seen[board["id"]] = board.get("dateLastActivity") if synced else self.recorded.get(board["id"])
+        self.skipped_boards += skipped
+
+    def commit(self) -> None:
+        """
+        Record the activity of every board seen, once all of them have been synced
+        """
+        singer.write_bookmark(self.state, BOARDS, "board_activity", self.seen)
+        singer.write_bookmark(self.state, BOARDS, "board_activity_streams", self.stream_names)
+        if self.full_refresh:
+            singer.write_bookmark(self.state, BOARDS, "last_full_refresh", utils.strftime(self.now))
+        LOGGER.info("%s - Skipped %s of %s boards unchanged since the previous sync",
+                    BOARDS, self.skipped_boards, len(self.seen))
+
+    @classmethod
+    def from_config(cls, config: Dict, state: Dict, stream_names: Iterable[str]) -> Optional["BoardActivity"]:
+        refresh_days = config.get("unchanged_boards_refresh_days")
+        refresh_days = DEFAULT_REFRESH_DAYS if refresh_days in (None, "") else int(refresh_days)
+        return cls(state, stream_names, refresh_days)
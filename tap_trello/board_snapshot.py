@@ -0,0 +1,66 @@
+from typing import Any, Dict, Iterable, List, Optional
+
+import singer
+
+from tap_trello.exceptions import TrelloError
+
+LOGGER = singer.get_logger()
+
+# Nested collections this large may have been cut short by Trello, so they are requested again
+SNAPSHOT_COLLECTION_LIMIT = 1000
+
+
+class BoardSnapshot(dict):
+    """
+    A board record along with the nested collections loaded for it by a single
+    `/boards/{id}` request. Child streams read their records from the snapshot
+    and only request their own endpoint when their collection is missing.
+    """
+
+    def __init__(self, board: Dict, collections: Optional[Dict[str, List]] = None) -> None:
+        super().__init__(board)
+        self.collections = collections or {}
+
+    def get_collection(self, key: Optional[str]) -> Optional[List]:
+        return self.collections.get(key) if key else None
+
+
+def get_snapshot_params(streams: Iterable[Any]) -> Dict[str, str]:
+    """
+    Merge the nested resource parameters of every stream able to read from a board snapshot.
+    """
+    params = {}
+    for stream in streams:
+        get_params = getattr(stream, "get_snapshot_params", None)
+        if callable(get_params):
+            params.update(get_params())
+    return params
+
+
+def get_board_snapshot(client, board: Dict, params: Dict[str, str], max_cards: int) -> BoardSnapshot:
+    """
+    Request the board with all nested collections in `params`. Collections which
+    may be truncated, or all of them if the request fails, are left out of the
+    snapshot so the streams fall back to their own endpoints.
+    """
+    if not params:
+        return BoardSnapshot(board)
+
+    try:
+        response = client.get('/boards/{}'.format(board['id']), params={"fields": "id", **params})
+    except TrelloError as err:
+        LOGGER.warning("Could not load snapshot of board %s, falling back to per-endpoint requests: %s",
+                       board['id'], err)
+        return BoardSnapshot(board)
+
+    collections = {}
+    for key, records in (response.items() if isinstance(response, dict) else []):
+        if not isinstance(records, list):
+            continue
+        limit = max_cards if key == "cards" else SNAPSHOT_COLLECTION_LIMIT
+        if len(records) >= limit:
+            LOGGER.info("Board %s has %s %s, requesting them separately.", board['id'], len(records), key)
+            continue
+        collections[key] = records
+
+    return BoardSnapshot(board, collections)
@@ -0,0 +1,117 @@
+import json
+import os
+import threading
+import uuid
+from typing import Dict, Iterable
+
+import singer
+
+LOGGER = singer.get_logger()
+
+CARDS = "cards"
+
+
+class CardWatermarks:
+    """
+    The `dateLastActivity` of each card whose children (`stream_names`) were
+    synced, kept in a JSON file per board in `directory` rather than in the
+    state, which would grow with every card. A child may skip a card whose
+    activity is the one recorded for it.
+    ~~~
+    The cards of a board are recorded as they are requested, and the board's
+    file is only replaced once all of them and their children have been written.
+    ~~~
+    Each sync writes its files with a new generation, recorded in the state once
+    all boards have been synced. Only the files of the generation of the state
+    the sync resumes from (or of its own) are read, as the files written by a sync
+    whose state the target did not acknowledge may claim undelivered children.
+    """
+
+    def __init__(self, directory: str, stream_names: Iterable[str], state: Dict) -> None:
+        self.directory = directory
+        self.stream_names = sorted(stream_names)
+        self.state = state
+        self.previous_generation = singer.get_bookmark(state, CARDS, "card_watermarks_generation")
+        self.generation = uuid.uuid4().hex
+        # Recorded activity of the cards of the boards being synced, with the streams it was recorded for
+        self.previous = {}
+        self.current = {}
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def get_path(self, board_id: str) -> str:
+        return os.path.join(self.directory, "{}.json".format(board_id))
+
+    def start_board(self, board_id: str) -> None:
+        try:
+            with open(self.get_path(board_id)) as watermarks_file:
+                watermarks = json.load(watermarks_file)
+        except FileNotFoundError:
+            watermarks = {}
+        except ValueError:
+            LOGGER.warning("Ignoring unreadable card watermarks of board %s", board_id)
+            watermarks = {}
+        if watermarks and watermarks.get("generation") not in (self.previous_generation, self.generation):
+            LOGGER.info("Ignoring card watermarks of board %s, written by a sync not in the state", board_id)
+            watermarks = {}
+
+        streams = frozenset(watermarks.get("streams") or [])
+        with self._lock:
+            for card_id, activity in (watermarks.get("cards") or {}).items():
+                self.previous[card_id] = (activity, streams)
+            self.current[board_id] = {}
+
+    def record(self, board_id: str, card: Dict) -> None:
+        with self._lock:
+            self.current[board_id][card["id"]] = card.get("dateLastActivity")
+
+    def is_unchanged(self, card: Dict, stream_name: str) -> bool:
+        """
+        Whether `stream_name` was synced for the card since its last activity
+        """
+        activity = card.get("dateLastActivity")
+        with self._lock:
+            previous_activity, streams = self.previous.get(card.get("id"), (None, ()))
+        return activity is not None and activity == previous_activity and stream_name in streams
+
+    def commit(self, board_id: str) -> None:
+        """
+        Replace the board's file with the activity of the cards written
+        """
+        with self._lock:
+            cards = self.current.pop(board_id, None)
+            if cards is None:
+                return
+            for card_id in cards:
+                self.previous.pop(card_id, None)
+
+        self.write(board_id, {"streams": self.stream_names, "cards": cards})
+
+    def write(self, board_id: str, watermarks: Dict) -> None:
+        path = self.get_path(board_id)
+        with open(path + ".tmp", "w") as watermarks_file:
+            json.dump({**watermarks, "generation": self.generation}, watermarks_file, separators=(",", ":"))
+        os.replace(path + ".tmp", path)
+
+    def finish(self) -> None:
+        """
+        Record the generation of this sync in the state, once all boards have been synced.
+        The files of the boards not synced are carried over to it, or removed when they
+        were not of the previous generation.
+        """
+        for file_name in sorted(os.listdir(self.directory)):
+            board_id, extension = os.path.splitext(file_name)
+            if extension != ".json":
+                continue
+            try:
+                with open(self.get_path(board_id)) as watermarks_file:
+                    watermarks = json.load(watermarks_file)
+            except ValueError:
+                watermarks = {}
+            if watermarks.get("generation") == self.generation:
+                continue
+            if self.previous_generation is not None and watermarks.get("generation") == self.previous_generation:
+                self.write(board_id, watermarks)
+            else:
+                os.remove(self.get_path(board_id))
+        singer.write_bookmark(self.state, CARDS, "card_watermarks_generation", self.generation)
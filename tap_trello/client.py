@@ -1,4 +1,5 @@
-from typing import Any, Dict, Mapping, Optional
+import threading
+from typing import Any, Callable, Collection, Dict, Iterator, List, Mapping, Optional, Tuple
 
 import backoff
 import requests
@@ -7,12 +8,73 @@ from requests import session
 from requests.exceptions import ChunkedEncodingError, ConnectionError, Timeout # pylint: disable=redefined-builtin
 
 from singer import get_logger, metrics
+from tap_trello.embedded_members import EmbeddedMembers
 from tap_trello.exceptions import (ERROR_CODE_EXCEPTION_MAPPING,
                                    TrelloError,
                                    TrelloBackoffError, TrelloRateLimitError)
+from tap_trello.json_stream import decode_json_stream, iter_text
+from tap_trello.rate_limiter import AdaptiveThrottle, RateLimiter
+from tap_trello.response_cache import MISSING, ResponseCache, get_cache_key
+from tap_trello.utils import get_config_flag
 
 LOGGER = get_logger()
 REQUEST_TIMEOUT = 300
+# Most paths a single `/batch` request may GET
+BATCH_SIZE = 10
+# Bytes read at a time from streamed responses
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def get_json_decoder(config: Mapping[str, Any]) -> Callable[[requests.Response], Any]:
+    """
+    Response body decoder selected by the `json_decoder` setting: `json` (the
+    standard library, default) or `orjson`, which is faster on large pages but optional.
+    """
+    name = (config.get("json_decoder") or "json").strip().lower()
+    if name == "orjson":
+        try:
+            import orjson # pylint: disable=import-outside-toplevel
+        except ImportError:
+            LOGGER.warning("json_decoder is orjson but orjson is not installed, using json instead")
+        else:
+            return lambda response: orjson.loads(response.content)
+    elif name != "json":
+        raise ValueError(f"Unsupported json_decoder: {name}")
+    return lambda response: response.json()
+
+
+def decode_response_stream(response: requests.Response) -> Any:
+    """
+    Decode a streamed response, a JSON array as an iterator over its items which
+    releases the connection once exhausted.
+    """
+    chunks = iter_text(response.iter_content(STREAM_CHUNK_SIZE), response.encoding or "utf-8")
+    body = decode_json_stream(chunks)
+    if not isinstance(body, Iterator):
+        response.close()
+        return body
+    return _close_when_exhausted(body, response)
+
+
+def _close_when_exhausted(items: Iterator, response: requests.Response) -> Iterator:
+    try:
+        yield from items
+    finally:
+        response.close()
+
+
+def get_exception_class(status_code: int) -> type:
+    """
+    Exception raised for an HTTP error status, a backoff error for unmapped
+    5xx responses and a generic TrelloError otherwise.
+    """
+    exc = ERROR_CODE_EXCEPTION_MAPPING.get(status_code, {}).get("raise_exception")
+    if exc is None:
+        if 500 <= status_code < 600:
+            exc = TrelloBackoffError
+        else:
+            exc = TrelloError
+    return exc
 
 
 def raise_for_error(response: requests.Response) -> None:
@@ -22,11 +84,12 @@ def raise_for_error(response: requests.Response) -> None:
 
     :param resp: requests.Response object
     """
-    try:
-        response_json = response.json()
-    except Exception:
-        response_json = {}
     if response.status_code not in [200, 201, 204]:
+        # The body of an error is only parsed here, a successful one is parsed once by the client
+        try:
+            response_json = response.json()
+        except Exception:
+            response_json = {}
         mapping = ERROR_CODE_EXCEPTION_MAPPING.get(response.status_code, {})
         if response_json.get("error"):
             message = f"HTTP-error-code: {response.status_code}, Error: {response_json.get('error')}"
@@ -40,14 +103,7 @@ def raise_for_error(response: requests.Response) -> None:
             error_message = mapping.get("message", default_message)
             message = f"HTTP-error-code: {response.status_code}, Error: {response_json.get('message', error_message)}"
 
-        # Determine the exception class once, defaulting to a backoff error
-        # for unmapped 5xx responses and a generic TrelloError otherwise.
-        exc = mapping.get("raise_exception")
-        if exc is None:
-            if 500 <= response.status_code < 600:
-                exc = TrelloBackoffError
-            else:
-                exc = TrelloError
+        exc = get_exception_class(response.status_code)
         raise exc(message, response) from None
 
 
@@ -59,24 +115,57 @@ class Client:
      - Authentication
      - Response parsing
      - HTTP Error handling and retry
+     - Pacing of requests within the API key and token rate limits, adapted
+       to the rate limit headers of the responses
+     - Memoization of the GET requests declared cacheable, within the run
+
+    The client may be shared by worker threads: each thread gets its own session
+    while all of them draw from the same rate limiter and throttle.
     """
 
     def __init__(self, config: Mapping[str, Any]) -> None:
         self.config = config
-        self._session = session()
+        self._local = threading.local()
+        self._sessions = []
+        # Only guards the list of sessions, and is never held while a request is sent
+        self._sessions_lock = threading.Lock()
         self.base_url = "https://api.trello.com/1"
         config_request_timeout = config.get("request_timeout")
         self.request_timeout = float(config_request_timeout) if config_request_timeout else REQUEST_TIMEOUT
         self._member_id = None
+        self.decode_json = get_json_decoder(config)
+        self.stream_responses = get_config_flag(config, "stream_responses")
+        self.rate_limiter = RateLimiter.from_config(config)
+        # Sync requests the parents and the cards of a board on two pools of `max_workers` threads
+        self.throttle = AdaptiveThrottle(2 * max(int(config.get("max_workers") or 1), 1))
+        self.response_cache = ResponseCache.from_config(config)
+        # Members seen embedded in records, shared by the streams of the run
+        self.embedded_members = EmbeddedMembers.from_config(config)
 
     def __enter__(self):
         return self
 
     def __exit__(self, exception_type, exception_value, traceback):
-        self._session.close()
+        self.rate_limiter.write_metrics()
+        self.response_cache.write_metrics()
+        with self._sessions_lock:
+            for thread_session in self._sessions:
+                thread_session.close()
+            self._sessions = []
+
+    @property
+    def _session(self):
+        """The requests session of the calling thread."""
+        thread_session = getattr(self._local, "session", None)
+        if thread_session is None:
+            thread_session = session()
+            self._local.session = thread_session
+            with self._sessions_lock:
+                self._sessions.append(thread_session)
+        return thread_session
 
     def _get_member_id(self):
-        resp = self.get('/members/me')
+        resp = self.get('/members/me', cacheable=True)
         if isinstance(resp, dict):
             return resp.get('id')
         return None
@@ -88,24 +177,60 @@ class Client:
         params: Optional[Dict[str, Any]] = None,
         headers: Optional[Dict[str, Any]] = None,
         body: Optional[Dict[str, Any]] = None,
-        path: Optional[str] = None
+        path: Optional[str] = None,
+        cacheable: bool = False
     ) -> Any:
         """
-        Sends an HTTP request to the specified API endpoint.
+        Sends an HTTP request to the specified API endpoint. The response of a
+        `cacheable` GET request is memoized, and served again to identical requests.
         """
+        endpoint, kwargs = self._get_request_args(endpoint, params, headers, body, path)
+        if not cacheable or method.upper() != "GET" or not self.response_cache.enabled:
+            return self.__make_request(method, endpoint, **kwargs)
+        return self._get_cached(get_cache_key(self.base_url, endpoint, kwargs["params"]),
+                                lambda: self.__make_request(method, endpoint, **kwargs))
+
+    def _get_cached(self, key, request: Callable[[], Any]) -> Any:
+        response = self.response_cache.get(key)
+        if response is MISSING:
+            response = request()
+            self.response_cache.put(key, response)
+        return response
+
+    def iter_request(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, Any]] = None,
+        body: Optional[Dict[str, Any]] = None,
+        path: Optional[str] = None,
+        cacheable: bool = False
+    ) -> Any:
+        """
+        Like `make_request`, except that with `stream_responses` enabled a JSON array
+        response is returned as an iterator decoding its items while the body downloads.
+        Cacheable responses are decoded whole.
+        """
+        if not self.stream_responses or cacheable:
+            return self.make_request(method, endpoint, params, headers, body, path, cacheable)
+        endpoint, kwargs = self._get_request_args(endpoint, params, headers, body, path)
+        return decode_response_stream(self.__send_request(method, endpoint, stream=True, **kwargs))
+
+    def _get_request_args(self, endpoint, params, headers, body, path) -> Tuple[str, Dict[str, Any]]:
         params = params or {}
         headers = headers or {}
         body = body or {}
         endpoint = endpoint or f"{self.base_url}/{path}"
         params["key"] = self.config["api_key"]
         params["token"] = self.config["api_token"]
-        return self.__make_request(
-            method, endpoint,
-            headers=headers,
-            params=params,
-            data=body,
-            timeout=self.request_timeout
-        )
+        return endpoint, dict(headers=headers, params=params, data=body, timeout=self.request_timeout)
+
+    def __make_request(
+        self, method: str, endpoint: str, **kwargs
+    ) -> Optional[Mapping[Any, Any]]:
+        """Performs HTTP Operations and decodes the response."""
+        return self.decode_json(self.__send_request(method, endpoint, **kwargs))
 
     @backoff.on_exception(
         wait_gen=backoff.expo,
@@ -120,28 +245,106 @@ class Client:
         max_tries=5,
         factor=2,
     )
-    def __make_request(
-        self, method: str, endpoint: str, **kwargs
-    ) -> Optional[Mapping[Any, Any]]:
+    def __send_request(self, method: str, endpoint: str, **kwargs) -> requests.Response:
         """Performs HTTP Operations."""
         method = method.upper()
+        if method not in ("GET", "POST"):
+            raise ValueError(f"Unsupported method: {method}")
+        if method == "GET":
+            kwargs.pop("data", None)
+
+        # Resolved first, so that no request slot is held while a new session is registered
+        thread_session = self._session
+        self.throttle.acquire()
+        self.rate_limiter.acquire()
         with metrics.http_request_timer(endpoint):
-            if method in ("GET", "POST"):
-                if method == "GET":
-                    kwargs.pop("data", None)
-                response = self._session.request(method, endpoint, **kwargs)
-                raise_for_error(response)
-            else:
-                raise ValueError(f"Unsupported method: {method}")
+            response = None
+            try:
+                response = thread_session.request(method, endpoint, **kwargs)
+            finally:
+                self.throttle.release(response)
+            raise_for_error(response)
 
-        return response.json()
+        return response
 
-    def get(self, path, headers=None, params=None):
+    def get(self, path, headers=None, params=None, cacheable=False):
         """Helper method for GET requests (used by legacy streams)."""
-        return self.make_request('GET', None, params=params or {}, headers=headers or {}, path=path)
+        return self.make_request('GET', None, params=params or {}, headers=headers or {}, path=path,
+                                 cacheable=cacheable)
+
+    def iter_get(self, path, headers=None, params=None, cacheable=False):
+        """Helper method for GET requests of lists of records, see `iter_request`."""
+        return self.iter_request('GET', None, params=params or {}, headers=headers or {}, path=path,
+                                 cacheable=cacheable)
+
+    def get_batch(self, paths: List[str], cacheable_paths: Collection[str] = ()) -> List[Any]:
+        """
+        GET several paths (relative to the API version, e.g. `/members/{id}`, any comma percent-encoded)
+        with `/batch` requests of up to `BATCH_SIZE` paths.
+        ~~~
+        Returns, in order, the response of each path or the TrelloError it failed with.
+        Paths failing with a retryable error are requested again on their own.
+        The memoized responses of `cacheable_paths` are not requested again.
+        """
+        if not cacheable_paths or not self.response_cache.enabled:
+            return self._get_batch(paths)
+
+        keys = [get_cache_key(self.base_url, path, None) if path in cacheable_paths else None for path in paths]
+        responses = [MISSING if key is None else self.response_cache.get(key) for key in keys]
+        missing = [index for index, response in enumerate(responses) if response is MISSING]
+        for index, response in zip(missing, self._get_batch([paths[index] for index in missing])):
+            responses[index] = response
+            if keys[index] is not None and not isinstance(response, Exception):
+                self.response_cache.put(keys[index], response)
+        return responses
+
+    def _get_batch(self, paths: List[str]) -> List[Any]:
+        responses = []
+        for start in range(0, len(paths), BATCH_SIZE):
+            chunk = paths[start:start + BATCH_SIZE]
+            if len(chunk) == 1:
+                responses.append(self._get_single(chunk[0]))
+                continue
+
+            items = self.get('/batch', params={'urls': ','.join(chunk)})
+            if not isinstance(items, list) or len(items) != len(chunk):
+                raise TrelloError(f"Unexpected /batch response for {len(chunk)} paths")
+            for path, item in zip(chunk, items):
+                responses.append(self._get_batch_item_response(path, item))
+        return responses
+
+    def _get_single(self, path: str) -> Any:
+        try:
+            return self.get(path)
+        except TrelloError as err:
+            return err
+
+    def _get_batch_item_response(self, path: str, item: Any) -> Any:
+        """
+        Response of one path of a `/batch` request, which is either `{"200": body}`
+        or an error object with a `statusCode`
+        """
+        if isinstance(item, dict) and "200" in item:
+            return item["200"]
+
+        item = item if isinstance(item, dict) else {}
+        try:
+            status_code = int(item.get("statusCode"))
+        except (TypeError, ValueError):
+            status_code = 500
+        exc = get_exception_class(status_code)
+        if issubclass(exc, TrelloBackoffError):
+            LOGGER.info("Retrying %s on its own after HTTP-error-code %s in a /batch request", path, status_code)
+            return self._get_single(path)
+
+        error = item.get("message") or item.get("name") or \
+            ERROR_CODE_EXCEPTION_MAPPING.get(status_code, {}).get("message", "Unknown Error")
+        return exc(f"HTTP-error-code: {status_code}, Error: {error}")
 
     @property
     def member_id(self) -> Any:
+        # Requested without holding a lock, as the request waits for a throttle slot which another
+        # thread may hold. Threads asking at once may each request it, served from the cache when enabled.
         if self._member_id:
             return self._member_id
 
@@ -0,0 +1,46 @@
+import threading
+from typing import Any, Dict, Mapping, Optional
+
+from tap_trello.utils import get_config_flag
+
+# Member objects embedded in action records
+ACTION_MEMBER_KEYS = ("memberCreator", "member")
+
+
+class EmbeddedMembers:
+    """
+    Thread safe store of the member objects embedded in the records of other
+    streams (the creator of an action, the members of an organization), from
+    which the members stream writes its records instead of requesting them.
+    Of the objects seen for a member, the one with the most fields is kept.
+    """
+
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self._members = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> "EmbeddedMembers":
+        return cls(get_config_flag(config, "members_from_embedded"))
+
+    def add(self, member: Any) -> None:
+        if not self.enabled or not isinstance(member, dict) or not member.get("id"):
+            return
+        with self._lock:
+            known = self._members.get(member["id"])
+            if known is None or len(member) > len(known):
+                self._members[member["id"]] = dict(member)
+
+    def add_from_action(self, action: Dict) -> None:
+        for key in ACTION_MEMBER_KEYS:
+            self.add(action.get(key))
+
+    def get(self, member_id: str) -> Optional[Dict]:
+        with self._lock:
+            member = self._members.get(member_id)
+        return None if member is None else dict(member)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._members)
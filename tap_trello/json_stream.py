@@ -0,0 +1,94 @@
+import codecs
+import json
+from typing import Any, Iterable, Iterator
+
+WHITESPACE = " \t\r\n"
+_DECODER = json.JSONDecoder()
+
+
+def iter_text(byte_chunks: Iterable[bytes], encoding: str = "utf-8") -> Iterator[str]:
+    """
+    Decode chunks of bytes into text, a character possibly spanning two chunks
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors="strict")
+    for chunk in byte_chunks:
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    text = decoder.decode(b"", final=True)
+    if text:
+        yield text
+
+
+def decode_json_stream(chunks: Iterable[str]) -> Any:
+    """
+    Decode JSON text arriving in chunks. An array is returned as an iterator
+    decoding its items as the chunks arrive, holding a single item in memory;
+    any other value is decoded whole.
+    """
+    chunks = iter(chunks)
+    buffer = ""
+    for chunk in chunks:
+        buffer += chunk
+        if buffer.lstrip(WHITESPACE):
+            break
+
+    buffer = buffer.lstrip(WHITESPACE)
+    if not buffer.startswith("["):
+        return json.loads(buffer + "".join(chunks))
+    return _iter_array_items(buffer[1:], chunks)
+
+
+def _iter_array_items(buffer: str, chunks: Iterator[str]) -> Iterator[Any]:
+    exhausted = False
+    expect_item = True
+    # An array may be empty, but its last item is not followed by a delimiter
+    after_delimiter = False
+
+    def read_more():
+        nonlocal buffer, exhausted
+        chunk = next(chunks, None)
+        if chunk is None:
+            exhausted = True
+        else:
+            buffer += chunk
+
+    while True:
+        buffer = buffer.lstrip(WHITESPACE)
+        if not buffer:
+            if exhausted:
+                raise json.JSONDecodeError("Unterminated array", buffer, 0)
+            read_more()
+            continue
+
+        if buffer[0] == "]":
+            if after_delimiter:
+                raise json.JSONDecodeError("Expecting value", buffer, 0)
+            if buffer[1:].strip(WHITESPACE) or any(chunk.strip(WHITESPACE) for chunk in chunks):
+                raise json.JSONDecodeError("Extra data after array", buffer, 1)
+            return
+        if not expect_item:
+            if buffer[0] != ",":
+                raise json.JSONDecodeError("Expecting ',' delimiter", buffer, 0)
+            buffer = buffer[1:]
+            expect_item = True
+            after_delimiter = True
+            continue
+
+        try:
+            item, end = _DECODER.raw_decode(buffer)
+        except json.JSONDecodeError:
+            # The item is incomplete until proven otherwise by the end of the body
+            if exhausted:
+                raise
+            read_more()
+            continue
+        if not exhausted and buffer[end:].lstrip(WHITESPACE)[:1] not in (",", "]"):
+            # Until its delimiter arrives, a number may continue in the next chunk (e.g. "4." and "5")
+            read_more()
+            continue
+
+        buffer = buffer[end:]
+        expect_item = False
+        after_delimiter = False
+        yield item
@@ -0,0 +1,226 @@
+import threading
+import time
+from typing import Any, Callable, List, Mapping, Optional
+
+from singer import get_logger, metrics
+
+LOGGER = get_logger()
+
+# Trello allows 300 requests per 10 seconds for each API key and 100 for each token
+DEFAULT_KEY_REQUESTS = 300
+DEFAULT_TOKEN_REQUESTS = 100
+DEFAULT_INTERVAL = 10
+# Share of a budget which may be spent in a burst, the rest is paced evenly over the interval
+BURST_RATIO = 0.1
+
+# Below this share of its quota left, the throttle backs off
+LOW_REMAINING_RATIO = 0.2
+# Bounds and additive step of the delay between the starts of two requests, in seconds
+MIN_SPACING = 0.1
+MAX_SPACING = 10.0
+SPACING_STEP = 0.1
+# Default pause when a 429 response carries no usable Retry-After header
+DEFAULT_RETRY_AFTER = 1.0
+
+
+def default_sleep(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+class TokenBucket:
+    """
+    Thread safe token bucket allowing at most `requests` requests in any
+    `interval` seconds: up to a tenth of them in a burst, the rest at a steady rate.
+    Tracks how long requests waited for a token.
+    """
+
+    def __init__(self, name: str, requests: int, interval: float,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = default_sleep) -> None:
+        self.name = name
+        self.capacity = max(requests * BURST_RATIO, 1.0)
+        self.rate = max(requests - self.capacity, 1.0) / interval
+        self.tokens = self.capacity
+        self.wait_seconds = 0.0
+        self.waited_requests = 0
+        self._clock = clock
+        self._sleep = sleep
+        self._updated_at = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def reserve(self) -> float:
+        """
+        Take a token, possibly not yet refilled, and return how long to wait before using it
+        """
+        with self._lock:
+            self._refill(self._clock())
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            wait = -self.tokens / self.rate
+            self.wait_seconds += wait
+            self.waited_requests += 1
+            return wait
+
+    def acquire(self) -> None:
+        wait = self.reserve()
+        if wait > 0:
+            self._sleep(wait)
+
+
+class RateLimiter:
+    """
+    Paces the requests of a client to stay within both the API key and the token budgets.
+    ~~~
+    Every bucket is reserved before sleeping once for the longest wait, so
+    concurrent threads queue up fairly instead of all retrying at once.
+    """
+
+    def __init__(self, buckets: List[TokenBucket], sleep: Callable[[float], None] = default_sleep) -> None:
+        self.buckets = buckets
+        self._sleep = sleep
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> "RateLimiter":
+        """
+        Build the limiter from the `rate_limit_*` settings; a budget of 0 disables its bucket
+        """
+        interval = float(config.get("rate_limit_interval") or DEFAULT_INTERVAL)
+        buckets = []
+        for name, key, default in (("api_key", "rate_limit_key_requests", DEFAULT_KEY_REQUESTS),
+                                   ("token", "rate_limit_token_requests", DEFAULT_TOKEN_REQUESTS)):
+            requests = config.get(key)
+            requests = default if requests in (None, "") else int(requests)
+            if requests > 0:
+                buckets.append(TokenBucket(name, requests, interval))
+        return cls(buckets)
+
+    def acquire(self) -> None:
+        wait = max((bucket.reserve() for bucket in self.buckets), default=0.0)
+        if wait > 0:
+            self._sleep(wait)
+
+    def write_metrics(self) -> None:
+        """
+        Emit the time spent waiting for each bucket
+        """
+        for bucket in self.buckets:
+            tags = {"bucket": bucket.name, "waited_requests": bucket.waited_requests}
+            metrics.log(LOGGER, metrics.Point("timer", "rate_limit_wait", round(bucket.wait_seconds, 3), tags))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Seconds to wait from a `Retry-After` header, None when absent or not a number of seconds
+    """
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def get_remaining_ratio(headers: Mapping[str, str]) -> Optional[float]:
+    """
+    Lowest share of the API key and token quotas left, from the `x-rate-limit-*` headers
+    """
+    ratios = []
+    for scope in ("api-token", "api-key"):
+        try:
+            remaining = int(headers[f"x-rate-limit-{scope}-remaining"])
+            maximum = int(headers[f"x-rate-limit-{scope}-max"])
+            ratios.append(remaining / maximum)
+        except (KeyError, TypeError, ValueError, ZeroDivisionError):
+            continue
+    return min(ratios) if ratios else None
+
+
+class AdaptiveThrottle:
+    """
+    Adjusts the number of requests in flight and the delay between request
+    starts from the rate limit headers of the responses (AIMD).
+    ~~~
+    Requests start at `max_concurrency`, without delay. Running low on quota, a 429 or a `Retry-After` halves the concurrency and
+    doubles the delay, a `Retry-After` also pausing every request for its
+    duration. After a round of `concurrency` successful responses, the delay
+    shrinks by a step and, once it is gone, the concurrency grows by one up to
+    `max_concurrency`. Every adjustment is logged as a `rate_limit_adjustment` metric.
+    """
+
+    def __init__(self, max_concurrency: int, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = default_sleep) -> None:
+        self.max_concurrency = max(max_concurrency, 1)
+        self.concurrency = self.max_concurrency
+        self.spacing = 0.0
+        self.in_flight = 0
+        self._successes = 0
+        self._clock = clock
+        self._sleep = sleep
+        self._next_start = clock()
+        self._condition = threading.Condition()
+
+    def acquire(self) -> None:
+        """
+        Wait for a free request slot and for the request's start time
+        """
+        with self._condition:
+            while self.in_flight >= self.concurrency:
+                self._condition.wait()
+            self.in_flight += 1
+            now = self._clock()
+            start = max(now, self._next_start)
+            self._next_start = start + self.spacing
+        if start > now:
+            self._sleep(start - now)
+
+    def release(self, response=None) -> None:
+        """
+        Free the request slot, adjusting to the response when there is one
+        """
+        with self._condition:
+            self.in_flight -= 1
+            if response is not None:
+                self._adjust(response)
+            self._condition.notify_all()
+
+    def _adjust(self, response) -> None:
+        headers = response.headers or {}
+        retry_after = parse_retry_after(headers.get("Retry-After"))
+        if response.status_code == 429 or retry_after is not None:
+            pause = DEFAULT_RETRY_AFTER if retry_after is None else retry_after
+            self._next_start = max(self._next_start, self._clock() + pause)
+            self._decrease("retry_after" if retry_after is not None else "rate_limited")
+            return
+        if not 200 <= response.status_code < 300:
+            return
+
+        remaining_ratio = get_remaining_ratio(headers)
+        if remaining_ratio is not None and remaining_ratio < LOW_REMAINING_RATIO:
+            self._decrease("low_remaining")
+            return
+        self._successes += 1
+        if self._successes >= self.concurrency:
+            self._successes = 0
+            self._increase()
+
+    def _decrease(self, reason: str) -> None:
+        self._successes = 0
+        self.concurrency = max(self.concurrency // 2, 1)
+        self.spacing = min(max(self.spacing * 2, MIN_SPACING), MAX_SPACING)
+        self._write_adjustment("decrease", reason)
+
+    def _increase(self) -> None:
+        if self.spacing > 0:
+            self.spacing = max(self.spacing - SPACING_STEP, 0.0)
+        elif self.concurrency < self.max_concurrency:
+            self.concurrency += 1
+        else:
+            return
+        self._write_adjustment("increase", "success")
+
+    def _write_adjustment(self, direction: str, reason: str) -> None:
+        tags = {"direction": direction, "reason": reason, "spacing": round(self.spacing, 3)}
+        metrics.log(LOGGER, metrics.Point("gauge", "rate_limit_adjustment", self.concurrency, tags))
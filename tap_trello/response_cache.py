@@ -0,0 +1,87 @@
+import copy
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Mapping, Optional, Tuple
+
+from singer import get_logger, metrics
+
+LOGGER = get_logger()
+
+# Responses kept at most, the least recently used being evicted first
+DEFAULT_CACHE_SIZE = 1000
+# Parameters identifying the caller rather than the resource
+AUTH_PARAMS = ("key", "token")
+
+MISSING = object()
+
+
+def get_cache_key(base_url: str, endpoint: str, params: Optional[Mapping[str, Any]]) -> Tuple:
+    """
+    Key of a GET request: its path relative to the API version, with duplicate
+    slashes removed, and its parameters in sorted order, except the credentials
+    """
+    path = endpoint[len(base_url):] if endpoint.startswith(base_url) else endpoint
+    path = "/" + "/".join(part for part in path.split("/") if part)
+    params = tuple(sorted((str(name), str(value)) for name, value in (params or {}).items()
+                          if name not in AUTH_PARAMS and value is not None))
+    return path, params
+
+
+class ResponseCache:
+    """
+    Thread safe LRU cache of decoded responses, holding up to `max_size` of them.
+    A response is copied in and out of the cache, so that callers modifying
+    their records do not alter the responses served to later ones.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_CACHE_SIZE) -> None:
+        self.max_size = max(max_size, 0)
+        self.hits = 0
+        self.misses = 0
+        self._responses = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> "ResponseCache":
+        size = config.get("response_cache_size")
+        return cls(DEFAULT_CACHE_SIZE if size in (None, "") else int(size))
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def get(self, key: Hashable) -> Any:
+        """
+        Return a copy of the cached response, or MISSING
+        """
+        with self._lock:
+            response = self._responses.get(key, MISSING)
+            if response is MISSING:
+                self.misses += 1
+                return MISSING
+            self._responses.move_to_end(key)
+            self.hits += 1
+        return copy.deepcopy(response)
+
+    def put(self, key: Hashable, response: Any) -> None:
+        response = copy.deepcopy(response)
+        with self._lock:
+            self._responses[key] = response
+            self._responses.move_to_end(key)
+            while len(self._responses) > self.max_size:
+                self._responses.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._responses)}
+
+    def write_metrics(self) -> None:
+        """
+        Emit the number of requests served from the cache and of those sent
+        """
+        if not self.enabled:
+            return
+        stats = self.get_stats()
+        LOGGER.info("Response cache: %s hits, %s misses", stats["hits"], stats["misses"])
+        for name in ("hits", "misses"):
+            metrics.log(LOGGER, metrics.Point("counter", "response_cache_" + name, stats[name], {}))
@@ -1,19 +1,96 @@
 from abc import ABC, abstractmethod
+import copy
 import json
+import math
 import operator
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from itertools import dropwhile
-from typing import Any, Dict, Tuple, List, Iterator, Optional
+from itertools import dropwhile, islice
+from typing import Any, Dict, Iterable, Tuple, List, Iterator, Optional, Set
+from urllib.parse import urlencode
 
 import singer
 from singer import (Transformer, get_bookmark, get_logger, metadata, metrics,
                     write_bookmark, write_record, write_schema, utils)
 
+from tap_trello.board_snapshot import BoardSnapshot
+from tap_trello.exceptions import TrelloNotFoundError
+from tap_trello.utils import WRITE_LOCK, get_config_flag
+
 LOGGER = get_logger()
 
 # NB: We've observed that Trello will only return 50 actions, this is to sub-paginate
 MAX_API_RESPONSE_SIZE = 50
 
+# Share of a page the windows planned from the density of a board's records are sized to fill
+WINDOW_FILL = 0.8
+MAX_PLANNED_WINDOWS = 1000
+
+# Parents of a stream may be requested from several threads, each counting its skipped requests
+SKIPPED_REQUESTS_LOCK = threading.Lock()
+
+
+def write_skipped_requests_metric(stream_id, skipped_requests):
+    """
+    Report how many requests a stream spared because their response was known to be empty.
+    """
+    if skipped_requests:
+        with metrics.Counter("skipped_request_count", {"endpoint": stream_id}) as counter:
+            counter.increment(skipped_requests)
+
+
+def get_created_from_id(object_id):
+    """
+    Trello ids embed their creation time in the first 8 hex characters.
+    """
+    # NB This is documented here. Yes it's hacky
+    # - https://help.trello.com/article/759-getting-the-time-a-card-or-board-was-created
+    return datetime.utcfromtimestamp(int(object_id[:8], 16))
+
+
+def get_id_at(timestamp):
+    """
+    Smallest id of the objects created at `timestamp` (in seconds since the
+    epoch), usable as a `since`/`before` cursor of Trello's paginated endpoints.
+    """
+    return "{:08x}{}".format(int(timestamp), "0" * 16)
+
+
+def get_selected_properties(schema: Dict, metadata_map: Dict) -> Set[str]:
+    """
+    Top-level properties the Transformer keeps in the records: all but those
+    deselected in the catalog or unsupported.
+    """
+    selected = set()
+    for name in (schema or {}).get("properties", {}):
+        breadcrumb = ("properties", name)
+        inclusion = metadata.get(metadata_map, breadcrumb, "inclusion")
+        if inclusion == "automatic" or (metadata.get(metadata_map, breadcrumb, "selected") is not False
+                                        and inclusion != "unsupported"):
+            selected.add(name)
+    return selected
+
+
+def get_nested_properties(schema: Dict, name: str) -> Set[str]:
+    """
+    Properties of the objects of a nested resource of the schema, an object or an array of objects.
+    """
+    nested = (schema or {}).get("properties", {}).get(name) or {}
+    return set((nested.get("items", nested) or {}).get("properties", {}))
+
+
+def project_fields(api_fields: Iterable[str], properties: Iterable[str], required: Iterable[str] = ()) -> str:
+    """
+    Value of a Trello `fields` parameter requesting only `properties` and `required`,
+    "all" when one of them is not a field Trello accepts.
+    """
+    requested = set(properties) | set(required)
+    if not requested.issubset(api_fields):
+        return "all"
+    return ",".join(sorted(requested))
+
 
 class OrderChecker:
     """ Class with context manager to check ordering of values. """
@@ -66,6 +143,94 @@ class Unsortable:
     """
 
 
+class FieldProjection:
+    """
+    Mixin class requesting only the properties selected in the catalog, through
+    the `fields` parameter of Trello, instead of the whole records
+    """
+    # Field names of the records accepted by the `fields` parameter
+    api_fields = ()
+    # Properties added to the records by the tap
+    non_api_fields = ()
+    # Nested resources returned by default, with the value of their parameter leaving them out
+    nested_params = {}
+    # Nested resources with the parameter of their own fields, the field names it accepts and the fields always returned
+    nested_fields = {}
+    # Fields the tap reads from the records whether selected or not
+    required_fields = ("id",)
+    # Properties kept in the records, None to request whole records
+    selected_properties = None
+    # Properties of the objects of each nested resource in `nested_fields`
+    nested_properties = {}
+    params = {}
+
+    def select_fields(self, schema: Dict, metadata_map: Dict) -> None:
+        self.selected_properties = get_selected_properties(schema, metadata_map)
+        self.nested_properties = {nested: get_nested_properties(schema, nested) for nested in self.nested_fields}
+        self.params = {**self.params, **self.get_field_params()}
+
+    def is_property_selected(self, name: str) -> bool:
+        return self.selected_properties is None or name in self.selected_properties
+
+    def get_field_params(self) -> Dict[str, str]:
+        if self.selected_properties is None:
+            return {}
+        properties = self.selected_properties - set(self.non_api_fields) - set(self.nested_params)
+        params = {"fields": project_fields(self.api_fields, properties, self.required_fields)}
+        for nested, excluded in self.nested_params.items():
+            if nested not in self.selected_properties:
+                params[nested] = excluded
+        for nested, (param, api_fields, returned_fields) in self.nested_fields.items():
+            properties = self.nested_properties.get(nested, set()) - set(returned_fields)
+            if nested in self.selected_properties and properties:
+                params[param] = project_fields(api_fields, properties)
+        return params
+
+
+class ActionTargeted:
+    """
+    Mixin class of the full table children of boards which, in targeted refresh
+    mode, request the records named by the board's new actions one by one,
+    through `entity_path`, instead of listing the whole board
+    """
+    # Path of a single record, formatted with its id
+    entity_path = None
+    # Shared with the actions stream when `targeted_refresh` is configured
+    targeted_refresh = None
+    client = None
+    params = {}
+
+    def get_entity_params(self) -> Dict[str, str]:
+        return {key: value for key, value in self.params.items() if key not in ("limit", "page")}
+
+    def get_targeted_records(self, board_id: str) -> Optional[List[Dict]]:
+        """
+        Return the records of the board named by its new actions, or None when
+        the whole board must be listed. Records since deleted or moved are left out.
+        """
+        stream_name = getattr(self, "tap_stream_id", None) or getattr(self, "stream_id", None)
+        entity_ids = None if self.targeted_refresh is None else self.targeted_refresh.get_touched(board_id, stream_name)
+        if entity_ids is None:
+            return None
+
+        LOGGER.info("%s - Refreshing the %s records named by the new actions of board %s",
+                    stream_name, len(entity_ids), board_id)
+        params = self.get_entity_params()
+        if params.get("fields", "all") != "all":
+            # Records moved to another board are left to that board
+            params["fields"] = ",".join(sorted({*params["fields"].split(","), "idBoard"}))
+        records = []
+        for entity_id in sorted(entity_ids):
+            try:
+                record = self.client.get(self.entity_path.format(entity_id), params=params)
+            except TrelloNotFoundError:
+                LOGGER.info("%s - Record %s no longer exists", stream_name, entity_id)
+                continue
+            if record.get("idBoard", board_id) == board_id:
+                records.append(record)
+        return records
+
+
 class DateWindowPaginated:
     """
     Mixin class to provide date windowing on the `get_records` requests
@@ -82,6 +247,10 @@ class DateWindowPaginated:
     client = None
     MAX_API_RESPONSE_SIZE = None
     params = {}
+    # Window bookmarks are written while paginating, so parents are requested from the main thread
+    parallel_fetch = False
+    # Requests the planned windows of every board, until the stream's window is finished
+    window_executor = None
 
     def get_window_state(self):
         window_start = get_bookmark(self.state, self.stream_id, 'window_start')
@@ -100,6 +269,12 @@ class DateWindowPaginated:
 
         return window_start, sub_window_end, window_end
 
+    def get_parent_window_start(self, parent_id, window_start): # pylint: disable=unused-argument
+        """
+        Start of the window of a parent, the same for every parent by default
+        """
+        return window_start
+
     def on_window_started(self):
         if get_bookmark(self.state, self.stream_id, 'sub_window_end') is None:
             if get_bookmark(self.state, self.stream_id, 'window_start') is None:
@@ -110,6 +285,9 @@ class DateWindowPaginated:
         singer.write_state(self.state)
 
     def on_window_finished(self):
+        if self.window_executor is not None:
+            self.window_executor.shutdown()
+            self.window_executor = None
         # Set window_start to current window_end
         window_start = get_bookmark(self.state, self.stream_id, "window_end")
         write_bookmark(self.state, self.stream_id, "window_start", window_start)
@@ -119,9 +297,12 @@ class DateWindowPaginated:
     def get_records(self, format_values):
         """ Overrides the default get_records to provide date_window pagination and bookmarking. """
         window_start, sub_window_end, window_end = self.get_window_state()
+        window_start = self.get_parent_window_start(format_values[0], window_start)
         window_start -= timedelta(milliseconds=1) # To make start inclusive
 
-        if sub_window_end is not None:
+        if get_config_flag(self.config, "actions_adaptive_windows"):
+            yield from self.paginate_planned_windows(window_start, sub_window_end or window_end, format_values)
+        elif sub_window_end is not None:
             for rec in self.paginate_window(window_start, sub_window_end, format_values):
                 yield rec
         else:
@@ -137,32 +318,146 @@ class DateWindowPaginated:
     def paginate_window(self, window_start, window_end, format_values):
         sub_window_end = window_end
         while True:
-            records = self.client.get(self._format_endpoint(format_values), params={"since": utils.strftime(window_start), # pylint: disable=no-member
-                                                                                    "before": utils.strftime(sub_window_end),
-                                                                                    **self.params})
+            records = self.client.iter_get(self._format_endpoint(format_values), params={"since": utils.strftime(window_start), # pylint: disable=no-member
+                                                                                         "before": utils.strftime(sub_window_end),
+                                                                                         **self.params})
+            # Records may be streamed, so only the count and the oldest date are kept
+            record_count = 0
+            last_date = None
             with OrderChecker("DESC") as oc:
                 for rec in records:
                     oc.check_order(rec["date"])
+                    record_count += 1
+                    last_date = rec["date"]
                     yield rec
 
-            if len(records) >= self.MAX_API_RESPONSE_SIZE:
+            if record_count >= self.MAX_API_RESPONSE_SIZE:
                 LOGGER.info("%s - Paginating within date_window %s to %s, due to max records being received.",
                             self.stream_id,
                             utils.strftime(window_start), utils.strftime(sub_window_end))
                 # NB: Actions are sorted backwards, so if we get the
                 # max_response_size, set the window_end to the last
                 # record's timestamp (inclusive) and try again.
-                sub_window_end = utils.strptime_to_utc(records[-1]["date"]) + timedelta(milliseconds=1)
-                self.update_bookmark("sub_window_end", sub_window_end)
-                singer.write_state(self.state)
+                sub_window_end = utils.strptime_to_utc(last_date) + timedelta(milliseconds=1)
+                with WRITE_LOCK:
+                    self.update_bookmark("sub_window_end", sub_window_end)
+                    singer.write_state(self.state)
             else:
                 LOGGER.info("%s - Finished syncing between %s and %s",
                             self.stream_id,
                             utils.strftime(window_start),
                             window_end)
-                singer.bookmarks.clear_bookmark(self.state, self.stream_id, "sub_window_end")
+                with WRITE_LOCK:
+                    singer.bookmarks.clear_bookmark(self.state, self.stream_id, "sub_window_end")
                 break
 
+    def paginate_by_id(self, since, before, format_values, max_pages=None):
+        """
+        Yield the records between `since` and `before` (a date or a record id),
+        newest first, the next page being requested before the oldest record's id
+        """
+        page_count = 0
+        while True:
+            records = self.client.iter_get(self._format_endpoint(format_values), # pylint: disable=no-member
+                                           params={"since": utils.strftime(since),
+                                                   "before": before if isinstance(before, str) else utils.strftime(before),
+                                                   **self.params})
+            record_count = 0
+            last_id = None
+            with OrderChecker("DESC") as oc:
+                for rec in records:
+                    oc.check_order(rec["date"])
+                    record_count += 1
+                    last_id = rec["id"]
+                    yield rec
+
+            page_count += 1
+            if record_count < self.MAX_API_RESPONSE_SIZE or page_count == max_pages:
+                return
+            before = last_id
+
+    def plan_windows(self, window_start, window_end, density):
+        """
+        Split the window, newest first, into (since, before) windows expected to
+        return about one page each at `density` records per day
+        """
+        days = (window_end - window_start).total_seconds() / 86400
+        page_days = self.MAX_API_RESPONSE_SIZE * WINDOW_FILL / density
+        count = max(1, min(math.ceil(days / page_days), MAX_PLANNED_WINDOWS))
+        step = (window_end - window_start) / count
+        bounds = [window_start + step * index for index in range(count)] + [window_end]
+        # Both bounds are exclusive, so a window also covers the first millisecond of the next one
+        return [(bounds[index], bounds[index + 1] + timedelta(milliseconds=1) if index < count - 1 else window_end)
+                for index in reversed(range(count))]
+
+    def paginate_planned_windows(self, window_start, window_end, format_values):
+        """
+        Yield the records of the window, newest first, from windows planned to
+        return about one page each from the density of the board's records,
+        recorded by the previous syncs or else measured on the newest page.
+        Up to `max_workers` windows are requested concurrently, and the resume
+        bookmark only advances once a whole window has been yielded.
+        """
+        board_id = format_values[0]
+        densities = get_bookmark(self.state, self.stream_id, "board_density") or {}
+        density = densities.get(board_id)
+        seen_ids = set()
+        end = window_end
+        if not density:
+            page = list(self.paginate_by_id(window_start, window_end, format_values, max_pages=1))
+            seen_ids.update(rec["id"] for rec in page)
+            yield from page
+            if len(page) < self.MAX_API_RESPONSE_SIZE:
+                self.record_density(board_id, len(seen_ids), window_start, window_end)
+                return
+            newest, oldest = utils.strptime_to_utc(page[0]["date"]), utils.strptime_to_utc(page[-1]["date"])
+            density = len(page) / max((newest - oldest).total_seconds() / 86400, 1 / 1440)
+            end = oldest + timedelta(milliseconds=1)
+
+        windows = self.plan_windows(window_start, end, density)
+        LOGGER.info("%s - Requesting board %s in %s windows of about one page", self.stream_id, board_id, len(windows))
+        max_workers = min(max(int(self.config.get("max_workers") or 1), 1), len(windows))
+        executor = self.get_window_executor()
+        pending = deque()
+        for since, before in windows:
+            pending.append((since, executor.submit(
+                lambda since, before: list(self.paginate_by_id(since, before, format_values)), since, before)))
+            if len(pending) > max_workers:
+                yield from self.yield_window(pending, seen_ids)
+        while pending:
+            yield from self.yield_window(pending, seen_ids)
+
+        self.record_density(board_id, len(seen_ids), window_start, window_end)
+
+    def get_window_executor(self):
+        """
+        Executor shared by the boards, so that its threads and their client
+        sessions are reused rather than created again for every board.
+        """
+        if self.window_executor is None:
+            self.window_executor = ThreadPoolExecutor(max_workers=max(int(self.config.get("max_workers") or 1), 1),
+                                                      thread_name_prefix="actions-window")
+        return self.window_executor
+
+    def yield_window(self, pending, seen_ids):
+        since, records = pending.popleft()
+        for rec in records.result():
+            if rec["id"] not in seen_ids:
+                seen_ids.add(rec["id"])
+                yield rec
+        # The records after the window's start are all written
+        with WRITE_LOCK:
+            self.update_bookmark("sub_window_end", since + timedelta(milliseconds=1))
+            singer.write_state(self.state)
+
+    def record_density(self, board_id, record_count, window_start, window_end):
+        days = max((window_end - window_start).total_seconds() / 86400, 1 / 1440)
+        with WRITE_LOCK:
+            densities = get_bookmark(self.state, self.stream_id, "board_density") or {}
+            write_bookmark(self.state, self.stream_id, "board_density",
+                           {**densities, board_id: round(record_count / days, 3)})
+            singer.bookmarks.clear_bookmark(self.state, self.stream_id, "sub_window_end")
+
 
 class LegacyStream:
     """
@@ -182,16 +477,34 @@ class LegacyStream:
     _last_bookmark_value = None
     MAX_API_RESPONSE_SIZE = None
     params = {}
+    skipped_requests = 0
+    # Whether the records of different parents may be requested concurrently
+    parallel_fetch = True
+    # Key and `/boards/{id}` parameters of the stream's collection in a board snapshot
+    snapshot_key = None
+    snapshot_params = {}
 
     def __init__(self, client, config, state):
         self.client = client
         self.config = config
         self.state = state
+        self.child_to_sync = []
+
+    def get_child_stream_ids(self):
+        return [getattr(child, 'tap_stream_id', None) or getattr(child, 'stream_id', None)
+                for child in self.child_to_sync]
 
 
     def get_format_values(self):
         return []
 
+    def get_snapshot_params(self):
+        return dict(self.snapshot_params) if self.snapshot_key else {}
+
+    def count_skipped_requests(self, count=1):
+        with SKIPPED_REQUESTS_LOCK:
+            self.skipped_requests += count
+
     def _format_endpoint(self, format_values):
         return self.endpoint.format(*format_values)
 
@@ -209,7 +522,7 @@ class LegacyStream:
 
         # Boards, Users, and Lists don't handle an api limit key
         # Passing in None doesn't change the response (no 400 returned)
-        records = self.client.get(
+        records = self.client.iter_get(
             self._format_endpoint(format_values),
             params={
                 "limit": self.MAX_API_RESPONSE_SIZE,
@@ -217,17 +530,24 @@ class LegacyStream:
                 **additional_params
             })
 
-        if self.MAX_API_RESPONSE_SIZE and len(records) >= self.MAX_API_RESPONSE_SIZE:
-            raise Exception(
-                ("{}: Number of records returned is greater than max API response size of {}.").format(
-                    self.stream_id,
-                    self.MAX_API_RESPONSE_SIZE)
-            )
+        if self.MAX_API_RESPONSE_SIZE:
+            # Records may be streamed, so the page is read up to its limit before any record is yielded
+            records = list(islice(records, self.MAX_API_RESPONSE_SIZE))
+            if len(records) >= self.MAX_API_RESPONSE_SIZE:
+                raise Exception(
+                    ("{}: Number of records returned is greater than max API response size of {}.").format(
+                        self.stream_id,
+                        self.MAX_API_RESPONSE_SIZE)
+                )
 
         for rec in records:
             yield self.modify_record(rec, parent_id_list = format_values, custom_fields_map = custom_fields_map, dropdown_options_map = dropdown_options_map)
 
 
+    def get_snapshot_records(self, format_values, snapshot):
+        for rec in snapshot.get_collection(self.snapshot_key):
+            yield self.modify_record(rec, parent_id_list = format_values, custom_fields_map = {}, dropdown_options_map = {})
+
     def sync(self):
         for rec in self.get_records(self.get_format_values()):
             yield rec
@@ -256,20 +576,45 @@ class LegacyChildStream(LegacyStream):
             yield parent_obj['id']
 
     def _sort_parent_ids_by_created(self, parent_ids):
-        # NB This is documented here. Yes it's hacky
-        # - https://help.trello.com/article/759-getting-the-time-a-card-or-board-was-created
-        parents = [{"id": x, "created": datetime.utcfromtimestamp(int(x[:8], 16))}
+        parents = [{"id": x, "created": get_created_from_id(x)}
                    for x in parent_ids]
         return sorted(parents, key=lambda x: x["created"])
 
-    # TODO: If we need second-level child streams, most of sync needs pulled into get_records for this class
-
     def on_window_started(self):
         pass
 
     def on_window_finished(self):
         singer.write_state(self.state)
 
+    def get_bookmarked_parent_id(self):
+        return singer.get_bookmark(self.state, self.stream_id, 'parent_id')
+
+    def checkpoint_parent(self, parent_id):
+        # Checkpoint the parent before writing its records so an interrupted
+        # run resumes from this parent
+        singer.write_bookmark(self.state, self.stream_id, "parent_id", parent_id)
+        singer.write_state(self.state)
+
+    def get_parent_records(self, parent_id, parent_record=None):
+        # Only requests records, so that parents can be requested from worker threads
+        if isinstance(parent_record, BoardSnapshot) and parent_record.get_collection(self.snapshot_key) is not None:
+            records = self.get_snapshot_records([parent_id], parent_record)
+        else:
+            records = self.get_records([parent_id])
+        for rec in records:
+            yield rec
+
+    def sync_parent(self, parent_id, parent_record=None):
+        self.checkpoint_parent(parent_id)
+        yield from self.get_parent_records(parent_id, parent_record)
+
+    def on_parent_written(self, parent_id):
+        """Called once the records of the parent and of their children have all been written."""
+
+    def on_parents_finished(self):
+        singer.clear_bookmark(self.state, self.stream_id, "parent_id")
+        self.on_window_finished()
+
     def sync(self):
         self.on_window_started()
 
@@ -280,7 +625,7 @@ class LegacyChildStream(LegacyStream):
         parent = parent_class(self.client, self.config, self.state)
 
         # Get the most recent parent ID and resume from there, if necessary
-        bookmarked_parent = singer.get_bookmark(self.state, self.stream_id, 'parent_id')
+        bookmarked_parent = self.get_bookmarked_parent_id()
         parent_ids = [p['id'] for p in self._sort_parent_ids_by_created(self.get_parent_ids(parent))]
 
         if bookmarked_parent and bookmarked_parent in parent_ids:
@@ -288,12 +633,8 @@ class LegacyChildStream(LegacyStream):
             # - If there's too much data to sync all parents in a single run, this API is not appropriate for that data set.
             parent_ids = dropwhile(lambda p: p != bookmarked_parent, parent_ids)
         for parent_id in parent_ids:
-            singer.write_bookmark(self.state, self.stream_id, "parent_id", parent_id)
-            singer.write_state(self.state)
-            for rec in self.get_records([parent_id]):
-                yield rec
-        singer.clear_bookmark(self.state, self.stream_id, "parent_id")
-        self.on_window_finished()
+            yield from self.sync_parent(parent_id)
+        self.on_parents_finished()
 
 
 class BaseStream(ABC):
@@ -318,6 +659,12 @@ class BaseStream(ABC):
     parent_bookmark_key = ""
     http_method = "GET"
     bookmark_value = None
+    skipped_requests = 0
+    parallel_fetch = False
+    snapshot_key = None
+    snapshot_params = {}
+    # Whether the stream's GET requests are idempotent within a run, so their responses may be memoized
+    cacheable = False
 
     def __init__(self, client=None, catalog=None) -> None:
         self.client = client
@@ -356,6 +703,24 @@ class BaseStream(ABC):
     def is_selected(self):
         return metadata.get(self.metadata, (), "selected")
 
+    def get_snapshot_params(self) -> Dict:
+        """
+        `/boards/{id}` parameters loading the stream's collection in a board snapshot
+        """
+        return dict(self.snapshot_params) if self.snapshot_key else {}
+
+    def on_parents_started(self, state: Dict) -> None:
+        """
+        Called with the state before the records of any parent are requested
+        """
+
+    def count_skipped_requests(self, count: int = 1) -> None:
+        """
+        Count requests spared because their response was known to be empty
+        """
+        with SKIPPED_REQUESTS_LOCK:
+            self.skipped_requests += count
+
     @abstractmethod
     def sync(
         self,
@@ -380,17 +745,19 @@ class BaseStream(ABC):
 
     def get_records(self) -> Iterator:
         """Interacts with api client interaction and pagination."""
-        self.params["page"] = self.page_size
+        if self.page_size:
+            self.params["page"] = self.page_size
         next_page = 1
 
         while next_page:
-            response = self.client.make_request(
+            response = self.client.iter_request(
                 self.http_method,
                 self.url_endpoint,
                 self.params,
                 self.headers,
                 body=json.dumps(self.data_payload),
-                path=self.path
+                path=self.path,
+                cacheable=self.cacheable
             )
             raw_records, next_page = self._normalize_response(response, self.url_endpoint)
 
@@ -399,6 +766,22 @@ class BaseStream(ABC):
 
             yield from raw_records
 
+    def get_parent_records(self, parent_obj: Dict = None) -> Iterator:
+        """
+        Request and modify the records of a single parent without writing them.
+        Works on a copy of the stream so that parents can be requested from worker threads.
+        """
+        stream = copy.copy(self)
+        stream.params = dict(self.params)
+        stream.data_payload = dict(self.data_payload)
+        stream._sync_parent_obj = parent_obj # pylint: disable=attribute-defined-outside-init
+        stream.url_endpoint = stream.get_url_endpoint(parent_obj)
+        stream.update_data_payload(parent_obj=parent_obj)
+        stream.skipped_requests = 0
+        for record in stream.get_records():
+            yield stream.modify_object(record, parent_obj)
+        self.count_skipped_requests(stream.skipped_requests)
+
     def write_schema(self) -> None:
         """
         Write a schema message.
@@ -470,7 +853,7 @@ class BaseStream(ABC):
         """
         Normalize different Trello response shapes into (raw_records, next_page).
 
-        Returns a tuple where raw_records is a list of record dicts and next_page or None.
+        Returns a tuple where raw_records is a list (or iterator) of record dicts and next_page or None.
         """
         if isinstance(response, dict):
             # Check if this is a paginated response with a data_key
@@ -481,7 +864,8 @@ class BaseStream(ABC):
                 # Handle single record response '/members/{id}' returns one member dict
                 raw_records = [response]
                 next_page = None
-        elif isinstance(response, list):
+        elif isinstance(response, (list, Iterator)):
+            # A streamed list response is an iterator decoding its records as they download
             raw_records = response
             next_page = None
         else:
@@ -565,6 +949,9 @@ class FullTableStream(BaseStream):
     """Base Class for Incremental Stream."""
 
     replication_keys = []
+    parallel_fetch = True
+    # Records of a parent come from a single unpaginated GET, which may be sent within a `/batch` request
+    batchable = False
 
     def sync(
         self,
@@ -573,11 +960,13 @@ class FullTableStream(BaseStream):
         parent_obj: Dict = None,
     ) -> Dict:
         """Abstract implementation for `type: Fulltable` stream."""
-        self.url_endpoint = self.get_url_endpoint(parent_obj)
-        self.update_data_payload(parent_obj=parent_obj)
+        return self.write_parent_records(self.get_parent_records(parent_obj), state, transformer)
+
+    def write_parent_records(self, records, state: Dict, transformer: Transformer,
+                             parent_obj: Dict = None) -> int: # pylint: disable=unused-argument
+        """Write records returned by `get_parent_records` for `parent_obj` and sync their children."""
         with metrics.record_counter(self.tap_stream_id) as counter:
-            for record in self.get_records():
-                record = self.modify_object(record, parent_obj)
+            for record in records:
                 transformed_record = transformer.transform(
                     record, self.schema, self.metadata
                 )
@@ -590,6 +979,76 @@ class FullTableStream(BaseStream):
 
             return counter.value
 
+    def get_embedded_records(self, parent_obj: Optional[Dict]) -> Optional[List[Dict]]: # pylint: disable=unused-argument
+        """
+        Return the records embedded in the parent record, or None when they must be requested.
+        """
+        return None
+
+    def get_batch_path(self, parent_obj: Dict) -> str:
+        """
+        Path of the parent's request relative to the API version, with the stream's params,
+        as sent within a `/batch` request. The commas of the params (e.g. of a `fields`
+        list) are percent-encoded, as `/batch` separates its paths with commas.
+        """
+        url = self.get_url_endpoint(parent_obj)
+        path = "/" + url[len(self.client.base_url):].lstrip("/")
+        if self.params:
+            path += "?" + urlencode(self.params)
+        return path
+
+
+def get_batched_parent_records(client, requests: List[Tuple[FullTableStream, Dict]]) -> List[List[Dict]]:
+    """
+    Return the modified records of each (stream, parent) pair, sending the
+    requests of all pairs whose records are not embedded in their parent
+    together in `/batch` requests. An error of a single request is raised
+    as if that request had been sent on its own.
+    """
+    records_per_request = []
+    batch_indexes, batch_paths = [], []
+    for index, (stream, parent_obj) in enumerate(requests):
+        records = stream.get_embedded_records(parent_obj)
+        if records is None:
+            batch_indexes.append(index)
+            batch_paths.append(stream.get_batch_path(parent_obj))
+        records_per_request.append(records)
+
+    cacheable_paths = {path for index, path in zip(batch_indexes, batch_paths) if requests[index][0].cacheable}
+    for index, path, response in zip(batch_indexes, batch_paths, client.get_batch(batch_paths, cacheable_paths)):
+        if isinstance(response, Exception):
+            raise response
+        stream = requests[index][0]
+        records_per_request[index], _ = stream._normalize_response(response, path) # pylint: disable=protected-access
+
+    return [[stream.modify_object(record, parent_obj) for record in records]
+            for (stream, parent_obj), records in zip(requests, records_per_request)]
+
+
+class EmbeddedFullTableStream(FullTableStream):
+    """
+    Base Class for full table child streams whose records may already be
+    embedded in the parent record, which saves one request per parent.
+    """
+
+    def get_embedded_records(self, parent_obj: Optional[Dict]) -> Optional[List[Dict]]:
+        """
+        Return the records embedded in the parent record, or None when they
+        are not available and must be requested.
+        """
+        if isinstance(parent_obj, BoardSnapshot):
+            records = parent_obj.get_collection(self.snapshot_key)
+            return None if records is None else [dict(record) for record in records]
+        return None
+
+    def get_records(self) -> Iterator:
+        """Use the records embedded in the parent when possible, else request them."""
+        embedded_records = self.get_embedded_records(getattr(self, "_sync_parent_obj", None))
+        if embedded_records is None:
+            yield from super().get_records()
+        else:
+            yield from embedded_records
+
 
 class ParentBaseStream(IncrementalStream):
     """Base Class for Parent Stream."""
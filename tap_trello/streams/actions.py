@@ -1,7 +1,14 @@
-from tap_trello.streams.abstracts import DateWindowPaginated, ChildStream
+import singer
+from singer import get_bookmark, utils
 
+from tap_trello.streams.abstracts import DateWindowPaginated, FieldProjection, ChildStream
+from tap_trello.streams.members import MEMBER_FIELDS
+from tap_trello.utils import get_config_flag
 
-class Actions(DateWindowPaginated, ChildStream):
+LOGGER = singer.get_logger()
+
+
+class Actions(FieldProjection, DateWindowPaginated, ChildStream):
     stream_id = "actions"
     stream_name = "actions"
     endpoint = "/boards/{}/actions"
@@ -11,3 +18,68 @@ class Actions(DateWindowPaginated, ChildStream):
     parent = "boards"
     MAX_API_RESPONSE_SIZE = 1000
     params = {'limit': 1000}
+    api_fields = ("id", "data", "date", "idMemberCreator", "type")
+    nested_params = {'member': 'false', 'memberCreator': 'false'}
+    nested_fields = {'member': ('member_fields', MEMBER_FIELDS, ()),
+                     'memberCreator': ('memberCreator_fields', MEMBER_FIELDS, ())}
+    required_fields = ("id", "date")
+    # Collects the records named by the actions when `targeted_refresh` is configured
+    targeted_refresh = None
+
+    def __init__(self, client, config, state):
+        super().__init__(client, config, state)
+        # Date up to which the actions of each board were written, when `actions_board_bookmarks` is configured.
+        # Most boards share the same date, so the bookmark groups the boards by date.
+        self.board_watermarks = None
+        if get_config_flag(config, "actions_board_bookmarks"):
+            grouped = get_bookmark(state, self.stream_id, "board_watermarks") or {}
+            self.board_watermarks = {board_id: watermark
+                                     for watermark, board_ids in grouped.items() for board_id in board_ids}
+        # Boards skipped as inactive keep their watermark, as their activity was read before the window ended
+        self.skipped_board_ids = set()
+
+    def get_parent_window_start(self, parent_id, window_start):
+        # A board resumes from its own watermark, without the lookback of the shared window
+        watermark = self.board_watermarks and self.board_watermarks.get(parent_id)
+        return window_start if not watermark else utils.strptime_to_utc(watermark)
+
+    def get_parent_records(self, parent_id, parent_record=None):
+        watermark = self.board_watermarks and self.board_watermarks.get(parent_id)
+        activity = (parent_record or {}).get('dateLastActivity')
+        if watermark and activity and utils.strptime_to_utc(activity) <= utils.strptime_to_utc(watermark):
+            # Nothing happened on the board since its actions were written
+            self.count_skipped_requests()
+            self.skipped_board_ids.add(parent_id)
+            LOGGER.info("%s - Skipping board %s, inactive since %s", self.stream_id, parent_id, watermark)
+            if self.targeted_refresh is not None:
+                self.targeted_refresh.start_board(parent_id)
+            return
+        yield from super().get_parent_records(parent_id, parent_record)
+
+    def get_records(self, format_values, additional_params=None):
+        board_id = format_values[0]
+        # A board resumed within its window had its newer actions written by the interrupted sync
+        targeted = self.targeted_refresh is not None and get_bookmark(self.state, self.stream_id, 'sub_window_end') is None
+        if targeted:
+            self.targeted_refresh.start_board(board_id)
+        for rec in super().get_records(format_values):
+            self.client.embedded_members.add_from_action(rec)
+            if targeted:
+                self.targeted_refresh.add_action(board_id, rec)
+            yield rec
+
+    def on_parent_written(self, parent_id):
+        if parent_id in self.skipped_board_ids:
+            self.skipped_board_ids.discard(parent_id)
+            return
+        if self.board_watermarks is not None:
+            _, _, window_end = self.get_window_state()
+            self.board_watermarks[parent_id] = utils.strftime(window_end)
+
+    def on_parents_finished(self):
+        if self.board_watermarks is not None:
+            grouped = {}
+            for board_id, watermark in sorted(self.board_watermarks.items()):
+                grouped.setdefault(watermark, []).append(board_id)
+            singer.write_bookmark(self.state, self.stream_id, "board_watermarks", grouped)
+        super().on_parents_finished()
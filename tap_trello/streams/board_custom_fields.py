@@ -1,11 +1,17 @@
-from tap_trello.streams.abstracts import FullTableStream
+from tap_trello.streams.abstracts import EmbeddedFullTableStream
 
-class BoardCustomFields(FullTableStream):
+class BoardCustomFields(EmbeddedFullTableStream):
     tap_stream_id = "board_custom_fields"
     key_properties = ["id", "boardId"]
     replication_method = "FULL_TABLE"
     path = "/boards/{id}/customFields"
+    batchable = True
+    # Also requested by the cards stream to name the custom field items, from an unpaginated endpoint
+    cacheable = True
+    page_size = None
     parent = "boards"
+    snapshot_key = "customFields"
+    snapshot_params = {'customFields': 'true'}
 
     def modify_object(self, record, parent_record=None):
         """Add boardId to board custom field records."""
@@ -1,11 +1,25 @@
-from tap_trello.streams.abstracts import FullTableStream
+from typing import Dict, List, Optional
 
-class BoardLabels(FullTableStream):
+from tap_trello.streams.abstracts import ActionTargeted, EmbeddedFullTableStream
+
+class BoardLabels(ActionTargeted, EmbeddedFullTableStream):
     tap_stream_id = "board_labels"
     key_properties = ["id", "boardId"]
     replication_method = "FULL_TABLE"
     path = "/boards/{id}/labels"
+    entity_path = "/labels/{}"
+    batchable = True
     parent = "boards"
+    snapshot_key = "labels"
+    snapshot_params = {'labels': 'all'}
+
+    def get_embedded_records(self, parent_obj: Optional[Dict]) -> Optional[List[Dict]]:
+        """
+        Return the labels named by the board's new actions in targeted refresh mode,
+        else those of the board snapshot, if any.
+        """
+        records = self.get_targeted_records(parent_obj["id"]) if parent_obj else None
+        return super().get_embedded_records(parent_obj) if records is None else records
 
     def modify_object(self, record, parent_record=None):
         """Add boardId to board label records."""
@@ -1,11 +1,14 @@
-from tap_trello.streams.abstracts import FullTableStream
+from tap_trello.streams.abstracts import EmbeddedFullTableStream
 
-class BoardMemberships(FullTableStream):
+class BoardMemberships(EmbeddedFullTableStream):
     tap_stream_id = "board_memberships"
     key_properties = ["id", "boardId"]
     replication_method = "FULL_TABLE"
     path = "/boards/{id}/memberships"
+    batchable = True
     parent = "boards"
+    snapshot_key = "memberships"
+    snapshot_params = {'memberships': 'all'}
 
     def modify_object(self, record, parent_record=None):
         """Add boardId to board membership records."""
@@ -1,12 +1,17 @@
-from tap_trello.streams.abstracts import Unsortable, Stream
+from tap_trello.streams.abstracts import FieldProjection, Unsortable, Stream
 
 
-class Boards(Unsortable, Stream):
+class Boards(FieldProjection, Unsortable, Stream):
     stream_id = "boards"
     stream_name = "boards"
     endpoint = "/members/{}/boards"
     key_properties = ["id"]
     replication_method = "FULL_TABLE"
+    api_fields = ("id", "closed", "dateLastActivity", "dateLastView", "desc", "descData", "idMemberCreator",
+                  "idOrganization", "labelNames", "memberships", "name", "pinned", "powerUps", "prefs",
+                  "shortLink", "shortUrl", "starred", "subscribed", "url")
+    # dateLastActivity tells which boards changed since the previous sync
+    required_fields = ("id", "dateLastActivity")
 
     def get_format_values(self):
         return [self.client.member_id]
@@ -1,11 +1,41 @@
-from tap_trello.streams.abstracts import FullTableStream
+from typing import Dict, List, Optional
 
-class CardAttachments(FullTableStream):
+import singer
+
+from tap_trello.streams.abstracts import EmbeddedFullTableStream
+
+LOGGER = singer.get_logger()
+
+
+class CardAttachments(EmbeddedFullTableStream):
     tap_stream_id = "card_attachments"
     key_properties = ["id", "card_id"]
     replication_method = "FULL_TABLE"
     path = "/cards/{id}/attachments"
+    batchable = True
     parent = "cards"
+    # Shared with the cards stream when `card_watermarks_dir` is configured
+    card_watermarks = None
+
+    def get_embedded_records(self, parent_obj: Optional[Dict]) -> Optional[List[Dict]]:
+        """
+        Return the attachments the cards stream requested inline on `/boards/{id}/cards/all`,
+        or None when the card was fetched without them. A card unchanged since
+        its attachments were last synced has none to write.
+        """
+        card = parent_obj or {}
+        if self.card_watermarks is not None and self.card_watermarks.is_unchanged(card, self.tap_stream_id):
+            return []
+        attachments = card.get("attachments")
+        if not isinstance(attachments, list):
+            # A card whose badges count no attachments would return an empty response
+            if (card.get("badges") or {}).get("attachments") == 0:
+                self.count_skipped_requests()
+                return []
+            LOGGER.debug("%s - Card %s has no embedded attachments, requesting them",
+                         self.tap_stream_id, card.get("id"))
+            return None
+        return [dict(attachment) for attachment in attachments]
 
     def modify_object(self, record, parent_record=None):
         """Add card_id to card attachment records."""
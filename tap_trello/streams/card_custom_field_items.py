@@ -1,11 +1,49 @@
-from tap_trello.streams.abstracts import FullTableStream
+from typing import Dict, List, Optional
 
-class CardCustomFieldItems(FullTableStream):
+import singer
+
+from tap_trello.streams.abstracts import EmbeddedFullTableStream
+from tap_trello.utils import get_config_flag
+
+LOGGER = singer.get_logger()
+
+
+class CardCustomFieldItems(EmbeddedFullTableStream):
     tap_stream_id = "card_custom_field_items"
     key_properties = ["id", "card_id"]
     replication_method = "FULL_TABLE"
     path = "/cards/{id}/customFieldItems"
+    batchable = True
     parent = "cards"
+    # Shared with the cards stream when `card_watermarks_dir` is configured
+    card_watermarks = None
+
+    def get_embedded_records(self, parent_obj: Optional[Dict]) -> Optional[List[Dict]]:
+        """
+        Return the items embedded in the card record as the `/cards/{id}/customFieldItems`
+        endpoint would, or None when the mode is disabled or the embedded data is incomplete.
+        A card unchanged since its items were last synced has none to write.
+        """
+        if self.card_watermarks is not None and self.card_watermarks.is_unchanged(parent_obj or {}, self.tap_stream_id):
+            return []
+        if not get_config_flag(self.client.config, "card_custom_field_items_from_cards"):
+            return None
+
+        card = parent_obj or {}
+        items = card.get("customFieldItems")
+        if not isinstance(items, list) or not all(isinstance(item, dict) and item.get("id") for item in items):
+            LOGGER.debug("%s - Card %s has no complete customFieldItems, requesting them",
+                         self.tap_stream_id, card.get("id"))
+            return None
+
+        raw_items = []
+        for item in items:
+            # Undo the enrichment done by `Cards.modify_record`
+            raw_item = {key: value for key, value in item.items() if key != "name"}
+            if raw_item.get("idValue"):
+                raw_item.pop("value", None)
+            raw_items.append(raw_item)
+        return raw_items
 
     def modify_object(self, record, parent_record=None):
         """Add card_id to card custom field item records."""
@@ -1,18 +1,49 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import singer
+from singer import utils
 
-from tap_trello.streams.abstracts import ChildStream
+from tap_trello.streams.abstracts import ActionTargeted, ChildStream, FieldProjection, get_id_at
+from tap_trello.utils import get_config_flag
 
 LOGGER = singer.get_logger()
 
 
-class Cards(ChildStream):
+class Cards(ActionTargeted, FieldProjection, ChildStream):
     stream_id = "cards"
     stream_name = "cards"
     endpoint = "/boards/{}/cards/all"
+    entity_path = "/cards/{}"
     key_properties = ["id"]
     replication_method = "FULL_TABLE"
     parent = "boards"
     MAX_API_RESPONSE_SIZE = 1000
+    snapshot_key = "cards"
+    snapshot_params = {'cards': 'all', 'card_customFieldItems': 'true', 'customFields': 'true'}
+    api_fields = ("id", "badges", "checkItemStates", "closed", "cover", "dateLastActivity", "desc", "descData",
+                  "due", "dueComplete", "dueReminder", "idAttachmentCover", "idBoard", "idChecklists", "idLabels",
+                  "idList", "idMembers", "idMembersVoted", "idShort", "isTemplate", "labels",
+                  "manualCoverAttachment", "name", "pos", "shortLink", "shortUrl", "start", "subscribed", "url")
+    non_api_fields = ("customFieldItems",)
+    # idChecklists are counted so checklists can skip boards without any
+    required_fields = ("id", "idChecklists")
+    # Shared with the card children when `card_watermarks_dir` is configured
+    card_watermarks = None
+
+    def __init__(self, client, config, state):
+        super().__init__(client, config, state)
+        # Number of checklists on each fully synced board, counted from the cards' idChecklists
+        self.board_checklist_counts = {}
+        # In incremental mode only the cards active since the board's bookmark are written
+        self.incremental = get_config_flag(config, "cards_incremental")
+        if self.incremental:
+            self.required_fields = (*self.required_fields, "dateLastActivity")
+        # Latest dateLastActivity of the cards of each board, bookmarked once the board is written
+        self.board_last_activity = {}
+        # Requests the slices of every board, as boards may be requested on several threads
+        self.slice_executor = None
+        self._slice_executor_lock = threading.Lock()
 
     def _get_dropdown_option_key(self, field_id, option_id):
         """Generate a unique key for dropdown options."""
@@ -27,7 +58,14 @@ class Cards(ChildStream):
         # Therefore, we validate that only one board is being passed in
         if len(board_id_list) != 1:
             raise ValueError(f"Expected exactly one board ID, got {len(board_id_list)}")
-        custom_fields = self.client.get('/boards/{}/customFields'.format(board_id_list[0]))
+        if not self.is_property_selected('customFieldItems'):
+            # The items are not written, so they need no name
+            if kwargs.get('custom_fields') is None:
+                self.count_skipped_requests()
+            return None, None
+        custom_fields = kwargs.get('custom_fields')
+        if custom_fields is None:
+            custom_fields = self.client.get('/boards/{}/customFields'.format(board_id_list[0]), cacheable=True)
         for custom_field in custom_fields:
             custom_fields_map[custom_field['id']] = custom_field['name']
             if custom_field['type'] == 'list':
@@ -41,6 +79,8 @@ class Cards(ChildStream):
         """Add custom field names and dropdown values to card records."""
         custom_fields_map = kwargs['custom_fields_map']
         dropdown_options_map = kwargs['dropdown_options_map']
+        if custom_fields_map is None:
+            return record
         for custom_field in record['customFieldItems']:
             custom_field['name'] = custom_fields_map[custom_field['idCustomField']]
             if custom_field.get('idValue', None):
@@ -49,11 +89,103 @@ class Cards(ChildStream):
 
         return record
 
+    def requests_custom_field_items(self):
+        """Whether the cards are requested with their customFieldItems."""
+        if self.is_property_selected('customFieldItems'):
+            return True
+        # card_custom_field_items may be built from the items embedded in the cards
+        return ('card_custom_field_items' in self.get_child_stream_ids()
+                and get_config_flag(self.config, "card_custom_field_items_from_cards"))
+
+    def get_board_bookmark(self, board_id):
+        """The latest dateLastActivity of the cards of the board written by previous syncs, in incremental mode"""
+        if not self.incremental:
+            return None
+        bookmark = (singer.get_bookmark(self.state, self.stream_id, "board_last_activity") or {}).get(board_id)
+        return None if bookmark is None else utils.strptime_to_utc(bookmark)
+
+    def get_parent_records(self, parent_id, parent_record=None):
+        bookmark = self.get_board_bookmark(parent_id)
+        board_activity = (parent_record or {}).get('dateLastActivity')
+        if bookmark is not None and board_activity and utils.strptime_to_utc(board_activity) <= bookmark:
+            # No card of the board can have been active since
+            self.count_skipped_requests()
+            LOGGER.info("%s - Skipping board %s, inactive since %s", self.stream_id, parent_id, utils.strftime(bookmark))
+            return
+
+        if self.card_watermarks is not None:
+            self.card_watermarks.start_board(parent_id)
+        last_activity = None
+        records = self.get_targeted_records(parent_id)
+        if records is None:
+            records = super().get_parent_records(parent_id, parent_record)
+        # Trello only filters the cards by creation date, so all of them are listed and the inactive ones dropped
+        for rec in records:
+            activity = rec.get('dateLastActivity')
+            if bookmark is not None and (activity is None or utils.strptime_to_utc(activity) < bookmark):
+                continue
+            if activity is not None:
+                last_activity = activity if last_activity is None else max(last_activity, activity,
+                                                                           key=utils.strptime_to_utc)
+            if self.card_watermarks is not None:
+                self.card_watermarks.record(parent_id, rec)
+            yield rec
+        if self.incremental and last_activity is not None:
+            self.board_last_activity[parent_id] = last_activity
+
+    def get_entity_params(self):
+        return self.get_card_params()
+
+    def get_targeted_records(self, board_id):
+        records = super().get_targeted_records(board_id)
+        if not records:
+            return records
+        custom_fields_map, dropdown_options_map = self.build_custom_fields_maps(parent_id_list=[board_id])
+        return [self.modify_record(rec, parent_id_list=[board_id], custom_fields_map=custom_fields_map,
+                                   dropdown_options_map=dropdown_options_map)
+                for rec in records]
+
+    def on_parent_written(self, parent_id):
+        if self.card_watermarks is not None:
+            self.card_watermarks.commit(parent_id)
+        last_activity = self.board_last_activity.pop(parent_id, None)
+        if last_activity is not None:
+            bookmark = singer.get_bookmark(self.state, self.stream_id, "board_last_activity") or {}
+            singer.write_bookmark(self.state, self.stream_id, "board_last_activity",
+                                  {**bookmark, parent_id: last_activity})
+
+    def get_card_params(self):
+        params = self.get_field_params()
+        if self.requests_custom_field_items():
+            params['customFieldItems'] = 'true'
+        if 'card_attachments' in self.get_child_stream_ids():
+            # Request the attachments inline so card_attachments needs no request per card
+            params.update({'attachments': 'true', 'attachment_fields': 'all'})
+        return params
+
+    def get_snapshot_params(self):
+        params = super().get_snapshot_params()
+        if 'card_attachments' in self.get_child_stream_ids():
+            params.update({'card_attachments': 'true', 'card_attachment_fields': 'all'})
+        return params
+
+    def get_snapshot_records(self, format_values, snapshot):
+        # The board's custom fields are part of the snapshot, unless they had to be left out
+        custom_fields_map, dropdown_options_map = self.build_custom_fields_maps(
+            parent_id_list=format_values, custom_fields=snapshot.get_collection('customFields'))
+
+        checklist_count = 0
+        for rec in snapshot.get_collection(self.snapshot_key):
+            checklist_count += len(rec.get('idChecklists') or [])
+            yield self.modify_record(rec, parent_id_list = format_values, custom_fields_map = custom_fields_map, dropdown_options_map = dropdown_options_map)
+
+        self.board_checklist_counts[format_values[0]] = checklist_count
+
     def get_records(self, format_values, additional_params=None):
         # Get max_api_response_size from config and set to parameter
         cards_response_size = int(self.config.get('cards_response_size') or self.MAX_API_RESPONSE_SIZE)
         self.MAX_API_RESPONSE_SIZE = min(cards_response_size, 1000)
-        self.params = {'limit': self.MAX_API_RESPONSE_SIZE, 'customFieldItems': 'true'}
+        self.params = {'limit': self.MAX_API_RESPONSE_SIZE, **self.get_card_params()}
 
         # Set window_end with current time
         window_end = singer.utils.strftime(singer.utils.now())
@@ -61,29 +193,104 @@ class Cards(ChildStream):
         # Build custom fields and dropdown object map for the specific parent
         custom_fields_map, dropdown_options_map = self.build_custom_fields_maps(parent_id_list=format_values)
 
+        time_slices = int(self.config.get('cards_time_slices') or 1)
+        if time_slices > 1:
+            records = self.get_time_sliced_records(format_values, window_end, time_slices)
+        else:
+            records = self.paginate_cards(format_values, window_end)
+
+        checklist_count = 0
+        # Yielding records after adding custom fields and dropdown object map to all records
+        for rec in records:
+            checklist_count += len(rec.get('idChecklists') or [])
+            yield self.modify_record(rec, parent_id_list = format_values, custom_fields_map = custom_fields_map, dropdown_options_map = dropdown_options_map)
+
+        self.board_checklist_counts[format_values[0]] = checklist_count
+
+    def paginate_cards(self, format_values, before, since=None, max_pages=None):
+        """
+        Yield the cards of the board created before the `before` id or date, and after `since`,
+        newest pages first, stopping after `max_pages` pages if given.
+        """
+        page_count = 0
         has_more_pages = True
         while has_more_pages:
 
             # Get records for cards before specified time
             # Reference: https://developer.atlassian.com/cloud/trello/guides/rest-api/api-introduction/#paging
-            records = self.client.get(self._format_endpoint(format_values), params={"before": window_end,
-                                                                                   **self.params})
+            params = {"before": before, **self.params}
+            if since is not None:
+                params["since"] = since
+            records = self.client.iter_get(self._format_endpoint(format_values), params=params)
 
-            # Yielding records after adding custom fields and dropdown object map to all records
+            # Records may be streamed, so only the count and the smallest card id of the page are kept
+            record_count = 0
+            oldest_id = None
             for rec in records:
-                yield self.modify_record(rec, parent_id_list = format_values, custom_fields_map = custom_fields_map, dropdown_options_map = dropdown_options_map)
+                record_count += 1
+                # API returns latest records but in unordered manner
+                oldest_id = rec['id'] if oldest_id is None else min(oldest_id, rec['id'])
+                yield rec
 
             LOGGER.info("%s - Collected  %s records for board %s.",
                         self.stream_id,
-                        len(records),
+                        record_count,
                         format_values[0])
 
+            page_count += 1
             # If records are same as limit then shift window to get older data
-            if len(records) == self.MAX_API_RESPONSE_SIZE:
-                # Sort cards based on card ID as API returns latest records but in unordered manner
-                records = sorted(records, key=lambda x: x['id'])
+            if record_count == self.MAX_API_RESPONSE_SIZE and page_count != max_pages:
                 # API returns latest records so set window_end to smallest card id to get older data
-                window_end = records[0]["id"]
+                before = oldest_id
             else:
                 # API returns less records than limit, stop pagination
                 has_more_pages = False
+
+    def get_time_sliced_records(self, format_values, before, time_slices):
+        """
+        Yield the cards of the board, paginating concurrently through `time_slices`
+        slices of creation time once the first page shows the board has more cards.
+        The slices are bounded by synthetic ids, from the creation time they encode.
+        """
+        first_page = list(self.paginate_cards(format_values, before, max_pages=1))
+        yield from first_page
+        if len(first_page) < self.MAX_API_RESPONSE_SIZE:
+            return
+
+        oldest_id = min(rec['id'] for rec in first_page)
+        # Cards moved from older boards may predate the board, so the oldest slice has no lower bound
+        newest_created = int(oldest_id[:8], 16)
+        oldest_created = min(int(format_values[0][:8], 16), newest_created)
+        step = (newest_created - oldest_created) / time_slices
+        boundaries = [None] + [get_id_at(oldest_created + step * index) for index in range(1, time_slices)] + [oldest_id]
+        LOGGER.info("%s - Paginating board %s in %s slices of creation time",
+                    self.stream_id, format_values[0], time_slices)
+
+        seen_ids = {rec['id'] for rec in first_page}
+        executor = self.get_slice_executor(time_slices)
+        slices = [executor.submit(lambda since, until: list(self.paginate_cards(format_values, until, since)),
+                                  since, until)
+                  for since, until in zip(boundaries, boundaries[1:])]
+        # Newest slices first, as the cards are otherwise paginated
+        for records in reversed(slices):
+            for rec in records.result():
+                if rec['id'] not in seen_ids:
+                    seen_ids.add(rec['id'])
+                    yield rec
+
+    def get_slice_executor(self, time_slices):
+        """
+        Executor shared by the boards, so that its threads and their client
+        sessions are reused rather than created again for every board.
+        """
+        with self._slice_executor_lock:
+            if self.slice_executor is None:
+                self.slice_executor = ThreadPoolExecutor(max_workers=time_slices, thread_name_prefix="cards-slice")
+            return self.slice_executor
+
+    def on_parents_finished(self):
+        with self._slice_executor_lock:
+            if self.slice_executor is not None:
+                self.slice_executor.shutdown()
+                self.slice_executor = None
+        super().on_parents_finished()
@@ -1,11 +1,38 @@
-from tap_trello.streams.abstracts import ChildStream
+from tap_trello.streams.abstracts import ActionTargeted, ChildStream, FieldProjection
 
+# Field names of check items accepted by the `checkItem_fields` parameter
+CHECK_ITEM_FIELDS = ("due", "dueReminder", "idMember", "name", "nameData", "pos", "state", "type")
 
-class Checklists(ChildStream):
+
+class Checklists(ActionTargeted, FieldProjection, ChildStream):
     stream_id = "checklists"
     stream_name = "checklists"
     endpoint = "/boards/{}/checklists"
+    entity_path = "/checklists/{}"
     key_properties = ["id"]
     replication_method = "FULL_TABLE"
     parent = "boards"
     params = {'fields': 'all', 'checkItem_fields': 'all'}
+    snapshot_key = "checklists"
+    snapshot_params = {'checklists': 'all', 'checklist_fields': 'all'}
+    api_fields = ("id", "idBoard", "idCard", "name", "pos")
+    nested_params = {'checkItems': 'none'}
+    nested_fields = {'checkItems': ('checkItem_fields', CHECK_ITEM_FIELDS, ("id", "idChecklist"))}
+
+    def __init__(self, client, config, state):
+        super().__init__(client, config, state)
+        # Checklist counts per board, shared by the cards stream when it is synced first
+        self.board_checklist_counts = {}
+
+    def get_records(self, format_values, additional_params=None):
+        # A board whose cards reference no checklist would return an empty response
+        if self.board_checklist_counts.get(format_values[0]) == 0:
+            self.count_skipped_requests()
+            return
+        yield from super().get_records(format_values, additional_params)
+
+    def get_parent_records(self, parent_id, parent_record=None):
+        records = self.get_targeted_records(parent_id)
+        if records is None:
+            records = super().get_parent_records(parent_id, parent_record)
+        yield from records
@@ -1,10 +1,20 @@
-from tap_trello.streams.abstracts import Unsortable, ChildStream
+from tap_trello.streams.abstracts import ActionTargeted, FieldProjection, Unsortable, ChildStream
 
 
-class Lists(Unsortable, ChildStream):
+class Lists(ActionTargeted, FieldProjection, Unsortable, ChildStream):
     stream_id = "lists"
     stream_name = "lists"
     endpoint = "/boards/{}/lists"
+    entity_path = "/lists/{}"
     key_properties = ["id"]
     replication_method = "FULL_TABLE"
     parent = "boards"
+    snapshot_key = "lists"
+    snapshot_params = {'lists': 'all'}
+    api_fields = ("id", "closed", "idBoard", "name", "pos", "softLimit", "subscribed")
+
+    def get_parent_records(self, parent_id, parent_record=None):
+        records = self.get_targeted_records(parent_id)
+        if records is None:
+            records = super().get_parent_records(parent_id, parent_record)
+        yield from records
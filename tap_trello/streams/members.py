@@ -1,22 +1,85 @@
 import json
+import threading
+from typing import Dict, List, Optional
+
 import singer
 
-from tap_trello.streams.abstracts import FullTableStream
+from tap_trello.streams.abstracts import FieldProjection, FullTableStream, get_selected_properties
 
 LOGGER = singer.get_logger()
 
+# Field names of member records accepted by the `fields` parameter
+MEMBER_FIELDS = ("id", "aaEmail", "aaEnrolledDate", "aaId", "activityBlocked", "avatarHash", "avatarSource",
+                 "avatarUrl", "bio", "bioData", "confirmed", "email", "fullName", "gravatarHash", "idBoards",
+                 "idBoardsPinned", "idEnterprise", "idEnterprisesAdmin", "idEnterprisesDeactivated",
+                 "idMemberReferrer", "idOrganizations", "idPremOrgsAdmin", "initials", "isAaMastered", "ixUpdate",
+                 "limits", "loginTypes", "marketingOptIn", "memberType", "messagesDismissed", "nonPublic",
+                 "nonPublicAvailable", "oneTimeMessagesDismissed", "prefs", "premiumFeatures", "products",
+                 "status", "trophies", "uploadedAvatarHash", "uploadedAvatarUrl", "url", "username")
+
 
-class Members(FullTableStream):
+class Members(FieldProjection, FullTableStream):
     tap_stream_id = "members"
     key_properties = ["id"]
     replication_method = "FULL_TABLE"
     path = "/members/{id}"
+    batchable = True
     parent = "users"
+    api_fields = MEMBER_FIELDS
+
+    def __init__(self, client=None, catalog=None) -> None:
+        super().__init__(client, catalog)
+        # Users has a record per board a member belongs to, while each member is synced once
+        self.synced_member_ids = set()
+        self._synced_member_ids_lock = threading.Lock()
+
+    def claim_member(self, member_id: str) -> bool:
+        """
+        Whether the member is yet to be synced, marking it as synced
+        """
+        with self._synced_member_ids_lock:
+            if member_id in self.synced_member_ids:
+                return False
+            self.synced_member_ids.add(member_id)
+            return True
+
+    def is_member_complete(self, member: Dict) -> bool:
+        """
+        Whether the embedded member object has every selected property, as a partial
+        object would overwrite the properties it lacks with nulls
+        """
+        properties = self.selected_properties
+        if properties is None:
+            properties = get_selected_properties(self.schema, self.metadata)
+        return properties.issubset(member)
+
+    def get_embedded_records(self, parent_obj: Optional[Dict]) -> Optional[List[Dict]]:
+        """
+        Return no record for a member already synced through another board, the
+        member object embedded in another stream's record when one was seen with
+        every selected property, None when the member must be requested.
+        """
+        member_id = (parent_obj or {}).get("id")
+        if not member_id:
+            return None
+        if not self.claim_member(member_id):
+            self.count_skipped_requests()
+            return []
+        member = self.client.embedded_members.get(member_id)
+        if member is not None and self.is_member_complete(member):
+            self.count_skipped_requests()
+            return [member]
+        return None
 
     def get_records(self):
         """
         Override to support this endpoint which returns a single dict for a single record.
         """
+        embedded_records = self.get_embedded_records(getattr(self, "_sync_parent_obj", None))
+        if embedded_records is not None:
+            yield from embedded_records
+            return
+
         url = self.url_endpoint or self.get_url_endpoint(getattr(self, 'parent_obj', None))
         response = self.client.make_request(
             self.http_method,
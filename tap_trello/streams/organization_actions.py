@@ -1,15 +1,17 @@
+import copy
 import json
-from typing import Dict
+from typing import Dict, Iterator
 
 import singer
-from singer import Transformer
+from singer import Transformer, metrics, utils, write_record
 
-from tap_trello.streams.abstracts import ChildBaseStream
+from tap_trello.streams.abstracts import ChildBaseStream, FieldProjection
+from tap_trello.streams.members import MEMBER_FIELDS
 
 LOGGER = singer.get_logger()
 
 
-class OrganizationActions(ChildBaseStream):
+class OrganizationActions(FieldProjection, ChildBaseStream):
     tap_stream_id = "organization_actions"
     key_properties = ["id", "organization_id"]
     replication_method = "INCREMENTAL"
@@ -17,6 +19,37 @@ class OrganizationActions(ChildBaseStream):
     path = "/organizations/{id}/actions"
     parent = "organizations"
     params = {'limit': 1000}
+    api_fields = ("id", "data", "date", "idMemberCreator", "type")
+    non_api_fields = ("organization_id",)
+    nested_params = {'memberCreator': 'false'}
+    nested_fields = {'memberCreator': ('memberCreator_fields', MEMBER_FIELDS, ())}
+    required_fields = ("id", "date")
+    MAX_API_RESPONSE_SIZE = 1000
+    # Each organization resumes from its own bookmark, so organizations may be requested concurrently
+    parallel_fetch = True
+    organization_bookmarks = None
+
+    def get_organization_bookmark(self, state: Dict, organization_id: str) -> Dict:
+        """
+        Bookmark of an organization: the `date` of its latest action written and, while the
+        actions since are being written, newest first, the `window_end` date of the newest
+        action and the id of the oldest action written (`before`) to resume from.
+        """
+        organizations = singer.get_bookmark(state, self.tap_stream_id, "organizations") or {}
+        if organization_id in organizations:
+            return dict(organizations[organization_id])
+        # Before per-organization bookmarks, every organization resumed from the stream's date
+        return {"date": singer.get_bookmark(state, self.tap_stream_id, "date", self.client.config["start_date"])}
+
+    def write_organization_bookmark(self, state: Dict, organization_id: str, bookmark: Dict) -> None:
+        organizations = singer.get_bookmark(state, self.tap_stream_id, "organizations") or {}
+        singer.write_bookmark(state, self.tap_stream_id, "organizations", {**organizations, organization_id: bookmark})
+        singer.write_state(state)
+
+    def on_parents_started(self, state: Dict) -> None:
+        # Copied, as the organizations may be requested from worker threads while the state is written
+        bookmarks = state.get("bookmarks", {}).get(self.tap_stream_id, {})
+        self.organization_bookmarks = {"bookmarks": {self.tap_stream_id: copy.deepcopy(bookmarks)}}
 
     def sync(
         self,
@@ -24,44 +57,72 @@ class OrganizationActions(ChildBaseStream):
         transformer: Transformer,
         parent_obj: Dict = None,
     ) -> Dict:
-        """Override sync to store state and add date filtering."""
-        self._sync_state = state
-        self._sync_parent_obj = parent_obj
+        self.organization_bookmarks = state
+        return self.write_parent_records(self.get_parent_records(parent_obj), state, transformer, parent_obj)
 
-        return super().sync(state, transformer, parent_obj)
+    def get_records(self) -> Iterator:
+        """
+        Get the actions of the organization since its bookmark, newest first, requesting
+        each page before the id of the oldest action of the previous one.
+        """
+        parent_obj = getattr(self, '_sync_parent_obj', None) or {}
+        bookmark = self.get_organization_bookmark(self.organization_bookmarks or {}, parent_obj.get('id'))
+        params = {key: value for key, value in self.params.items() if key != 'page'}
+        params['since'] = bookmark['date']
+        if bookmark.get('before'):
+            LOGGER.info("%s - Resuming organization %s before action %s",
+                        self.tap_stream_id, parent_obj.get('id'), bookmark['before'])
+            params['before'] = bookmark['before']
 
-    def get_records(self):
-        """Get records with date filtering for incremental replication."""
-        url = self.get_url_endpoint(getattr(self, '_sync_parent_obj', None))
-        params = dict(self.params) if hasattr(self, 'params') else {}
-        params.pop('page', None)
+        while True:
+            response = self.client.iter_request(
+                self.http_method,
+                self.url_endpoint,
+                params=params,
+                headers=self.headers,
+                body=json.dumps(self.data_payload),
+                path=self.path,
+            )
+            raw_records, _ = self._normalize_response(response, self.url_endpoint)
+            record_count = 0
+            for record in raw_records:
+                record_count += 1
+                params['before'] = record['id']
+                yield record
 
-        # Add date filtering for incremental replication
-        # Access state from the temporarily stored sync state
-        state = getattr(self, '_sync_state', {})
-        bookmark_date = self.get_bookmark(state, self.tap_stream_id)
-        if bookmark_date:
-            params['since'] = bookmark_date
-        else:
-            # Use start_date from config if no bookmark exists
-            start_date = self.client.config.get('start_date')
-            if start_date:
-                params['since'] = start_date
+            if record_count < self.MAX_API_RESPONSE_SIZE:
+                return
+            LOGGER.info("%s - Paginating organization %s before action %s",
+                        self.tap_stream_id, parent_obj.get('id'), params['before'])
 
-        response = self.client.make_request(
-            self.http_method,
-            url,
-            params=params,
-            headers=self.headers,
-            body=json.dumps(self.data_payload),
-            path=self.path,
-        )
+    def write_parent_records(self, records, state: Dict, transformer: Transformer, parent_obj: Dict = None) -> int:
+        """
+        Write the actions of an organization, newest first, checkpointing its bookmark after each page
+        """
+        organization_id = parent_obj['id']
+        bookmark = self.get_organization_bookmark(state, organization_id)
+        window_end = bookmark.get('window_end')
+        with metrics.record_counter(self.tap_stream_id) as counter:
+            for index, record in enumerate(records, 1):
+                transformed_record = transformer.transform(record, self.schema, self.metadata)
+                if self.is_selected():
+                    write_record(self.tap_stream_id, transformed_record)
+                    counter.increment()
+                if window_end is None or utils.strptime_to_utc(record['date']) > utils.strptime_to_utc(window_end):
+                    window_end = record['date']
+                if index % self.MAX_API_RESPONSE_SIZE == 0:
+                    self.write_organization_bookmark(
+                        state, organization_id, {**bookmark, 'window_end': window_end, 'before': record['id']})
 
-        raw_records, _ = self._normalize_response(response, url)
-        yield from raw_records
+            date = bookmark['date']
+            if window_end is not None and utils.strptime_to_utc(window_end) > utils.strptime_to_utc(date):
+                date = window_end
+            self.write_organization_bookmark(state, organization_id, {'date': date})
+            return counter.value
 
     def modify_object(self, record, parent_record=None):
         """Add organization_id to organization action records."""
+        self.client.embedded_members.add_from_action(record)
         if parent_record and 'id' in parent_record:
             record["organization_id"] = parent_record['id']
         return record
@@ -1,14 +1,18 @@
-from tap_trello.streams.abstracts import FullTableStream
+from tap_trello.streams.abstracts import FieldProjection, FullTableStream
+from tap_trello.streams.members import MEMBER_FIELDS
 
-class OrganizationMembers(FullTableStream):
+class OrganizationMembers(FieldProjection, FullTableStream):
     tap_stream_id = "organization_members"
     key_properties = ["id", "organization_id"]
     replication_method = "FULL_TABLE"
     path = "/organizations/{id}/members"
     parent = "organizations"
+    api_fields = MEMBER_FIELDS
+    non_api_fields = ("organization_id",)
 
     def modify_object(self, record, parent_record=None):
         """Add organization_id to organization member records."""
+        self.client.embedded_members.add(record)
         if parent_record and 'id' in parent_record:
             record["organization_id"] = parent_record['id']
         return record
@@ -1,13 +1,17 @@
-from tap_trello.streams.abstracts import Unsortable, ChildStream
+from tap_trello.streams.abstracts import FieldProjection, Unsortable, ChildStream
 
 
-class Users(Unsortable, ChildStream):
+class Users(FieldProjection, Unsortable, ChildStream):
     stream_id = "users"
     stream_name = "users"
     endpoint = "/boards/{}/members"
     key_properties = ["id", "boardId"]
     replication_method = "FULL_TABLE"
     parent = "boards"
+    snapshot_key = "members"
+    snapshot_params = {'members': 'all'}
+    api_fields = ("id", "fullName", "username")
+    non_api_fields = ("boardId",)
 
     def modify_record(self, record, **kwargs):
         """Add boardId to user records."""
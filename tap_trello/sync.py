@@ -1,36 +1,62 @@
-from typing import Dict
+from collections import deque
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 import singer
 
-from tap_trello.client import Client
+from tap_trello.board_activity import BoardActivity
+from tap_trello.board_snapshot import SNAPSHOT_COLLECTION_LIMIT, get_board_snapshot, get_snapshot_params
+from tap_trello.card_watermarks import CardWatermarks
+from tap_trello.client import BATCH_SIZE, Client
 from tap_trello.streams import STREAMS
-from tap_trello.streams.abstracts import LegacyStream
+from tap_trello.streams.abstracts import (ActionTargeted, FieldProjection, FullTableStream, LegacyStream,
+                                          get_batched_parent_records, get_created_from_id,
+                                          write_skipped_requests_metric)
+from tap_trello.targeted_refresh import TargetedRefresh
+from tap_trello.utils import WRITE_LOCK, get_config_flag
 
 LOGGER = singer.get_logger()
 
+ACTIONS = "actions"
+BOARDS = "boards"
+CARDS = "cards"
+CHECKLISTS = "checklists"
+
+# Chunks of `BATCH_SIZE` records whose children are requested ahead of the chunk being written
+PREFETCH_CHUNKS = 2
+
 
 def _instantiate_stream(stream_class, client, catalog_entry, config, state):
     """Instantiate a stream class handling legacy and latest constructors.
 
     LegacyStream classes expect (client, config, state).
     Latest streams expect (client, catalog_entry).
+    With `request_selected_fields`, the stream requests the fields selected in `catalog_entry` only.
     """
+    stream = None
     try:
         if isinstance(stream_class, type) and issubclass(stream_class, LegacyStream):
-            return stream_class(client, config, state)
+            stream = stream_class(client, config, state)
     except Exception:
         # If any problem with issubclass check, fall back to latest constructor
         pass
 
-    return stream_class(client, catalog_entry)
+    if stream is None:
+        stream = stream_class(client, catalog_entry)
+    if (isinstance(stream, FieldProjection) and catalog_entry is not None
+            and get_config_flag(config or {}, "request_selected_fields")):
+        stream.select_fields(*get_schema_and_metadata(catalog_entry))
+    return stream
 
 
 def update_currently_syncing(state: Dict, stream_name: str) -> None:
     """
     Update currently_syncing in state and write it
     """
-    if not stream_name and singer.get_currently_syncing(state):
-        del state["currently_syncing"]
+    if not stream_name:
+        # A concurrent tree may have cleared it already
+        if singer.get_currently_syncing(state):
+            del state["currently_syncing"]
     else:
         singer.set_currently_syncing(state, stream_name)
     singer.write_state(state)
@@ -69,6 +95,625 @@ def write_schema(stream, client, streams_to_sync, catalog, config=None, state=No
             stream.child_to_sync.append(child_obj)
 
 
+def get_parent_stream_id(stream_class) -> Optional[str]:
+    """
+    Resolve the `parent` declaration of a stream class to its tap_stream_id
+    """
+    parent_attribute = getattr(stream_class, 'parent', None)
+    if isinstance(parent_attribute, str):
+        return parent_attribute or None
+    if isinstance(parent_attribute, type) and hasattr(parent_attribute, 'stream_id'):
+        return parent_attribute.stream_id
+    return None
+
+
+def get_schema_and_metadata(catalog_entry) -> Tuple[Dict, Dict]:
+    """
+    Return the schema dict and metadata map of a catalog entry
+    """
+    schema_obj = getattr(catalog_entry, 'schema', None)
+    schema_dict = schema_obj.to_dict() if hasattr(schema_obj, 'to_dict') else schema_obj
+    metadata_list = getattr(catalog_entry, 'metadata', None)
+    metadata_map = singer.metadata.to_map(metadata_list) if metadata_list else {}
+    return schema_dict, metadata_map
+
+
+def get_ancestor_stream_ids(stream_name: str) -> List[str]:
+    """
+    Return the parent, grandparent, ... of a stream
+    """
+    ancestors = []
+    parent_id = get_parent_stream_id(STREAMS[stream_name])
+    while parent_id and parent_id in STREAMS:
+        ancestors.append(parent_id)
+        parent_id = get_parent_stream_id(STREAMS[parent_id])
+    return ancestors
+
+
+class ChildSync:
+    """
+    Syncs one selected child stream a single parent record at a time, so that
+    every child of a parent can be fed from one enumeration of that parent.
+    ~~~
+    Records are requested by `iter_parent`/`fetch_parent`, which may run in a
+    worker thread, and written by `write_parent`, which only runs in the tree's thread.
+    `WRITE_LOCK` is only held to write the records and the state, not to request them.
+    Legacy child streams keep their `parent_id` bookmark: a child resuming an
+    interrupted run ignores the parents that come before its bookmarked parent.
+    The records of a legacy child are handed on to its own `children`, so
+    grandchildren (e.g. card_attachments) reuse them instead of re-syncing it.
+    """
+
+    def __init__(self, stream_name: str, stream, catalog_entry, state: Dict, transformer) -> None:
+        self.stream_name = stream_name
+        self.stream = stream
+        self.state = state
+        self.transformer = transformer
+        self.schema, self.metadata_map = get_schema_and_metadata(catalog_entry)
+        self.total_records = 0
+        self.children = []
+        self.batch_requests = False
+        # Whether the records are only requested while writing, after those of the children before
+        self.deferred = False
+        self._resume_parent_id = None
+
+    @property
+    def is_legacy(self) -> bool:
+        return isinstance(self.stream, LegacyStream)
+
+    @property
+    def parallel_fetch(self) -> bool:
+        return bool(getattr(self.stream, 'parallel_fetch', False)) and not self.deferred
+
+    @property
+    def is_full_table(self) -> bool:
+        return getattr(self.stream, 'replication_method', None) == "FULL_TABLE"
+
+    def start(self, parent_ids: List[str]) -> None:
+        LOGGER.info("START Syncing: {}".format(self.stream_name))
+        if self.is_legacy:
+            self.stream.on_window_started()
+            bookmarked_parent = self.stream.get_bookmarked_parent_id()
+            if bookmarked_parent and bookmarked_parent in parent_ids:
+                # NB: This will cause some rework, but it will guarantee the tap doesn't miss records if interrupted.
+                self._resume_parent_id = bookmarked_parent
+        else:
+            self.stream.on_parents_started(self.state)
+        for child in self.children:
+            child.start([])
+
+    def wants_parent(self, parent_record: Dict) -> bool:
+        """
+        Whether to sync the parent, which is not the case for the parents before
+        the bookmarked parent of a resumed child. Must be called in parent order.
+        """
+        if self._resume_parent_id:
+            if parent_record['id'] != self._resume_parent_id:
+                return False
+            self._resume_parent_id = None
+        return True
+
+    @property
+    def batch_fetch(self) -> bool:
+        return (self.batch_requests and getattr(self.stream, 'batchable', False) and not self.children
+                and not self.deferred)
+
+    def iter_parent(self, parent_record: Dict, executor: Optional[Executor] = None) -> Iterator[Tuple[Dict, Dict]]:
+        """
+        Request the records of one parent, each paired with the records of this
+        stream's children for it. Those are requested on `executor` when given, lazily otherwise,
+        the children supporting it requesting the records of `BATCH_SIZE` parents at once.
+        The children of at most `PREFETCH_CHUNKS` chunks are requested ahead of the records yielded.
+        """
+        if self.is_legacy:
+            records = self.stream.get_parent_records(parent_record['id'], parent_record)
+        else:
+            records = self.stream.get_parent_records(parent_record)
+
+        pending = deque()
+        for chunk in iter_chunks(records, BATCH_SIZE):
+            pending.append(self.request_children(chunk, executor))
+            if len(pending) > PREFETCH_CHUNKS:
+                yield from pending.popleft()
+        while pending:
+            yield from pending.popleft()
+
+    def request_children(self, chunk: List[Dict], executor: Optional[Executor]) -> List[Tuple[Dict, Dict]]:
+        batch_children = [child for child in self.children if child.batch_fetch]
+        if batch_children and executor is not None:
+            batched = executor.submit(fetch_batched_children, batch_children, chunk)
+        else:
+            batched = fetch_batched_children(batch_children, chunk)
+
+        requested = []
+        for index, rec in enumerate(chunk):
+            children_records = {}
+            for child in self.children:
+                if child.batch_fetch:
+                    children_records[child.stream_name] = BatchedRecords(batched, child.stream_name, index)
+                elif executor is not None and child.parallel_fetch:
+                    children_records[child.stream_name] = executor.submit(child.fetch_parent, rec)
+                else:
+                    children_records[child.stream_name] = child.iter_parent(rec)
+            requested.append((rec, children_records))
+        return requested
+
+    def fetch_parent(self, parent_record: Dict, executor: Optional[Executor] = None) -> Iterable[Tuple[Dict, Dict]]:
+        """
+        Request the records of one parent from a worker thread. Those of a stream with children
+        (e.g. the cards of a board) are streamed to the writer instead, so that a large parent
+        is never held whole, nor are the requests of all of its children queued at once.
+        """
+        if self.children:
+            return self.iter_parent(parent_record, executor)
+        return list(self.iter_parent(parent_record, executor))
+
+    def write_parent(self, parent_record: Dict, fetched=None) -> None:
+        """
+        Write the records of one parent, requesting them first unless a worker already did.
+        """
+        if isinstance(fetched, (Future, BatchedRecords)):
+            fetched = fetched.result()
+
+        if not self.is_legacy and not self.parallel_fetch and not self.deferred:
+            # Incremental streams write their bookmark while requesting their records
+            with WRITE_LOCK:
+                self.total_records += self.stream.sync(
+                    state=self.state, transformer=self.transformer, parent_obj=parent_record)
+            return
+
+        if fetched is None:
+            fetched = self.iter_parent(parent_record)
+
+        if self.is_legacy:
+            with WRITE_LOCK:
+                self.stream.checkpoint_parent(parent_record['id'])
+            with singer.metrics.record_counter(self.stream_name) as counter:
+                for rec, children_records in fetched:
+                    with WRITE_LOCK:
+                        transformed_record = self.transformer.transform(rec, self.schema, self.metadata_map)
+                        singer.write_record(self.stream_name, transformed_record)
+                    counter.increment()
+                    for child in self.children:
+                        child.write_parent(rec, children_records.get(child.stream_name))
+                self.total_records += counter.value
+            with WRITE_LOCK:
+                self.stream.on_parent_written(parent_record['id'])
+        else:
+            records = [rec for rec, _ in fetched]
+            with WRITE_LOCK:
+                self.total_records += self.stream.write_parent_records(
+                    records, self.state, self.transformer, parent_record)
+
+    def finish(self) -> None:
+        for child in self.children:
+            child.finish()
+        if self.is_legacy:
+            self.stream.on_parents_finished()
+        write_skipped_requests_metric(self.stream_name, self.stream.skipped_requests)
+        LOGGER.info(
+            "FINISHED Syncing: {}, total_records: {}".format(
+                self.stream_name, self.total_records
+            )
+        )
+
+    def get_stream_names(self) -> List[str]:
+        """
+        Names of this stream and all of its descendants
+        """
+        names = [self.stream_name]
+        for child in self.children:
+            names.extend(child.get_stream_names())
+        return names
+
+
+class BatchedRecords:
+    """
+    Fetched records of one parent of a child stream, among those that
+    `fetch_batched_children` requested for several parents at once
+    """
+
+    def __init__(self, batched, stream_name: str, index: int) -> None:
+        self.batched = batched
+        self.stream_name = stream_name
+        self.index = index
+
+    def result(self) -> List[Tuple[Dict, Dict]]:
+        batched = self.batched.result() if isinstance(self.batched, Future) else self.batched
+        return batched[self.stream_name][self.index]
+
+
+def iter_chunks(records: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def fetch_batched_children(children: List[ChildSync], parent_records: List[Dict]) -> Dict[str, List]:
+    """
+    Request the records of every child for every parent together through
+    `/batch` requests, returning for each child the fetched records of each parent
+    """
+    if not children:
+        return {}
+    requests = [(child.stream, parent) for child in children for parent in parent_records]
+    records = get_batched_parent_records(children[0].stream.client, requests)
+    fetched = {}
+    for position, child in enumerate(children):
+        records_per_parent = records[position * len(parent_records):(position + 1) * len(parent_records)]
+        fetched[child.stream_name] = [[(rec, {}) for rec in child_records] for child_records in records_per_parent]
+    return fetched
+
+
+def get_child_syncs(parent_name: str, client: Client, config: Dict, catalog: singer.Catalog,
+                    state: Dict, transformer, streams_to_sync: List[str]) -> List[ChildSync]:
+    """
+    Build a ChildSync for every selected child of `parent_name`, nesting their own selected children
+    """
+    child_syncs = []
+    for stream_name in streams_to_sync:
+        if get_parent_stream_id(STREAMS[stream_name]) != parent_name:
+            continue
+        catalog_entry = catalog.get_stream(stream_name)
+        stream = _instantiate_stream(STREAMS[stream_name], client, catalog_entry, config, state)
+        write_schema(stream, client, streams_to_sync, catalog, config, state)
+        child_sync = ChildSync(stream_name, stream, catalog_entry, state, transformer)
+        child_sync.batch_requests = get_config_flag(config, "batch_requests")
+        if child_sync.is_legacy:
+            child_sync.children = get_child_syncs(
+                stream_name, client, config, catalog, state, transformer, streams_to_sync)
+            stream.child_to_sync = [grandchild.stream for grandchild in child_sync.children]
+        child_syncs.append(child_sync)
+    return child_syncs
+
+
+def get_max_workers(config: Dict) -> int:
+    """
+    Number of parents requested concurrently, 1 (sequential) unless configured
+    """
+    return max(int(config.get("max_workers") or 1), 1)
+
+
+class StreamTreeSync:
+    """
+    Syncs a root stream (boards, organizations) and all of its selected
+    descendants in a single pass: the root records are listed once and each of
+    them is dispatched to every selected child, whose records in turn feed their
+    own selected children (cards feed card_attachments and card_custom_field_items,
+    users feed members).
+    ~~~
+    With `max_workers` above 1, worker threads request the records of several
+    parents (and of the cards of a board) concurrently, while the main thread
+    alone writes records and state, in parent order. A parent is thus only
+    checkpointed once every parent before it has been completely written.
+    Independent trees may be synced concurrently, taking turns to write under `WRITE_LOCK`.
+    """
+
+    def __init__(self, root_name: str, client: Client, config: Dict, catalog: singer.Catalog,
+                 state: Dict, transformer, streams_to_sync: List[str]) -> None:
+        self.root_name = root_name
+        self.client = client
+        self.config = config
+        self.catalog = catalog
+        self.state = state
+        self.transformer = transformer
+        self.max_workers = get_max_workers(config)
+
+        with WRITE_LOCK:
+            self.root_stream = _instantiate_stream(
+                STREAMS[root_name], client, catalog.get_stream(root_name), config, state)
+            write_schema(self.root_stream, client, streams_to_sync, catalog, config, state)
+            # The root records are dispatched to the children by the tree, not by the root stream
+            self.root_stream.child_to_sync = []
+            self.children = get_child_syncs(root_name, client, config, catalog, state, transformer, streams_to_sync)
+
+        # Cards go first on every board so checklists can skip boards whose cards reference no checklist
+        self.children = sorted(self.children, key=lambda child: child.stream_name != CARDS)
+        cards_sync = next((child for child in self.children if child.stream_name == CARDS), None)
+        cards = cards_sync and cards_sync.stream
+        self.card_watermarks = None
+        for child in self.children:
+            if cards is not None and child.stream_name == CHECKLISTS:
+                child.stream.board_checklist_counts = cards.board_checklist_counts
+                # Cards with children are streamed while written, so the checklists wait for them to be counted
+                child.deferred = child.deferred or bool(cards_sync.children)
+            if child.stream_name == CARDS and child.children and config.get("card_watermarks_dir"):
+                # The card children may skip the cards which did not change since they were last synced
+                cards.card_watermarks = self.card_watermarks = CardWatermarks(
+                    config["card_watermarks_dir"], [card_child.stream_name for card_child in child.children], state)
+                for card_child in child.children:
+                    card_child.stream.card_watermarks = cards.card_watermarks
+                cards.required_fields = (*cards.required_fields, "dateLastActivity")
+
+        # In snapshot mode a single `/boards/{id}` request loads the collections of all children
+        self.snapshot_params = {}
+        if root_name == BOARDS and get_config_flag(config, "board_snapshot"):
+            self.snapshot_params = get_snapshot_params(child.stream for child in self.children)
+        self.max_snapshot_cards = int(config.get("board_snapshot_max_cards") or SNAPSHOT_COLLECTION_LIMIT)
+
+        # The full table children may skip the boards which did not change since they were last synced
+        self.board_activity = None
+        if root_name == BOARDS and get_config_flag(config, "skip_unchanged_boards"):
+            self.board_activity = BoardActivity.from_config(
+                config, state, [child.stream_name for child in self.children if child.is_full_table])
+
+        # The full table children may request only the records named by the board's new actions
+        self.targeted_refresh = None
+        if root_name == BOARDS and get_config_flag(config, "targeted_refresh"):
+            self.set_up_targeted_refresh()
+
+    def set_up_targeted_refresh(self) -> None:
+        actions = next((child for child in self.children if child.stream_name == ACTIONS), None)
+        if actions is None:
+            LOGGER.warning("targeted_refresh requires the actions stream to be selected, listing every board")
+            return
+        targeted = [child for child in self.children if isinstance(child.stream, ActionTargeted)]
+        self.targeted_refresh = TargetedRefresh.from_config(
+            self.config, self.state, [child.stream_name for child in targeted])
+        LOGGER.info("%s - %s", BOARDS, "Listing every board for a full reconcile" if self.targeted_refresh.full_reconcile
+                    else "Refreshing the records named by the new actions of each board")
+        actions.stream.targeted_refresh = self.targeted_refresh
+        if isinstance(actions.stream, FieldProjection):
+            # The records are named by the actions' data, selected or not
+            actions.stream.required_fields = (*actions.stream.required_fields, "data")
+            actions.stream.params = {**actions.stream.params, **actions.stream.get_field_params()}
+        for child in targeted:
+            child.stream.targeted_refresh = self.targeted_refresh
+            child.deferred = child.deferred or not self.targeted_refresh.full_reconcile
+        # The actions of a board are written first, naming the records its other children refresh
+        self.children = sorted(self.children, key=lambda child: child.stream_name != ACTIONS)
+
+    def get_stream_names(self) -> List[str]:
+        stream_names = [self.root_name]
+        for child in self.children:
+            stream_names.extend(child.get_stream_names())
+        return stream_names
+
+    def sync_root(self) -> List[Dict]:
+        """
+        Write and return the root records, which are requested before taking the write lock
+        """
+        LOGGER.info("START Syncing: {}".format(self.root_name))
+        if isinstance(self.root_stream, LegacyStream):
+            parents = list(self.root_stream.sync())
+            schema_dict, metadata_map = get_schema_and_metadata(self.catalog.get_stream(self.root_name))
+            with WRITE_LOCK, singer.metrics.record_counter(self.root_name) as counter:
+                for rec in parents:
+                    transformed_record = self.transformer.transform(rec, schema_dict, metadata_map)
+                    singer.write_record(self.root_name, transformed_record)
+                    counter.increment()
+                total_records = counter.value
+        else:
+            parents = list(self.root_stream.get_parent_records())
+            with WRITE_LOCK:
+                total_records = self.root_stream.write_parent_records(parents, self.state, self.transformer)
+        LOGGER.info(
+            "FINISHED Syncing: {}, total_records: {}".format(
+                self.root_name, total_records
+            )
+        )
+        return parents
+
+    def prepare_parent(self, parent_record: Dict) -> Dict:
+        if self.snapshot_params:
+            return get_board_snapshot(self.client, parent_record, self.snapshot_params, self.max_snapshot_cards)
+        return parent_record
+
+    def fetch_parent(self, parent_record: Dict, children: List[ChildSync],
+                     executor: Optional[Executor]) -> Tuple[Dict, Dict]:
+        """
+        Request the records of every child able to be requested from a worker thread
+        """
+        parent_record = self.prepare_parent(parent_record)
+        fetched = self.fetch_batched(parent_record, children)
+        for child in children:
+            if child.parallel_fetch and child.stream_name not in fetched:
+                fetched[child.stream_name] = child.fetch_parent(parent_record, executor)
+        return parent_record, fetched
+
+    @staticmethod
+    def fetch_batched(parent_record: Dict, children: List[ChildSync]) -> Dict:
+        """
+        Request the records of the children supporting it in a single `/batch` request
+        """
+        batch_children = [child for child in children if child.batch_fetch]
+        return {stream_name: records_per_parent[0] for stream_name, records_per_parent
+                in fetch_batched_children(batch_children, [parent_record]).items()}
+
+    def write_parent(self, parent_record: Dict, children: List[ChildSync], fetched: Dict) -> None:
+        for child in children:
+            child.write_parent(parent_record, fetched.get(child.stream_name))
+
+    def sync(self) -> List[str]:
+        """
+        Sync the tree and return the names of the streams synced
+        """
+        with WRITE_LOCK:
+            update_currently_syncing(self.state, self.root_name)
+        parents = self.sync_root()
+
+        # Children checkpoint their `parent_id`, so parents are visited in creation order
+        parents = sorted(parents, key=lambda parent: get_created_from_id(parent['id']))
+        parent_ids = [parent['id'] for parent in parents]
+
+        with WRITE_LOCK:
+            for child in self.children:
+                child.start(parent_ids)
+        if self.max_workers > 1:
+            self.sync_parents_concurrently(parents)
+        else:
+            for parent in parents:
+                children = self.get_parent_children(parent)
+                if children:
+                    parent = self.prepare_parent(parent)
+                    self.write_parent(parent, children, self.fetch_batched(parent, children))
+        with WRITE_LOCK:
+            for child in self.children:
+                child.finish()
+            if self.board_activity is not None:
+                self.board_activity.commit()
+            if self.card_watermarks is not None:
+                self.card_watermarks.finish()
+            if self.targeted_refresh is not None:
+                self.targeted_refresh.commit()
+
+            update_currently_syncing(self.state, None)
+        return self.get_stream_names()
+
+    def get_parent_children(self, parent_record: Dict) -> List[ChildSync]:
+        """
+        Children to sync for a parent, leaving out those resuming from a later
+        parent and, in change detection mode, those the board did not change for
+        """
+        children = [child for child in self.children if child.wants_parent(parent_record)]
+        if self.board_activity is None:
+            return children
+
+        unchanged = [child for child in children
+                     if child.is_full_table and self.board_activity.is_unchanged(parent_record, child.stream_name)]
+        self.board_activity.record(parent_record, synced=len(children) == len(self.children), skipped=bool(unchanged))
+        return [child for child in children if child not in unchanged]
+
+    def sync_parents_concurrently(self, parents: List[Dict]) -> None:
+        """
+        Request up to `max_workers` parents ahead of the one being written
+        """
+        LOGGER.info("%s - Requesting up to %s parents concurrently", self.root_name, self.max_workers)
+        parent_executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        child_executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        pending = deque()
+        try:
+            for parent in parents:
+                children = self.get_parent_children(parent)
+                if not children:
+                    continue
+                pending.append((children, parent_executor.submit(self.fetch_parent, parent, children, child_executor)))
+                if len(pending) > self.max_workers:
+                    self.write_next_parent(pending)
+            while pending:
+                self.write_next_parent(pending)
+        finally:
+            parent_executor.shutdown(wait=True, cancel_futures=True)
+            child_executor.shutdown(wait=True, cancel_futures=True)
+
+    def write_next_parent(self, pending: deque) -> None:
+        children, future = pending.popleft()
+        parent_record, fetched = future.result()
+        self.write_parent(parent_record, children, fetched)
+
+
+class SyncPlanNode:
+    """
+    A selected stream of the execution plan, with its selected children
+    """
+
+    def __init__(self, stream_name: str) -> None:
+        self.stream_name = stream_name
+        self.children = []
+
+    def get_stream_names(self) -> List[str]:
+        names = [self.stream_name]
+        for child in self.children:
+            names.extend(child.get_stream_names())
+        return names
+
+    def format(self, depth: int = 0) -> List[str]:
+        lines = ["{}- {}".format("  " * depth, self.stream_name)]
+        for child in self.children:
+            lines.extend(child.format(depth + 1))
+        return lines
+
+
+def get_sync_plan(streams_to_sync: List[str]) -> List[SyncPlanNode]:
+    """
+    Build the execution plan from the `parent` declarations of STREAMS: a tree
+    per selected root stream, in which each parent is enumerated once for all of
+    its selected children. Trees are ordered by their first stream in the catalog
+    and share nothing, so they may run concurrently.
+    A stream whose parent (or any further ancestor) is not selected is left out.
+    """
+    nodes = {}
+    for stream_name in streams_to_sync:
+        if any(ancestor_id not in streams_to_sync for ancestor_id in get_ancestor_stream_ids(stream_name)):
+            LOGGER.info("Skipping stream: {}".format(stream_name))
+            continue
+        nodes[stream_name] = SyncPlanNode(stream_name)
+
+    roots = []
+    for stream_name, node in nodes.items():
+        parent_id = get_parent_stream_id(STREAMS[stream_name])
+        if parent_id:
+            nodes[parent_id].children.append(node)
+    for stream_name in nodes:
+        root_id = (get_ancestor_stream_ids(stream_name) or [stream_name])[-1]
+        if nodes[root_id] not in roots:
+            roots.append(nodes[root_id])
+    return roots
+
+
+def format_sync_plan(plan: List[SyncPlanNode], concurrent: bool) -> str:
+    lines = ["Sync plan, {} tree(s) run {}:".format(
+        len(plan), "concurrently" if concurrent and len(plan) > 1 else "one after the other")]
+    for node in plan:
+        lines.extend(node.format(1))
+    return "\n".join(lines)
+
+
+def sync_stream(stream_name: str, client: Client, config: Dict, catalog: singer.Catalog,
+                state: Dict, transformer, streams_to_sync: List[str]) -> None:
+    """
+    Sync a stream without any selected parent nor child
+    """
+    with WRITE_LOCK:
+        stream = _instantiate_stream(STREAMS[stream_name], client, catalog.get_stream(stream_name), config, state)
+
+        write_schema(stream, client, streams_to_sync, catalog, config, state)
+        LOGGER.info("START Syncing: {}".format(stream_name))
+        update_currently_syncing(state, stream_name)
+
+    if isinstance(stream, LegacyStream):
+        # Legacy streams: sync() returns generator, manually write records
+        schema_dict, metadata_map = get_schema_and_metadata(catalog.get_stream(stream_name))
+
+        with singer.metrics.record_counter(stream_name) as counter:
+            for rec in stream.sync():
+                with WRITE_LOCK:
+                    transformed_record = transformer.transform(rec, schema_dict, metadata_map)
+                    singer.write_record(stream_name, transformed_record)
+                counter.increment()
+            total_records = counter.value
+    elif isinstance(stream, FullTableStream):
+        # Requested before taking the write lock, as the records of a tree's root
+        records = list(stream.get_parent_records())
+        with WRITE_LOCK:
+            total_records = stream.write_parent_records(records, state, transformer)
+    else:
+        # Incremental streams write their bookmark while requesting their records
+        with WRITE_LOCK:
+            total_records = stream.sync(state=state, transformer=transformer)
+
+    with WRITE_LOCK:
+        update_currently_syncing(state, None)
+    LOGGER.info(
+        "FINISHED Syncing: {}, total_records: {}".format(
+            stream_name, total_records
+        )
+    )
+
+
+def sync_plan_node(node: SyncPlanNode, client: Client, config: Dict, catalog: singer.Catalog,
+                   state: Dict, transformer, streams_to_sync: List[str]) -> None:
+    if node.children:
+        StreamTreeSync(node.stream_name, client, config, catalog, state, transformer, streams_to_sync).sync()
+    else:
+        sync_stream(node.stream_name, client, config, catalog, state, transformer, streams_to_sync)
+
+
 def sync(client: Client, config: Dict, catalog: singer.Catalog, state) -> None:
     """
     Sync selected streams from catalog
@@ -81,75 +726,20 @@ def sync(client: Client, config: Dict, catalog: singer.Catalog, state) -> None:
     last_stream = singer.get_currently_syncing(state)
     LOGGER.info("last/currently syncing stream: {}".format(last_stream))
 
-    with singer.Transformer() as transformer:
-        for stream_name in streams_to_sync:
-            stream_class = STREAMS[stream_name]
-
-            # Check if stream has a parent - child streams need special handling
-            parent_attribute = getattr(stream_class, 'parent', None)
-            if parent_attribute:
-                parent_id = None
-                if isinstance(parent_attribute, str):
-                    parent_id = parent_attribute
-                elif isinstance(parent_attribute, type) and hasattr(parent_attribute, 'stream_id'):
-                    parent_id = parent_attribute.stream_id
-
-                # Skip child stream if parent is not selected
-                if parent_id and parent_id not in streams_to_sync:
-                    LOGGER.info("Skipping stream: {}".format(stream_name))
-                    continue
-
-            stream = _instantiate_stream(stream_class, client, catalog.get_stream(stream_name), config, state)
+    plan = get_sync_plan(streams_to_sync)
+    concurrent = get_config_flag(config, "concurrent_stream_trees") and len(plan) > 1
+    LOGGER.info(format_sync_plan(plan, concurrent))
+    if get_config_flag(config, "dry_run"):
+        return
 
-            write_schema(stream, client, streams_to_sync, catalog, config, state)
-            LOGGER.info("START Syncing: {}".format(stream_name))
-            update_currently_syncing(state, stream_name)
+    with singer.Transformer() as transformer:
+        if not concurrent:
+            for node in plan:
+                sync_plan_node(node, client, config, catalog, state, transformer, streams_to_sync)
+            return
 
-            if isinstance(stream, LegacyStream):
-                # Legacy streams: sync() returns generator, manually write records
-                catalog_entry = catalog.get_stream(stream_name)
-                schema_obj = getattr(catalog_entry, 'schema', None)
-                schema_dict = schema_obj.to_dict() if hasattr(schema_obj, 'to_dict') else schema_obj
-                metadata_list = getattr(catalog_entry, 'metadata', None)
-
-                metadata_map = singer.metadata.to_map(metadata_list) if metadata_list else {}
-
-                with singer.metrics.record_counter(stream_name) as counter:
-                    for rec in stream.sync():
-                        transformed_record = transformer.transform(rec, schema_dict, metadata_map)
-                        singer.write_record(stream_name, transformed_record)
-                        counter.increment()
-                    total_records = counter.value
-            else:
-                # Latest streams: sync() handles everything and returns count
-                if parent_attribute:
-                    parent_id = None
-                    if isinstance(parent_attribute, str):
-                        parent_id = parent_attribute
-                    elif isinstance(parent_attribute, type) and hasattr(parent_attribute, 'stream_id'):
-                        parent_id = parent_attribute.stream_id
-
-                    if parent_id and parent_id in STREAMS:
-                        parent_class = STREAMS[parent_id]
-                        parent_stream = _instantiate_stream(parent_class, client, catalog.get_stream(parent_id), config, state)
-
-                        total_records = 0
-                        if isinstance(parent_stream, LegacyStream):
-                            parent_iter = parent_stream.sync()
-                        else:
-                            parent_iter = parent_stream.get_records()
-
-                        for parent_obj in parent_iter:
-                            total_records += stream.sync(state=state, transformer=transformer, parent_obj=parent_obj)
-                    else:
-                        total_records = stream.sync(state=state, transformer=transformer)
-                else:
-                    # Not a child stream, sync normally
-                    total_records = stream.sync(state=state, transformer=transformer)
-
-            update_currently_syncing(state, None)
-            LOGGER.info(
-                "FINISHED Syncing: {}, total_records: {}".format(
-                    stream_name, total_records
-                )
-            )
+        with ThreadPoolExecutor(max_workers=len(plan), thread_name_prefix="stream-tree") as executor:
+            futures = [executor.submit(sync_plan_node, node, client, config, catalog, state, transformer,
+                                       streams_to_sync) for node in plan]
+            for future in futures:
+                future.result()
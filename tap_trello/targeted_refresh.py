@@ -0,0 +1,79 @@
+import threading
+from datetime import timedelta
+from typing import Dict, Iterable, Optional, Set
+
+import singer
+from singer import utils
+
+LOGGER = singer.get_logger()
+
+BOARDS = "boards"
+# Object of an action's `data` naming the record it changed, for each stream which may refresh only those
+ENTITY_KEYS = {"cards": "card", "lists": "list", "checklists": "checklist", "board_labels": "label"}
+# Days after which the targeted streams list every board again, as the actions may not name every change
+DEFAULT_RECONCILE_DAYS = 7
+
+
+class TargetedRefresh:
+    """
+    Ids of the records named by the new actions of each board, which the full
+    table children in `ENTITY_KEYS` request one by one instead of listing the
+    whole board. The actions of a board are thus written before its other children.
+    ~~~
+    A stream lists the whole board when a full reconcile is due, when it was not
+    synced by the previous targeted sync or when the board's actions were not
+    all requested by this sync (e.g. when resuming an interrupted sync).
+    """
+
+    def __init__(self, state: Dict, stream_names: Iterable[str], reconcile_days: int = DEFAULT_RECONCILE_DAYS,
+                 now=None) -> None:
+        self.state = state
+        self.stream_names = sorted(stream_names)
+        self.now = now or utils.now()
+
+        last_full_reconcile = singer.get_bookmark(state, BOARDS, "last_full_reconcile")
+        self.full_reconcile = (
+            last_full_reconcile is None
+            or utils.strptime_to_utc(last_full_reconcile) <= self.now - timedelta(days=reconcile_days))
+        self.tracked_streams = set(singer.get_bookmark(state, BOARDS, "targeted_refresh_streams") or [])
+        self.touched = {}
+        self._lock = threading.Lock()
+
+    def start_board(self, board_id: str) -> None:
+        with self._lock:
+            self.touched[board_id] = {stream_name: set() for stream_name in ENTITY_KEYS}
+
+    def add_action(self, board_id: str, action: Dict) -> None:
+        data = action.get("data") or {}
+        with self._lock:
+            touched = self.touched.get(board_id)
+            if touched is None:
+                return
+            for stream_name, key in ENTITY_KEYS.items():
+                entity = data.get(key)
+                if isinstance(entity, dict) and entity.get("id"):
+                    touched[stream_name].add(entity["id"])
+
+    def get_touched(self, board_id: str, stream_name: str) -> Optional[Set[str]]:
+        """
+        Ids of the records of the board to refresh, or None when the whole board must be listed
+        """
+        if self.full_reconcile or stream_name not in self.tracked_streams:
+            return None
+        with self._lock:
+            touched = self.touched.get(board_id)
+            return None if touched is None else set(touched[stream_name])
+
+    def commit(self) -> None:
+        """
+        Record the streams synced, once all boards have been synced
+        """
+        singer.write_bookmark(self.state, BOARDS, "targeted_refresh_streams", self.stream_names)
+        if self.full_reconcile:
+            singer.write_bookmark(self.state, BOARDS, "last_full_reconcile", utils.strftime(self.now))
+
+    @classmethod
+    def from_config(cls, config: Dict, state: Dict, stream_names: Iterable[str]) -> "TargetedRefresh":
+        reconcile_days = config.get("targeted_refresh_reconcile_days")
+        reconcile_days = DEFAULT_RECONCILE_DAYS if reconcile_days in (None, "") else int(reconcile_days)
+        return cls(state, stream_names, reconcile_days)
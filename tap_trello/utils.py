@@ -0,0 +1,16 @@
+import threading
+
+# Held while writing messages and updating the state, which independent trees may do concurrently
+WRITE_LOCK = threading.RLock()
+
+
+def get_config_flag(config, key, default=False):
+    """
+    Read a boolean config value, accepting the "true"/"false" strings of UI-provided configs.
+    """
+    value = config.get(key)
+    if value is None or value == "":
+        return default
+    if isinstance(value, str):
+        return value.strip().lower() == "true"
+    return bool(value)
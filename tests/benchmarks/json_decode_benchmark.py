@@ -0,0 +1,68 @@
+"""
+Microbenchmark of the CPU spent decoding a page of 1000 cards, as returned by
+`/boards/{id}/cards/all` with custom field items and attachments.
+
+Compares decoding the body twice (the former `raise_for_error` then
+`__make_request`), once with the standard library, and once with orjson when installed.
+
+    python tests/benchmarks/json_decode_benchmark.py
+"""
+import json
+import timeit
+
+CARDS_PER_PAGE = 1000
+REPEAT = 5
+NUMBER = 10
+
+
+def make_card(index):
+    card_id = "5f0c9a3b1d2e4f{:010x}".format(index)
+    return {
+        "id": card_id,
+        "name": "Card {} with a reasonably long title".format(index),
+        "desc": "Description of the card. " * 20,
+        "closed": False,
+        "dateLastActivity": "2024-05-01T12:34:56.789Z",
+        "due": None,
+        "idBoard": "5f0c9a3b1d2e4f0012345678",
+        "idList": "5f0c9a3b1d2e4f0012345679",
+        "idMembers": ["5f0c9a3b1d2e4f001234567a", "5f0c9a3b1d2e4f001234567b"],
+        "idLabels": ["5f0c9a3b1d2e4f001234567c"],
+        "idChecklists": ["5f0c9a3b1d2e4f001234567d"],
+        "pos": 16384 * index,
+        "shortUrl": "https://trello.com/c/{}".format(card_id[-8:]),
+        "url": "https://trello.com/c/{}/{}-card".format(card_id[-8:], index),
+        "badges": {"attachments": 1, "checkItems": 4, "checkItemsChecked": 2, "comments": 3,
+                   "description": True, "subscribed": False, "votes": 0},
+        "labels": [{"id": "5f0c9a3b1d2e4f001234567c", "name": "Bug", "color": "red"}],
+        "customFieldItems": [{"id": "5f0c9a3b1d2e4f00123456{:02x}".format(field), "idCustomField": card_id,
+                              "idModel": card_id, "modelType": "card", "value": {"text": "value"}}
+                             for field in range(3)],
+        "attachments": [{"id": card_id, "bytes": 2048, "date": "2024-05-01T12:34:56.789Z",
+                         "mimeType": "image/png", "name": "screenshot.png",
+                         "url": "https://trello.com/1/cards/{}/attachments/screenshot.png".format(card_id)}],
+    }
+
+
+def main():
+    body = json.dumps([make_card(index) for index in range(CARDS_PER_PAGE)]).encode()
+    print("Page of {} cards: {:.1f} MB".format(CARDS_PER_PAGE, len(body) / 1e6))
+
+    decoders = [("json, decoded twice", lambda: (json.loads(body), json.loads(body))),
+                ("json, decoded once", lambda: json.loads(body))]
+    try:
+        import orjson # pylint: disable=import-outside-toplevel
+        decoders.append(("orjson, decoded once", lambda: orjson.loads(body)))
+    except ImportError:
+        print("orjson is not installed, skipping it")
+
+    baseline = None
+    for name, decode in decoders:
+        seconds = min(timeit.repeat(decode, repeat=REPEAT, number=NUMBER)) / NUMBER
+        baseline = baseline or seconds
+        print("{:<22} {:8.2f} ms per page, {:5.1f}% of the former cost".format(
+            name, seconds * 1000, 100 * seconds / baseline))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch, MagicMock
+
+from singer import utils
+
+from tap_trello.streams import Actions
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+# One action every 6 hours for 100 days, newest first
+ACTIONS = [{"id": "{:08x}{}".format(int((START + timedelta(hours=6 * index)).timestamp()), "0" * 16),
+            "date": (START + timedelta(hours=6 * index)).strftime("%Y-%m-%dT%H:%M:%S.000Z")}
+           for index in reversed(range(400))]
+CONFIG = {"start_date": "2024-01-01T00:00:00Z", "end_date": "2024-04-11T00:00:00Z", "actions_adaptive_windows": "true"}
+
+
+@patch("singer.write_state")
+class TestAdaptiveActionWindows(unittest.TestCase):
+
+    def iter_get(self, path, params):
+        self.requests.append(params)
+        since = utils.strptime_to_utc(params["since"])
+        before = params["before"]
+        matching = [action for action in ACTIONS if utils.strptime_to_utc(action["date"]) > since and (
+            action["id"] < before if "T" not in before else utils.strptime_to_utc(action["date"]) < utils.strptime_to_utc(before))]
+        return iter(matching[:params["limit"]])
+
+    def get_actions(self, state, config=CONFIG):
+        self.requests = []
+        client = MagicMock()
+        client.iter_get.side_effect = self.iter_get
+        stream = Actions(client, config, state)
+        stream.MAX_API_RESPONSE_SIZE = 50
+        stream.params = {"limit": 50}
+        stream.on_window_started()
+        return [action["id"] for action in stream.get_records(["board_1"])]
+
+    def test_density_measured_then_windows_planned(self, *mocks):
+        state = {}
+
+        actions = self.get_actions(state)
+
+        self.assertEqual(actions, [action["id"] for action in ACTIONS])
+        self.assertAlmostEqual(state["bookmarks"]["actions"]["board_density"]["board_1"], 4, delta=0.1)
+        self.assertNotIn("sub_window_end", state["bookmarks"]["actions"])
+
+    def test_recorded_density_plans_one_page_windows(self, *mocks):
+        state = {"bookmarks": {"actions": {"board_density": {"board_1": 4}}}}
+
+        actions = self.get_actions(state, {**CONFIG, "max_workers": 4})
+
+        self.assertEqual(actions, [action["id"] for action in ACTIONS])
+        # At 4 actions a day, pages of 50 actions are 80% full in 10 days, so the 101 days take 11 windows
+        self.assertEqual(len({params["since"] for params in self.requests}), 11)
+        # No window needs a second page
+        self.assertEqual(len(self.requests), 11)
+
+    def test_full_window_paginated_by_id(self, *mocks):
+        state = {"bookmarks": {"actions": {"board_density": {"board_1": 0.1}}}}
+
+        actions = self.get_actions(state)
+
+        self.assertEqual(actions, [action["id"] for action in ACTIONS])
+        self.assertEqual([params["before"] for params in self.requests[1:]],
+                         [ACTIONS[index]["id"] for index in range(49, 400, 50)])
+
+    def test_boards_share_window_executor(self, *mocks):
+        self.requests = []
+        client = MagicMock()
+        client.iter_get.side_effect = self.iter_get
+        stream = Actions(client, {**CONFIG, "max_workers": 4}, {"bookmarks": {"actions": {"board_density": {"board_1": 4, "board_2": 4}}}})
+        stream.MAX_API_RESPONSE_SIZE = 50
+        stream.params = {"limit": 50}
+        stream.on_window_started()
+
+        with patch("tap_trello.streams.abstracts.ThreadPoolExecutor", wraps=ThreadPoolExecutor) as executor_class:
+            for board_id in ("board_1", "board_2"):
+                self.assertEqual(len(list(stream.get_records([board_id]))), len(ACTIONS))
+            executor = stream.window_executor
+            stream.on_window_finished()
+
+        executor_class.assert_called_once()
+        self.assertIsNone(stream.window_executor)
+        with self.assertRaises(RuntimeError):
+            executor.submit(print)
+
+
+@patch("singer.write_state")
+class TestActionBoardBookmarks(unittest.TestCase):
+
+    config = {"start_date": "2024-01-01T00:00:00Z", "actions_board_bookmarks": "true"}
+
+    def get_stream(self):
+        state = {"bookmarks": {"actions": {"window_start": "2024-05-01T00:00:00.000000Z",
+                                           "window_end": "2024-05-10T00:00:00.000000Z",
+                                           "board_watermarks": {"2024-05-05T00:00:00.000000Z": ["board_1"]}}}}
+        client = MagicMock()
+        client.iter_get.return_value = iter([])
+        return Actions(client, self.config, state)
+
+    def test_inactive_board_not_requested(self, *mocks):
+        stream = self.get_stream()
+
+        records = list(stream.get_parent_records("board_1", {"id": "board_1", "dateLastActivity": "2024-05-04T00:00:00.000Z"}))
+
+        self.assertEqual(records, [])
+        stream.client.iter_get.assert_not_called()
+        self.assertEqual(stream.skipped_requests, 1)
+
+    def test_inactive_board_keeps_watermark(self, *mocks):
+        stream = self.get_stream()
+
+        # Activity after the boards were listed would be missed with a watermark at the window's end
+        list(stream.get_parent_records("board_1", {"id": "board_1", "dateLastActivity": "2024-05-04T00:00:00.000Z"}))
+        stream.on_parent_written("board_1")
+        list(stream.get_parent_records("board_2", {"id": "board_2", "dateLastActivity": "2024-05-06T00:00:00.000Z"}))
+        stream.on_parent_written("board_2")
+        stream.on_parents_finished()
+
+        self.assertEqual(stream.state["bookmarks"]["actions"]["board_watermarks"],
+                         {"2024-05-05T00:00:00.000000Z": ["board_1"], "2024-05-10T00:00:00.000000Z": ["board_2"]})
+
+    def test_active_board_resumes_from_watermark(self, *mocks):
+        stream = self.get_stream()
+
+        list(stream.get_parent_records("board_1", {"id": "board_1", "dateLastActivity": "2024-05-06T00:00:00.000Z"}))
+        list(stream.get_parent_records("board_2", {"id": "board_2", "dateLastActivity": "2024-05-06T00:00:00.000Z"}))
+
+        since = [c.kwargs["params"]["since"] for c in stream.client.iter_get.call_args_list]
+        # A board without a watermark looks back a day before the shared window
+        self.assertEqual(since, ["2024-05-04T23:59:59.999000Z", "2024-04-29T23:59:59.999000Z"])
+
+    def test_watermarks_grouped_by_date(self, *mocks):
+        stream = self.get_stream()
+        stream.board_watermarks["board_3"] = "2024-05-02T00:00:00.000000Z"
+
+        for board_id in ("board_1", "board_2"):
+            stream.on_parent_written(board_id)
+        stream.on_parents_finished()
+
+        self.assertEqual(stream.state["bookmarks"]["actions"]["board_watermarks"],
+                         {"2024-05-10T00:00:00.000000Z": ["board_1", "board_2"],
+                          "2024-05-02T00:00:00.000000Z": ["board_3"]})
@@ -0,0 +1,98 @@
+import unittest
+from unittest.mock import patch, MagicMock
+
+from tap_trello.client import Client
+from tap_trello.exceptions import TrelloNotFoundError
+from tap_trello.streams.abstracts import get_batched_parent_records
+from tap_trello.streams.board_labels import BoardLabels
+from tap_trello.streams.card_attachments import CardAttachments
+from tap_trello.sync import sync
+
+
+class TestClientBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.client = Client({"api_key": "key", "api_token": "token"})
+
+    @patch("tap_trello.client.Client.get")
+    def test_paths_sent_ten_at_a_time(self, mock_get):
+        paths = ["/members/{}".format(i) for i in range(12)]
+        mock_get.side_effect = lambda path, params=None: (
+            [{"200": {"id": url.split("/")[-1]}} for url in params["urls"].split(",")]
+            if path == "/batch" else {"id": path.split("/")[-1]})
+
+        responses = self.client.get_batch(paths)
+
+        self.assertEqual(responses, [{"id": str(i)} for i in range(12)])
+        self.assertEqual([c.args[0] for c in mock_get.call_args_list], ["/batch", "/batch"])
+        self.assertEqual(mock_get.call_args_list[1].kwargs["params"], {"urls": "/members/10,/members/11"})
+
+    @patch("tap_trello.client.Client.get")
+    def test_item_errors_routed_back(self, mock_get):
+        mock_get.side_effect = lambda path, params=None: (
+            [{"200": []}, {"name": "NotFound", "message": "The requested resource was not found.", "statusCode": 404},
+             {"name": "ServerError", "statusCode": 500}]
+            if path == "/batch" else [{"id": "retried"}])
+
+        responses = self.client.get_batch(["/cards/1/attachments", "/cards/2/attachments", "/cards/3/attachments"])
+
+        self.assertEqual(responses[0], [])
+        self.assertIsInstance(responses[1], TrelloNotFoundError)
+        self.assertEqual(str(responses[1]), "HTTP-error-code: 404, Error: The requested resource was not found.")
+        # Retryable errors are requested again on their own
+        self.assertEqual(responses[2], [{"id": "retried"}])
+        self.assertEqual(mock_get.call_args_list[-1].args, ("/cards/3/attachments",))
+
+
+class TestBatchedParentRecords(unittest.TestCase):
+
+    def test_records_routed_to_their_stream_and_parent(self):
+        client = MagicMock(base_url="https://api.trello.com/1", config={})
+        client.get_batch.side_effect = lambda paths, cacheable_paths: [[{"id": path}] for path in paths]
+        labels = BoardLabels(client, None)
+        attachments = CardAttachments(client, None)
+        requests = [(labels, {"id": "board_1"}),
+                    (attachments, {"id": "card_1", "attachments": [{"id": "embedded"}]}),
+                    (attachments, {"id": "card_2"})]
+
+        records = get_batched_parent_records(client, requests)
+
+        client.get_batch.assert_called_once_with(["/boards/board_1/labels", "/cards/card_2/attachments"], set())
+        self.assertEqual(records, [[{"id": "/boards/board_1/labels", "boardId": "board_1"}],
+                                   [{"id": "embedded", "card_id": "card_1"}],
+                                   [{"id": "/cards/card_2/attachments", "card_id": "card_2"}]])
+
+    def test_item_error_raised(self):
+        client = MagicMock(base_url="https://api.trello.com/1", config={})
+        client.get_batch.return_value = [TrelloNotFoundError("HTTP-error-code: 404, Error: Not found")]
+
+        with self.assertRaises(TrelloNotFoundError):
+            get_batched_parent_records(client, [(BoardLabels(client, None), {"id": "board_1"})])
+
+
+class TestSyncBatch(unittest.TestCase):
+
+    @patch("singer.write_schema")
+    @patch("singer.write_state")
+    @patch("singer.write_record")
+    @patch("tap_trello.streams.cards.Cards.get_records")
+    @patch("tap_trello.streams.boards.Boards.get_records")
+    def test_card_children_requested_in_batches(self, mock_boards, mock_cards, mock_write_record,
+                                                mock_write_state, mock_write_schema):
+        mock_catalog = MagicMock()
+        selected = []
+        for name in ["boards", "cards", "card_attachments"]:
+            catalog_stream = MagicMock()
+            catalog_stream.stream = name
+            selected.append(catalog_stream)
+        mock_catalog.get_selected_streams.return_value = selected
+        mock_catalog.get_stream.return_value.metadata = []
+
+        client = MagicMock(base_url="https://api.trello.com/1", config={})
+        client.get_batch.side_effect = lambda paths, cacheable_paths: [[] for _ in paths]
+        mock_boards.return_value = iter([{"id": "5f0c9a3b1d2e4f0012345678"}])
+        mock_cards.return_value = iter([{"id": "card_{}".format(i)} for i in range(15)])
+
+        sync(client, {"batch_requests": True}, mock_catalog, {})
+
+        self.assertEqual([len(c.args[0]) for c in client.get_batch.call_args_list], [10, 5])
@@ -0,0 +1,98 @@
+import unittest
+from unittest.mock import patch, MagicMock
+
+from singer import utils
+
+from tap_trello.board_activity import BoardActivity
+from tap_trello.sync import sync
+
+BOARDS = [{"id": "5a0c9a3b1d2e4f0012345678", "dateLastActivity": "2024-05-01T00:00:00.000Z"},
+          {"id": "5f0c9a3b1d2e4f0012345678", "dateLastActivity": "2024-05-02T00:00:00.000Z"}]
+CONFIG = {"start_date": "2020-01-01T00:00:00Z", "skip_unchanged_boards": "true"}
+
+
+def get_catalog(stream_names):
+    mock_catalog = MagicMock()
+    selected = []
+    for name in stream_names:
+        catalog_stream = MagicMock()
+        catalog_stream.stream = name
+        selected.append(catalog_stream)
+    mock_catalog.get_selected_streams.return_value = selected
+    mock_catalog.get_stream.return_value.metadata = []
+    return mock_catalog
+
+
+@patch("singer.write_schema")
+@patch("singer.write_state")
+@patch("singer.write_record")
+@patch("tap_trello.streams.actions.Actions.get_records")
+@patch("tap_trello.streams.lists.Lists.get_records")
+@patch("tap_trello.streams.boards.Boards.get_records")
+class TestSkipUnchangedBoards(unittest.TestCase):
+
+    def run_sync(self, mock_boards, mock_lists, mock_actions, state, boards=None, config=None,
+                 streams=("boards", "lists", "actions")):
+        mock_boards.return_value = iter(boards or BOARDS)
+        mock_lists.reset_mock()
+        mock_actions.reset_mock()
+        mock_lists.side_effect = lambda format_values: iter([])
+        mock_actions.side_effect = lambda format_values: iter([])
+        sync(MagicMock(), config or CONFIG, get_catalog(streams), state)
+        return [c.args[0][0] for c in mock_lists.call_args_list], [c.args[0][0] for c in mock_actions.call_args_list]
+
+    def test_first_sync_records_activity(self, mock_boards, mock_lists, mock_actions, *mocks):
+        state = {}
+
+        lists_boards, _ = self.run_sync(mock_boards, mock_lists, mock_actions, state)
+
+        self.assertEqual(lists_boards, [board["id"] for board in BOARDS])
+        bookmark = state["bookmarks"]["boards"]
+        self.assertEqual(bookmark["board_activity"], {board["id"]: board["dateLastActivity"] for board in BOARDS})
+        self.assertEqual(bookmark["board_activity_streams"], ["lists"])
+        self.assertIn("last_full_refresh", bookmark)
+
+    def test_unchanged_boards_skipped_by_full_table_children(self, mock_boards, mock_lists, mock_actions, *mocks):
+        state = {}
+        self.run_sync(mock_boards, mock_lists, mock_actions, state)
+        changed = [BOARDS[0], {**BOARDS[1], "dateLastActivity": "2024-06-01T00:00:00.000Z"}]
+
+        lists_boards, actions_boards = self.run_sync(mock_boards, mock_lists, mock_actions, state, changed)
+
+        self.assertEqual(lists_boards, [BOARDS[1]["id"]])
+        # Actions are incremental, so every board is still requested
+        self.assertEqual(actions_boards, [board["id"] for board in BOARDS])
+        self.assertEqual(state["bookmarks"]["boards"]["board_activity"][BOARDS[1]["id"]], "2024-06-01T00:00:00.000Z")
+
+    def test_full_refresh_when_due(self, mock_boards, mock_lists, mock_actions, *mocks):
+        state = {}
+        self.run_sync(mock_boards, mock_lists, mock_actions, state)
+        state["bookmarks"]["boards"]["last_full_refresh"] = "2024-01-01T00:00:00.000000Z"
+
+        lists_boards, _ = self.run_sync(mock_boards, mock_lists, mock_actions, state,
+                                        config={**CONFIG, "unchanged_boards_refresh_days": 30})
+
+        self.assertEqual(len(lists_boards), 2)
+        self.assertGreater(state["bookmarks"]["boards"]["last_full_refresh"], "2024-01-01")
+
+    def test_newly_selected_stream_syncs_every_board(self, mock_boards, mock_lists, mock_actions, *mocks):
+        state = {}
+        self.run_sync(mock_boards, mock_lists, mock_actions, state, streams=("boards", "actions"))
+
+        lists_boards, _ = self.run_sync(mock_boards, mock_lists, mock_actions, state)
+
+        self.assertEqual(len(lists_boards), 2)
+
+
+class TestBoardActivity(unittest.TestCase):
+
+    def test_board_resumed_past_keeps_recorded_activity(self):
+        state = {"bookmarks": {"boards": {"board_activity": {"board_1": "2024-05-01T00:00:00.000Z"},
+                                          "board_activity_streams": ["lists"],
+                                          "last_full_refresh": utils.strftime(utils.now())}}}
+        activity = BoardActivity(state, ["lists"])
+
+        activity.record({"id": "board_1", "dateLastActivity": "2024-06-01T00:00:00.000Z"}, synced=False)
+        activity.record({"id": "board_2", "dateLastActivity": "2024-06-01T00:00:00.000Z"}, synced=False)
+
+        self.assertEqual(activity.seen, {"board_1": "2024-05-01T00:00:00.000Z", "board_2": None})
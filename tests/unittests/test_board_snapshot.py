@@ -0,0 +1,117 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from tap_trello.board_snapshot import BoardSnapshot, get_board_snapshot, get_snapshot_params
+from tap_trello.exceptions import TrelloInternalServerError
+from tap_trello.streams import BoardLabels, CardAttachments, Cards, Lists
+
+
+DEFAULT_CONFIG = {
+    "start_date": "2020-01-01T00:00:00Z",
+    "api_key": "dummy_key",
+    "api_token": "dummy_token",
+}
+
+
+class TestGetBoardSnapshot(unittest.TestCase):
+
+    def test_snapshot_params_merged_from_streams(self):
+        client = MagicMock()
+        cards = Cards(client, DEFAULT_CONFIG, {})
+        cards.child_to_sync = [CardAttachments(client, None)]
+        params = get_snapshot_params([Lists(client, DEFAULT_CONFIG, {}), cards, BoardLabels(client, None)])
+
+        self.assertEqual(params, {
+            "lists": "all",
+            "cards": "all", "card_customFieldItems": "true", "customFields": "true",
+            "card_attachments": "true", "card_attachment_fields": "all",
+            "labels": "all",
+        })
+
+    def test_single_request_split_into_collections(self):
+        client = MagicMock()
+        client.get.return_value = {"id": "board_1", "lists": [{"id": "list_1"}], "labels": []}
+
+        snapshot = get_board_snapshot(client, {"id": "board_1", "name": "Board"},
+                                      {"lists": "all", "labels": "all"}, 1000)
+
+        client.get.assert_called_once_with("/boards/board_1", params={"fields": "id", "lists": "all", "labels": "all"})
+        self.assertEqual(snapshot, {"id": "board_1", "name": "Board"})
+        self.assertEqual(snapshot.get_collection("lists"), [{"id": "list_1"}])
+        self.assertEqual(snapshot.get_collection("labels"), [])
+        self.assertIsNone(snapshot.get_collection("cards"))
+
+    def test_large_collections_left_out(self):
+        client = MagicMock()
+        client.get.return_value = {"id": "board_1", "cards": [{"id": "card_1"}, {"id": "card_2"}],
+                                   "lists": [{"id": "list_1"}]}
+
+        snapshot = get_board_snapshot(client, {"id": "board_1"}, {"cards": "all", "lists": "all"}, 2)
+
+        self.assertIsNone(snapshot.get_collection("cards"))
+        self.assertEqual(snapshot.get_collection("lists"), [{"id": "list_1"}])
+
+    def test_failed_request_falls_back_to_endpoints(self):
+        client = MagicMock()
+        client.get.side_effect = TrelloInternalServerError("boom")
+
+        snapshot = get_board_snapshot(client, {"id": "board_1"}, {"lists": "all"}, 1000)
+
+        self.assertEqual(snapshot, {"id": "board_1"})
+        self.assertIsNone(snapshot.get_collection("lists"))
+
+
+class TestStreamsFromSnapshot(unittest.TestCase):
+
+    @patch("singer.write_state")
+    def test_legacy_stream_reads_snapshot_collection(self, mock_write_state):
+        client = MagicMock()
+        lists = Lists(client, DEFAULT_CONFIG, {})
+        snapshot = BoardSnapshot({"id": "board_1"}, {"lists": [{"id": "list_1"}]})
+
+        records = list(lists.sync_parent("board_1", snapshot))
+
+        self.assertEqual(records, [{"id": "list_1"}])
+        client.iter_get.assert_not_called()
+
+    @patch("singer.write_state")
+    def test_legacy_stream_requests_missing_collection(self, mock_write_state):
+        client = MagicMock()
+        client.iter_get.return_value = [{"id": "list_1"}]
+        lists = Lists(client, DEFAULT_CONFIG, {})
+
+        records = list(lists.sync_parent("board_1", BoardSnapshot({"id": "board_1"})))
+
+        self.assertEqual(records, [{"id": "list_1"}])
+        client.iter_get.assert_called_once()
+
+    @patch("singer.write_state")
+    def test_cards_use_snapshot_custom_fields(self, mock_write_state):
+        client = MagicMock()
+        cards = Cards(client, DEFAULT_CONFIG, {})
+        snapshot = BoardSnapshot({"id": "board_1"}, {
+            "customFields": [{"id": "field_1", "name": "Notes", "type": "text"}],
+            "cards": [{"id": "card_1", "idChecklists": [],
+                       "customFieldItems": [{"idCustomField": "field_1", "value": {"text": "abc"}}]}],
+        })
+
+        records = list(cards.sync_parent("board_1", snapshot))
+
+        self.assertEqual(records[0]["customFieldItems"][0]["name"], "Notes")
+        self.assertEqual(cards.board_checklist_counts, {"board_1": 0})
+        client.get.assert_not_called()
+        client.iter_get.assert_not_called()
+
+    @patch("tap_trello.streams.abstracts.write_record")
+    def test_latest_stream_reads_snapshot_collection(self, mock_write_record):
+        client = MagicMock()
+        labels = BoardLabels(client, MagicMock(metadata=[]))
+        labels.is_selected = MagicMock(return_value=True)
+        transformer = MagicMock()
+        transformer.transform.side_effect = lambda record, schema, mdata: record
+        snapshot = BoardSnapshot({"id": "board_1"}, {"labels": [{"id": "label_1"}]})
+
+        self.assertEqual(labels.sync({}, transformer, parent_obj=snapshot), 1)
+
+        client.iter_request.assert_not_called()
+        mock_write_record.assert_called_once_with("board_labels", {"id": "label_1", "boardId": "board_1"})
@@ -0,0 +1,171 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from tap_trello.streams import CardAttachments, CardCustomFieldItems, Cards, Checklists
+
+
+DEFAULT_CONFIG = {
+    "start_date": "2020-01-01T00:00:00Z",
+    "api_key": "dummy_key",
+    "api_token": "dummy_token",
+}
+
+
+def get_stream(stream_class, config):
+    client = MagicMock()
+    client.config = config
+    client.base_url = "https://api.trello.com/1"
+    return stream_class(client, MagicMock(metadata=[]))
+
+
+class TestCardCustomFieldItemsFromCards(unittest.TestCase):
+
+    card = {
+        "id": "card_1",
+        "customFieldItems": [
+            {"id": "item_1", "idCustomField": "field_1", "idModel": "card_1", "modelType": "card",
+             "value": {"text": "abc"}, "name": "Notes"},
+            {"id": "item_2", "idCustomField": "field_2", "idModel": "card_1", "modelType": "card",
+             "idValue": "option_1", "value": {"option": "High"}, "name": "Priority"},
+        ]
+    }
+
+    @patch("tap_trello.streams.abstracts.write_record")
+    def test_items_derived_from_card_without_requests(self, mock_write_record):
+        stream = get_stream(CardCustomFieldItems, {**DEFAULT_CONFIG, "card_custom_field_items_from_cards": "true"})
+        stream.is_selected = MagicMock(return_value=True)
+        transformer = MagicMock()
+        transformer.transform.side_effect = lambda record, schema, mdata: record
+
+        count = stream.sync({}, transformer, parent_obj=self.card)
+
+        self.assertEqual(count, 2)
+        stream.client.iter_request.assert_not_called()
+        records = [c.args[1] for c in mock_write_record.call_args_list]
+        self.assertEqual(records[0], {"id": "item_1", "idCustomField": "field_1", "idModel": "card_1",
+                                      "modelType": "card", "value": {"text": "abc"}, "card_id": "card_1"})
+        # The dropdown value and field name added by the cards stream are not part of the item
+        self.assertEqual(records[1], {"id": "item_2", "idCustomField": "field_2", "idModel": "card_1",
+                                      "modelType": "card", "idValue": "option_1", "card_id": "card_1"})
+        # The card record itself is left untouched
+        self.assertEqual(self.card["customFieldItems"][1]["value"], {"option": "High"})
+
+    def test_falls_back_to_request_when_embedded_items_missing(self):
+        stream = get_stream(CardCustomFieldItems, {**DEFAULT_CONFIG, "card_custom_field_items_from_cards": True})
+        stream.client.iter_request.return_value = [{"id": "item_1"}]
+        stream._sync_parent_obj = {"id": "card_1"}
+        stream.url_endpoint = stream.get_url_endpoint(stream._sync_parent_obj)
+
+        self.assertEqual(list(stream.get_records()), [{"id": "item_1"}])
+        self.assertTrue(stream.client.iter_request.call_args.args[1].endswith("/cards/card_1/customFieldItems"))
+
+    def test_requests_per_card_when_mode_disabled(self):
+        stream = get_stream(CardCustomFieldItems, DEFAULT_CONFIG)
+        stream.client.iter_request.return_value = []
+        stream._sync_parent_obj = self.card
+
+        self.assertIsNone(stream.get_embedded_records(self.card))
+        self.assertEqual(list(stream.get_records()), [])
+        stream.client.iter_request.assert_called_once()
+
+
+class TestCardAttachmentsFromCards(unittest.TestCase):
+
+    def test_cards_request_attachments_when_card_attachments_selected(self):
+        client = MagicMock()
+        client.get.return_value = []
+        client.iter_get.return_value = []
+        cards = Cards(client, DEFAULT_CONFIG, {})
+        cards.child_to_sync = [get_stream(CardAttachments, DEFAULT_CONFIG)]
+
+        list(cards.get_records(["board_1"]))
+
+        self.assertEqual(cards.params["attachments"], "true")
+        self.assertEqual(cards.params["attachment_fields"], "all")
+
+    def test_cards_do_not_request_attachments_by_default(self):
+        client = MagicMock()
+        client.get.return_value = []
+        client.iter_get.return_value = []
+        cards = Cards(client, DEFAULT_CONFIG, {})
+
+        list(cards.get_records(["board_1"]))
+
+        self.assertNotIn("attachments", cards.params)
+
+    @patch("tap_trello.streams.abstracts.write_record")
+    def test_attachments_emitted_from_card_payload(self, mock_write_record):
+        stream = get_stream(CardAttachments, DEFAULT_CONFIG)
+        stream.is_selected = MagicMock(return_value=True)
+        transformer = MagicMock()
+        transformer.transform.side_effect = lambda record, schema, mdata: record
+        card = {"id": "card_1", "attachments": [{"id": "attachment_1", "name": "a.png"}]}
+
+        count = stream.sync({}, transformer, parent_obj=card)
+
+        self.assertEqual(count, 1)
+        stream.client.iter_request.assert_not_called()
+        mock_write_record.assert_called_once_with(
+            "card_attachments", {"id": "attachment_1", "name": "a.png", "card_id": "card_1"})
+        self.assertNotIn("card_id", card["attachments"][0])
+
+    def test_attachments_requested_when_card_has_none_embedded(self):
+        stream = get_stream(CardAttachments, DEFAULT_CONFIG)
+        stream.client.iter_request.return_value = [{"id": "attachment_1"}]
+        stream._sync_parent_obj = {"id": "card_1"}
+
+        self.assertEqual(list(stream.get_records()), [{"id": "attachment_1"}])
+        stream.client.iter_request.assert_called_once()
+
+
+class TestBadgeDrivenSkipping(unittest.TestCase):
+
+    def test_attachments_not_requested_for_cards_without_attachments(self):
+        stream = get_stream(CardAttachments, DEFAULT_CONFIG)
+        stream._sync_parent_obj = {"id": "card_1", "badges": {"attachments": 0}}
+
+        self.assertEqual(list(stream.get_records()), [])
+        stream.client.iter_request.assert_not_called()
+        self.assertEqual(stream.skipped_requests, 1)
+
+    def test_attachments_requested_for_cards_with_attachments(self):
+        stream = get_stream(CardAttachments, DEFAULT_CONFIG)
+        stream.client.iter_request.return_value = [{"id": "attachment_1"}]
+        stream._sync_parent_obj = {"id": "card_1", "badges": {"attachments": 1}}
+
+        self.assertEqual(list(stream.get_records()), [{"id": "attachment_1"}])
+        self.assertEqual(stream.skipped_requests, 0)
+
+    def test_checklists_skipped_for_boards_whose_cards_have_none(self):
+        client = MagicMock()
+        # customFields of board_1 and board_2
+        client.get.side_effect = [[], []]
+        client.iter_get.side_effect = [
+            # cards of board_1, only the second card has a checklist
+            [{"id": "card_1", "customFieldItems": [], "idChecklists": []},
+             {"id": "card_2", "customFieldItems": [], "idChecklists": ["checklist_1"]}],
+            # cards of board_2, no checklists
+            [{"id": "card_3", "customFieldItems": [], "idChecklists": []}],
+            # checklists of board_1
+            [{"id": "checklist_1"}],
+        ]
+        cards = Cards(client, DEFAULT_CONFIG, {})
+        checklists = Checklists(client, DEFAULT_CONFIG, {})
+        checklists.board_checklist_counts = cards.board_checklist_counts
+
+        list(cards.get_records(["board_1"]))
+        list(cards.get_records(["board_2"]))
+
+        self.assertEqual(list(checklists.get_records(["board_1"])), [{"id": "checklist_1"}])
+        self.assertEqual(list(checklists.get_records(["board_2"])), [])
+        self.assertEqual(client.iter_get.call_count, 3)
+        self.assertEqual(checklists.skipped_requests, 1)
+
+    def test_checklists_requested_when_cards_not_synced(self):
+        client = MagicMock()
+        client.iter_get.return_value = []
+        checklists = Checklists(client, DEFAULT_CONFIG, {})
+
+        list(checklists.get_records(["board_1"]))
+
+        client.iter_get.assert_called_once()
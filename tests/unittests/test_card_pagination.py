@@ -1,4 +1,5 @@
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 from unittest import mock
 
 from tap_trello.client import Client
@@ -113,3 +114,107 @@ class TestCardPagination(unittest.TestCase):
         # a total of 3 records from the first call with 2 records as the `cards_response_size` is set to 2
         # and the second API call with one record indicating the break in the while loop
         self.assertEqual(3, len(cards))
+
+
+@mock.patch('tap_trello.streams.abstracts.LegacyChildStream.get_parent_records')
+class TestIncrementalCards(unittest.TestCase):
+
+    cards = [{"id": "card_1", "dateLastActivity": "2024-05-01T00:00:00.000Z"},
+             {"id": "card_2", "dateLastActivity": "2024-05-03T00:00:00.000Z"}]
+    board = {"id": "board_1", "dateLastActivity": "2024-05-03T00:00:00.000Z"}
+
+    def get_stream(self, state):
+        return Cards(mock.MagicMock(), {**DEFAULT_CONFIG, "cards_incremental": "true"}, state)
+
+    def test_cards_active_since_bookmark_written(self, mock_get_parent_records):
+        mock_get_parent_records.return_value = iter(self.cards)
+        state = {"bookmarks": {"cards": {"board_last_activity": {"board_1": "2024-05-02T00:00:00.000Z"}}}}
+        stream = self.get_stream(state)
+
+        records = list(stream.get_parent_records("board_1", {**self.board, "dateLastActivity": "2024-06-01T00:00:00.000Z"}))
+        stream.on_parent_written("board_1")
+
+        self.assertEqual(records, [self.cards[1]])
+        self.assertEqual(state["bookmarks"]["cards"]["board_last_activity"], {"board_1": "2024-05-03T00:00:00.000Z"})
+
+    def test_inactive_board_not_requested(self, mock_get_parent_records):
+        state = {"bookmarks": {"cards": {"board_last_activity": {"board_1": "2024-05-03T00:00:00.000Z"}}}}
+        stream = self.get_stream(state)
+
+        records = list(stream.get_parent_records("board_1", self.board))
+        stream.on_parent_written("board_1")
+
+        self.assertEqual(records, [])
+        mock_get_parent_records.assert_not_called()
+        self.assertEqual(stream.skipped_requests, 1)
+        self.assertEqual(state["bookmarks"]["cards"]["board_last_activity"], {"board_1": "2024-05-03T00:00:00.000Z"})
+
+    def test_first_sync_writes_every_card(self, mock_get_parent_records):
+        mock_get_parent_records.return_value = iter(self.cards)
+        state = {}
+        stream = self.get_stream(state)
+
+        records = list(stream.get_parent_records("board_1", self.board))
+        stream.on_parent_written("board_1")
+
+        self.assertEqual(records, self.cards)
+        self.assertEqual(state["bookmarks"]["cards"]["board_last_activity"], {"board_1": "2024-05-03T00:00:00.000Z"})
+
+
+class TestTimeSlicedCards(unittest.TestCase):
+
+    board_id = "5a000000" + "0" * 16
+    # Ten cards created a day apart, newest first, and one moved from an older board
+    card_ids = ["{:08x}{}".format(0x5a000000 + day * 86400, "1" * 16) for day in range(10, 0, -1)] + ["59000000" + "2" * 16]
+
+    def iter_get(self, path, params):
+        self.requests.append(params)
+        # The first page is requested before the current date rather than an id
+        before = params["before"] if "T" not in params["before"] else "g"
+        matching = sorted((card_id for card_id in self.card_ids
+                           if card_id < before and card_id > params.get("since", "")), reverse=True)
+        return iter([{"id": card_id} for card_id in matching[:params["limit"]]])
+
+    def get_cards(self, config):
+        self.requests = []
+        client = mock.MagicMock()
+        client.iter_get.side_effect = self.iter_get
+        stream = Cards(client, {**DEFAULT_CONFIG, "cards_response_size": 3, **config}, {})
+        stream.build_custom_fields_maps = mock.MagicMock(return_value=(None, None))
+        return [card["id"] for card in stream.get_records([self.board_id])]
+
+    def test_slices_cover_every_card_once(self):
+        cards = self.get_cards({"cards_time_slices": 3})
+
+        self.assertEqual(sorted(cards, reverse=True), sorted(self.card_ids, reverse=True))
+        self.assertEqual(len(cards), len(set(cards)))
+        self.assertEqual(cards[:3], self.card_ids[:3])
+        self.assertEqual(len({params["since"] for params in self.requests if "since" in params}), 2)
+
+    def test_boards_share_slice_executor(self):
+        client = mock.MagicMock()
+        client.iter_get.side_effect = self.iter_get
+        self.requests = []
+        stream = Cards(client, {**DEFAULT_CONFIG, "cards_response_size": 3, "cards_time_slices": 3}, {})
+        stream.build_custom_fields_maps = mock.MagicMock(return_value=(None, None))
+
+        with mock.patch("tap_trello.streams.cards.ThreadPoolExecutor", wraps=ThreadPoolExecutor) as executor_class:
+            for _ in range(2):
+                self.assertEqual(len(list(stream.get_records([self.board_id]))), len(self.card_ids))
+            executor = stream.slice_executor
+            stream.on_parents_finished()
+
+        executor_class.assert_called_once_with(max_workers=3, thread_name_prefix="cards-slice")
+        self.assertIsNone(stream.slice_executor)
+        with self.assertRaises(RuntimeError):
+            executor.submit(print)
+
+    def test_small_board_single_request(self):
+        self.card_ids = self.card_ids[:2]
+
+        self.assertEqual(self.get_cards({"cards_time_slices": 3}), self.card_ids)
+        self.assertEqual(len(self.requests), 1)
+
+    def test_serial_pagination_by_default(self):
+        self.assertEqual(self.get_cards({}), self.card_ids)
+        self.assertNotIn("since", self.requests[-1])
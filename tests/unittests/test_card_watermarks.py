@@ -0,0 +1,101 @@
+import copy
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from tap_trello.card_watermarks import CardWatermarks
+from tap_trello.streams import CardAttachments, Cards
+
+DEFAULT_CONFIG = {"start_date": "2020-01-01T00:00:00Z", "api_key": "dummy_key", "api_token": "dummy_token"}
+CARDS = [{"id": "card_1", "dateLastActivity": "2024-05-01T00:00:00.000Z", "attachments": [{"id": "attachment_1"}]},
+         {"id": "card_2", "dateLastActivity": "2024-05-02T00:00:00.000Z", "attachments": [{"id": "attachment_2"}]}]
+
+
+class TestCardWatermarks(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        # State acknowledged by the target
+        self.state = {}
+
+    def sync_board(self, cards, stream_names=("card_attachments",), commit=True, board_id="board_1",
+                   acknowledged=True):
+        state = copy.deepcopy(self.state)
+        watermarks = CardWatermarks(self.directory, stream_names, state)
+        watermarks.start_board(board_id)
+        unchanged = [card["id"] for card in cards if watermarks.is_unchanged(card, "card_attachments")]
+        for card in cards:
+            watermarks.record(board_id, card)
+        if commit:
+            watermarks.commit(board_id)
+        watermarks.finish()
+        if acknowledged:
+            self.state = state
+        return unchanged
+
+    def test_unchanged_cards_skipped(self):
+        self.assertEqual(self.sync_board(CARDS), [])
+        changed = [CARDS[0], {**CARDS[1], "dateLastActivity": "2024-06-01T00:00:00.000Z"}]
+
+        self.assertEqual(self.sync_board(changed), ["card_1"])
+        with open(os.path.join(self.directory, "board_1.json")) as watermarks_file:
+            self.assertEqual(json.load(watermarks_file)["cards"]["card_2"], "2024-06-01T00:00:00.000Z")
+
+    def test_uncommitted_board_checked_again(self):
+        self.sync_board(CARDS, commit=False)
+
+        self.assertEqual(self.sync_board(CARDS), [])
+
+    def test_newly_synced_stream_requests_every_card(self):
+        self.sync_board(CARDS, stream_names=("card_custom_field_items",))
+
+        self.assertEqual(self.sync_board(CARDS), [])
+
+    def test_files_of_unacknowledged_sync_ignored(self):
+        self.sync_board(CARDS)
+        changed = [CARDS[0], {**CARDS[1], "dateLastActivity": "2024-06-01T00:00:00.000Z"}]
+        self.sync_board(changed, acknowledged=False)
+
+        # The target may not have received the attachments of the unacknowledged sync
+        self.assertEqual(self.sync_board(changed), [])
+
+    def test_boards_not_synced_carried_over(self):
+        self.sync_board(CARDS, board_id="board_2")
+        self.sync_board(CARDS)
+
+        self.assertEqual(self.sync_board(CARDS, board_id="board_2"), ["card_1", "card_2"])
+
+    def test_unreadable_file_ignored(self):
+        with open(os.path.join(self.directory, "board_1.json"), "w") as watermarks_file:
+            watermarks_file.write("{")
+
+        self.assertEqual(self.sync_board(CARDS), [])
+
+
+class TestCardChildrenWatermarks(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_attachments_of_unchanged_cards_not_written(self):
+        client = MagicMock(config=DEFAULT_CONFIG)
+        cards = Cards(client, DEFAULT_CONFIG, {})
+        attachments = CardAttachments(client, MagicMock(metadata=[]))
+        cards.card_watermarks = attachments.card_watermarks = CardWatermarks(self.directory, ["card_attachments"], {})
+
+        def sync_board(board_cards):
+            with patch("tap_trello.streams.abstracts.LegacyChildStream.get_parent_records",
+                       return_value=iter(board_cards)):
+                records = [attachments.get_embedded_records(card)
+                           for card in cards.get_parent_records("board_1", {"id": "board_1"})]
+            cards.on_parent_written("board_1")
+            return records
+
+        self.assertEqual(sync_board(CARDS), [[{"id": "attachment_1"}], [{"id": "attachment_2"}]])
+        changed = [CARDS[0], {**CARDS[1], "dateLastActivity": "2024-06-01T00:00:00.000Z"}]
+        self.assertEqual(sync_board(changed), [[], [{"id": "attachment_2"}]])
@@ -1,5 +1,6 @@
+import threading
 import unittest
-from unittest.mock import patch
+from unittest.mock import patch, MagicMock
 
 import requests
 from parameterized import parameterized
@@ -150,3 +151,62 @@ class TestClient(unittest.TestCase):
             self.assertEqual(mock_request.call_count, 5)
 
 
+
+    def test_successful_response_decoded_once(self):
+        mock_response = MockResponse(200, raise_error=False)
+        mock_response.json = MagicMock(return_value={"id": "card_1"})
+
+        with patch.object(self.client._session, "request", return_value=mock_response):
+            result = self.client._Client__make_request("GET", "https://api.example.com/resource")
+
+        self.assertEqual(result, {"id": "card_1"})
+        mock_response.json.assert_called_once()
+
+    def test_orjson_decoder(self):
+        try:
+            import orjson # pylint: disable=unused-import
+        except ImportError:
+            self.skipTest("orjson is not installed")
+        client = Client({**default_config, "json_decoder": "orjson"})
+        mock_response = MockResponse(200, content=b'[{"id": "card_1"}]', raise_error=False)
+
+        with patch.object(client._session, "request", return_value=mock_response):
+            result = client._Client__make_request("GET", "https://api.example.com/resource")
+
+        self.assertEqual(result, [{"id": "card_1"}])
+
+    def test_unsupported_json_decoder(self):
+        with self.assertRaises(ValueError):
+            Client({**default_config, "json_decoder": "yaml"})
+
+    def test_member_id_requested_without_blocking_new_sessions(self):
+        mock_response = MockResponse(200, raise_error=False)
+        mock_response.json = MagicMock(return_value={"id": "member_1"})
+        self.client.throttle.concurrency = 1
+        # Another thread holds the only request slot while the member id is requested
+        self.client.throttle.acquire()
+        member_ids = []
+
+        new_sessions = []
+        waiting = threading.Event()
+        acquire = self.client.throttle.acquire
+
+        def wait_for_slot():
+            waiting.set()
+            acquire()
+
+        with patch("requests.Session.request", return_value=mock_response), \
+                patch.object(self.client.throttle, "acquire", side_effect=wait_for_slot):
+            member_thread = threading.Thread(target=lambda: member_ids.append(self.client.member_id), daemon=True)
+            member_thread.start()
+            waiting.wait(timeout=5)
+            # The slot's holder sends its first request, from a new session
+            session_thread = threading.Thread(target=lambda: new_sessions.append(self.client._session), daemon=True)
+            session_thread.start()
+            session_thread.join(timeout=5)
+            self.client.throttle.release()
+            member_thread.join(timeout=5)
+
+        self.assertEqual(len(new_sessions), 1)
+        self.assertIn(new_sessions[0], self.client._sessions)
+        self.assertEqual(member_ids, ["member_1"])
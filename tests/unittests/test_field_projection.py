@@ -0,0 +1,117 @@
+import copy
+import unittest
+from unittest.mock import MagicMock
+
+from singer import metadata
+from singer.catalog import CatalogEntry, Schema
+
+from tap_trello.schema import get_schemas
+from tap_trello.streams import Actions, Cards, Checklists, Members
+from tap_trello.streams.abstracts import get_selected_properties, project_fields
+from tap_trello.sync import _instantiate_stream
+
+DEFAULT_CONFIG = {
+    "start_date": "2020-01-01T00:00:00Z",
+    "api_key": "dummy_key",
+    "api_token": "dummy_token",
+    "request_selected_fields": "true",
+}
+
+SCHEMAS, FIELD_METADATA = get_schemas()
+MEMBER_CREATOR_FIELDS = "activityBlocked,avatarHash,avatarUrl,fullName,id,idMemberReferrer,initials,nonPublicAvailable,username"
+
+
+def get_catalog_entry(stream_name, deselected=()):
+    mdata = metadata.to_map(copy.deepcopy(FIELD_METADATA[stream_name]))
+    for name in deselected:
+        mdata = metadata.write(mdata, ("properties", name), "selected", False)
+    return CatalogEntry(tap_stream_id=stream_name, stream=stream_name, schema=Schema.from_dict(SCHEMAS[stream_name]),
+                        metadata=metadata.to_list(mdata))
+
+
+def get_stream(stream_class, stream_name, deselected=(), config=None):
+    client = MagicMock(base_url="https://api.trello.com/1")
+    return _instantiate_stream(stream_class, client, get_catalog_entry(stream_name, deselected),
+                               config or DEFAULT_CONFIG, {})
+
+
+class TestSelectedProperties(unittest.TestCase):
+
+    def test_properties_kept_by_transformer(self):
+        schema = {"properties": {"id": {}, "name": {}, "desc": {}, "url": {}, "pos": {}}}
+        mdata = {("properties", "id"): {"inclusion": "automatic", "selected": False},
+                 ("properties", "name"): {"inclusion": "available", "selected": True},
+                 ("properties", "desc"): {"inclusion": "available", "selected": False},
+                 ("properties", "url"): {"inclusion": "unsupported"}}
+
+        self.assertEqual(get_selected_properties(schema, mdata), {"id", "name", "pos"})
+
+    def test_fields_projected_only_when_all_known(self):
+        self.assertEqual(project_fields(["id", "name", "pos"], ["name"], ["id"]), "id,name")
+        self.assertEqual(project_fields(["id", "name", "pos"], ["name", "limits"], ["id"]), "all")
+
+
+class TestFieldProjection(unittest.TestCase):
+
+    def test_cards_without_custom_field_items(self):
+        deselected = [name for name in SCHEMAS["cards"]["properties"] if name not in ("id", "name", "due")]
+        stream = get_stream(Cards, "cards", deselected)
+        stream.client.iter_get.return_value = [{"id": "card_1", "name": "Card", "idChecklists": []}]
+
+        records = list(stream.get_records(["board_1"]))
+
+        self.assertEqual(records, [{"id": "card_1", "name": "Card", "idChecklists": []}])
+        # The board's custom fields are not requested to name items which are not written
+        stream.client.get.assert_not_called()
+        self.assertEqual(stream.skipped_requests, 1)
+        params = stream.client.iter_get.call_args.kwargs["params"]
+        self.assertEqual(params["fields"], "due,id,idChecklists,name")
+        self.assertNotIn("customFieldItems", params)
+
+    def test_cards_with_custom_field_items(self):
+        stream = get_stream(Cards, "cards", ["desc", "descData"])
+        stream.client.get.return_value = []
+        stream.client.iter_get.return_value = []
+
+        list(stream.get_records(["board_1"]))
+
+        stream.client.get.assert_called_once_with("/boards/board_1/customFields", cacheable=True)
+        params = stream.client.iter_get.call_args.kwargs["params"]
+        self.assertEqual(params["customFieldItems"], "true")
+        self.assertNotIn("desc", params["fields"].split(","))
+
+    def test_nested_resources_left_out(self):
+        checklists = get_stream(Checklists, "checklists", [name for name in SCHEMAS["checklists"]["properties"]
+                                                           if name not in ("id", "name", "idCard")])
+        actions = get_stream(Actions, "actions", ["member", "limits"])
+
+        self.assertEqual(checklists.params, {"fields": "id,idCard,name", "checkItem_fields": "all",
+                                             "checkItems": "none"})
+        self.assertEqual(actions.params, {"limit": 1000, "fields": "data,date,id,idMemberCreator,type",
+                                          "member": "false", "memberCreator_fields": MEMBER_CREATOR_FIELDS})
+
+    def test_nested_fields_projected(self):
+        actions = get_stream(Actions, "actions", ["member"])
+        checklists = Checklists(MagicMock(), DEFAULT_CONFIG, {})
+        checklists.select_fields({"properties": {"id": {}, "checkItems": {"type": "array", "items": {
+            "properties": {"id": {}, "idChecklist": {}, "name": {}, "state": {}}}}}}, {})
+
+        self.assertEqual(actions.params["memberCreator_fields"], MEMBER_CREATOR_FIELDS)
+        self.assertNotIn("member_fields", actions.params)
+        self.assertEqual(checklists.params["checkItem_fields"], "name,state")
+        # creationMethod, in the schema of check items, is not a field Trello accepts
+        self.assertEqual(get_stream(Checklists, "checklists").params["checkItem_fields"], "all")
+
+    def test_unknown_field_selected_requests_all(self):
+        deselected = [name for name in SCHEMAS["members"]["properties"] if name not in ("id", "fullName", "nodeId")]
+
+        self.assertEqual(get_stream(Members, "members", deselected + ["nodeId"]).params, {"fields": "fullName,id"})
+        # nodeId is not a field Trello accepts
+        self.assertEqual(get_stream(Members, "members", deselected).params, {"fields": "all"})
+
+    def test_whole_records_requested_by_default(self):
+        stream = get_stream(Checklists, "checklists", ["checkItems"], config={**DEFAULT_CONFIG,
+                                                                             "request_selected_fields": False})
+
+        self.assertIsNone(stream.selected_properties)
+        self.assertEqual(stream.params, {"fields": "all", "checkItem_fields": "all"})
@@ -0,0 +1,121 @@
+import json
+import unittest
+from unittest.mock import patch, MagicMock
+
+from parameterized import parameterized
+
+from tap_trello.client import Client
+from tap_trello.json_stream import decode_json_stream, iter_text
+from tap_trello.streams import Cards, Lists
+
+DEFAULT_CONFIG = {
+    "start_date": "2020-01-01T00:00:00Z",
+    "api_key": "dummy_key",
+    "api_token": "dummy_token",
+    "stream_responses": "true",
+}
+
+RECORDS = [{"id": "card_{}".format(i), "name": "Ünïcode ✓ " * i, "pos": i * 1.5, "closed": False,
+            "due": None, "idChecklists": ["a", "b"]} for i in range(50)]
+
+
+def split(body, size):
+    return [body[i:i + size] for i in range(0, len(body), size)]
+
+
+class TestDecodeJsonStream(unittest.TestCase):
+
+    @parameterized.expand([["one byte", 1], ["odd", 7], ["page", 4096], ["whole", 10 ** 6]])
+    def test_array_items_decoded_across_chunks(self, test_name, chunk_size):
+        body = json.dumps(RECORDS + [12.5e3, "last"], indent=2).encode()
+
+        items = decode_json_stream(iter_text(split(body, chunk_size)))
+
+        self.assertEqual(list(items), RECORDS + [12.5e3, "last"])
+
+    def test_items_yielded_before_body_downloaded(self):
+        body = json.dumps(RECORDS).encode()
+        chunks = split(body, 64)
+        consumed = []
+
+        def iter_chunks():
+            for chunk in chunks:
+                consumed.append(chunk)
+                yield chunk
+
+        items = decode_json_stream(iter_text(iter_chunks()))
+
+        self.assertEqual(next(items), RECORDS[0])
+        self.assertLess(len(consumed), len(chunks) / 10)
+
+    def test_non_array_decoded_whole(self):
+        self.assertEqual(decode_json_stream(iter_text([b' {"id": ', b'"board_1"}'])), {"id": "board_1"})
+
+    @parameterized.expand([["unterminated", "[1, 2"], ["missing delimiter", "[1 2]"],
+                           ["extra data", "[1] 2"], ["invalid item", '[{"a": }]'],
+                           ["trailing delimiter", "[1,]"], ["trailing delimiter and whitespace", "[1, \n ]"],
+                           ["delimiter only", "[,]"]])
+    def test_malformed_array_raises(self, test_name, body):
+        with self.assertRaises(json.JSONDecodeError):
+            list(decode_json_stream(iter(body)))
+
+
+class TestStreamedRequests(unittest.TestCase):
+
+    def make_response(self, records):
+        response = MagicMock(status_code=200, headers={}, encoding="utf-8")
+        response.iter_content.return_value = iter(split(json.dumps(records).encode(), 100))
+        return response
+
+    @patch("tap_trello.client.session")
+    def test_iter_get_streams_list_responses(self, mock_session):
+        response = self.make_response(RECORDS)
+        mock_session.return_value.request.return_value = response
+        client = Client(DEFAULT_CONFIG)
+
+        records = client.iter_get("/boards/board_1/cards/all")
+
+        self.assertTrue(mock_session.return_value.request.call_args.kwargs["stream"])
+        self.assertEqual(list(records), RECORDS)
+        response.json.assert_not_called()
+        response.close.assert_called_once()
+
+    @patch("tap_trello.client.session")
+    def test_responses_not_streamed_by_default(self, mock_session):
+        mock_session.return_value.request.return_value = MagicMock(
+            status_code=200, headers={}, json=MagicMock(return_value=RECORDS))
+        client = Client({**DEFAULT_CONFIG, "stream_responses": False})
+
+        self.assertEqual(client.iter_get("/boards/board_1/cards/all"), RECORDS)
+        self.assertNotIn("stream", mock_session.return_value.request.call_args.kwargs)
+
+    @patch("tap_trello.client.session")
+    def test_cards_paginate_from_streamed_pages(self, mock_session):
+        first_page = [{"id": "61973e91b41fcf475f84b351", "customFieldItems": [], "idChecklists": []},
+                      {"id": "60ca516249f04d4221b33450", "customFieldItems": [], "idChecklists": []}]
+        second_page = [{"id": "60c901a838d5f63c42d22044", "customFieldItems": [], "idChecklists": []}]
+        custom_fields = MagicMock(status_code=200, headers={}, json=MagicMock(return_value=[]))
+        mock_session.return_value.request.side_effect = [
+            custom_fields, self.make_response(first_page), self.make_response(second_page)]
+        config = {**DEFAULT_CONFIG, "cards_response_size": 2}
+        cards = Cards(Client(config), config, {})
+
+        records = list(cards.get_records(["board_1"]))
+
+        self.assertEqual([record["id"] for record in records],
+                         [record["id"] for record in first_page + second_page])
+        # The next page ends at the smallest card id of the previous one
+        self.assertEqual(mock_session.return_value.request.call_args.kwargs["params"]["before"],
+                         "60ca516249f04d4221b33450")
+
+    @patch("tap_trello.client.session")
+    def test_full_streamed_page_raises_before_records_yielded(self, mock_session):
+        mock_session.return_value.request.return_value = self.make_response(RECORDS[:3])
+        lists = Lists(Client(DEFAULT_CONFIG), DEFAULT_CONFIG, {})
+        lists.MAX_API_RESPONSE_SIZE = 3
+        records = lists.get_records(["board_1"])
+
+        with self.assertRaises(Exception) as context:
+            next(records)
+
+        self.assertIn("max API response size of 3", str(context.exception))
@@ -0,0 +1,109 @@
+import copy
+import unittest
+from unittest.mock import MagicMock
+
+from singer import metadata
+from singer.catalog import CatalogEntry, Schema
+
+from tap_trello.embedded_members import EmbeddedMembers
+from tap_trello.schema import get_schemas
+from tap_trello.streams import Actions, Members, OrganizationMembers
+from tap_trello.streams.abstracts import get_batched_parent_records
+
+
+def get_client(config=None):
+    client = MagicMock(base_url="https://api.trello.com/1", config=config or {})
+    client.embedded_members = EmbeddedMembers.from_config(client.config)
+    client.make_request.side_effect = lambda method, url, *args, **kwargs: {"id": url.split("/")[-1]}
+    client.get_batch.side_effect = lambda paths, cacheable_paths: [{"id": path.split("/")[-1]} for path in paths]
+    return client
+
+
+def get_catalog_entry(selected):
+    schemas, field_metadata = get_schemas()
+    mdata = metadata.to_map(copy.deepcopy(field_metadata["members"]))
+    for name in schemas["members"]["properties"]:
+        if name not in selected:
+            mdata = metadata.write(mdata, ("properties", name), "selected", False)
+    return CatalogEntry(tap_stream_id="members", stream="members", schema=Schema.from_dict(schemas["members"]),
+                        metadata=metadata.to_list(mdata))
+
+
+class TestMembersDedupe(unittest.TestCase):
+
+    def test_member_requested_once_across_boards(self):
+        stream = Members(get_client(), None)
+        users = [{"id": "member_1", "boardId": "board_1"}, {"id": "member_2", "boardId": "board_1"},
+                 {"id": "member_1", "boardId": "board_2"}]
+
+        records = [list(stream.get_parent_records(user)) for user in users]
+
+        self.assertEqual(records, [[{"id": "member_1"}], [{"id": "member_2"}], []])
+        self.assertEqual(stream.client.make_request.call_count, 2)
+        self.assertEqual(stream.skipped_requests, 1)
+
+    def test_batch_requests_each_member_once(self):
+        client = get_client()
+        stream = Members(client, None)
+        users = [{"id": "member_1"}, {"id": "member_2"}, {"id": "member_1"}]
+
+        records = get_batched_parent_records(client, [(stream, user) for user in users])
+
+        client.get_batch.assert_called_once_with(["/members/member_1", "/members/member_2"], set())
+        self.assertEqual(records, [[{"id": "member_1"}], [{"id": "member_2"}], []])
+
+    def test_batch_paths_keep_field_projection(self):
+        client = get_client()
+        stream = Members(client, None)
+        stream.params = {"fields": "id,fullName,username"}
+
+        get_batched_parent_records(client, [(stream, {"id": "member_1"}), (stream, {"id": "member_2"})])
+
+        client.get_batch.assert_called_once_with(["/members/member_1?fields=id%2CfullName%2Cusername",
+                                                  "/members/member_2?fields=id%2CfullName%2Cusername"], set())
+
+
+class TestMembersFromEmbedded(unittest.TestCase):
+
+    config = {"start_date": "2020-01-01T00:00:00Z", "members_from_embedded": "true"}
+
+    def test_members_harvested_from_actions_and_organizations(self):
+        client = get_client(self.config)
+        client.iter_get.return_value = [
+            {"id": "action_1", "date": "2021-01-02T00:00:00.000Z",
+             "memberCreator": {"id": "member_1", "fullName": "Ada", "username": "ada"},
+             "member": {"id": "member_2", "fullName": "Bob"}}]
+        actions = Actions(client, self.config, {"bookmarks": {"actions": {"window_start": "2021-01-01T00:00:00Z",
+                                                                          "window_end": "2021-01-03T00:00:00Z"}}})
+        list(actions.get_records(["board_1"]))
+        OrganizationMembers(client, None).modify_object({"id": "member_2", "fullName": "Bob", "username": "bob"},
+                                                        {"id": "org_1"})
+        members = Members(client, get_catalog_entry(["id", "fullName", "username"]))
+
+        records = [list(members.get_parent_records({"id": member_id}))
+                   for member_id in ["member_1", "member_2", "member_3"]]
+
+        self.assertEqual(records, [[{"id": "member_1", "fullName": "Ada", "username": "ada"}],
+                                   # The most complete object is kept, without the organization_id of its stream
+                                   [{"id": "member_2", "fullName": "Bob", "username": "bob"}],
+                                   [{"id": "member_3"}]])
+        client.make_request.assert_called_once()
+        self.assertEqual(members.skipped_requests, 2)
+
+    def test_partial_member_requested(self):
+        client = get_client(self.config)
+        client.embedded_members.add({"id": "member_1", "fullName": "Ada", "username": "ada"})
+        members = Members(client, get_catalog_entry(["id", "fullName", "username", "email"]))
+
+        records = list(members.get_parent_records({"id": "member_1"}))
+
+        # The embedded object has no email, which would be written as null
+        self.assertEqual(records, [{"id": "member_1"}])
+        client.make_request.assert_called_once()
+        self.assertEqual(members.skipped_requests, 0)
+
+    def test_nothing_harvested_by_default(self):
+        embedded_members = EmbeddedMembers.from_config({})
+        embedded_members.add_from_action({"id": "action_1", "memberCreator": {"id": "member_1"}})
+
+        self.assertEqual(len(embedded_members), 0)
@@ -0,0 +1,90 @@
+import unittest
+from unittest.mock import patch, MagicMock
+
+from tap_trello.embedded_members import EmbeddedMembers
+from tap_trello.streams import OrganizationActions
+
+CONFIG = {"start_date": "2020-01-01T00:00:00Z"}
+ORGANIZATION = {"id": "org_1"}
+# Five actions, newest first
+ACTIONS = [{"id": "action_{}".format(index), "date": "2024-05-0{}T00:00:00.000Z".format(index)}
+           for index in range(5, 0, -1)]
+
+
+@patch("tap_trello.streams.organization_actions.singer.write_state")
+@patch("tap_trello.streams.organization_actions.write_record")
+class TestOrganizationActions(unittest.TestCase):
+
+    def iter_request(self, method, url, params, **kwargs):
+        self.requests.append(dict(params))
+        matching = [action for action in ACTIONS if action["date"] > params["since"]
+                    and ("before" not in params or action["id"] < params["before"])]
+        return [dict(action) for action in matching[:params["limit"]]]
+
+    def get_stream(self):
+        self.requests = []
+        client = MagicMock(config=CONFIG, embedded_members=EmbeddedMembers())
+        client.iter_request.side_effect = self.iter_request
+        stream = OrganizationActions(client, MagicMock(metadata=[]))
+        stream.is_selected = MagicMock(return_value=True)
+        stream.MAX_API_RESPONSE_SIZE = 2
+        stream.params = {"limit": 2}
+        return stream
+
+    def sync(self, stream, state, mock_write_record):
+        transformer = MagicMock()
+        transformer.transform.side_effect = lambda record, schema, mdata: record
+        stream.on_parents_started(state)
+        count = stream.write_parent_records(stream.get_parent_records(ORGANIZATION), state, transformer, ORGANIZATION)
+        return count, [c.args[1]["id"] for c in mock_write_record.call_args_list]
+
+    def test_every_page_requested(self, mock_write_record, mock_write_state):
+        state = {}
+        stream = self.get_stream()
+
+        count, written = self.sync(stream, state, mock_write_record)
+
+        self.assertEqual((count, written), (5, [action["id"] for action in ACTIONS]))
+        self.assertEqual([params.get("before") for params in self.requests], [None, "action_4", "action_2"])
+        self.assertEqual(state["bookmarks"]["organization_actions"]["organizations"],
+                         {"org_1": {"date": "2024-05-05T00:00:00.000Z"}})
+        # The bookmark was checkpointed after each page
+        checkpoints = [c.args[0]["bookmarks"]["organization_actions"]["organizations"]["org_1"]
+                       for c in mock_write_state.call_args_list]
+        self.assertEqual(len(checkpoints), 3)
+
+    def test_interrupted_sync_resumed(self, mock_write_record, *mocks):
+        state = {"bookmarks": {"organization_actions": {"organizations": {"org_1": {
+            "date": "2024-05-01T00:00:00.000Z", "window_end": "2024-05-05T00:00:00.000Z", "before": "action_4"}}}}}
+        stream = self.get_stream()
+
+        _, written = self.sync(stream, state, mock_write_record)
+
+        self.assertEqual(written, ["action_3", "action_2"])
+        self.assertEqual(self.requests[0]["since"], "2024-05-01T00:00:00.000Z")
+        self.assertEqual(state["bookmarks"]["organization_actions"]["organizations"],
+                         {"org_1": {"date": "2024-05-05T00:00:00.000Z"}})
+
+    def test_stream_bookmark_used_until_organization_bookmarks(self, mock_write_record, *mocks):
+        state = {"bookmarks": {"organization_actions": {"date": "2024-05-03T00:00:00.000Z"}}}
+        stream = self.get_stream()
+
+        _, written = self.sync(stream, state, mock_write_record)
+
+        self.assertEqual(written, ["action_5", "action_4"])
+        # Organizations not synced since the upgrade still resume from the stream's date
+        self.assertEqual(stream.get_organization_bookmark(state, "org_2"), {"date": "2024-05-03T00:00:00.000Z"})
+        self.assertEqual(stream.get_organization_bookmark({}, "org_2"), {"date": CONFIG["start_date"]})
+
+    def test_organization_without_new_actions_keeps_stream_date(self, mock_write_record, *mocks):
+        state = {"bookmarks": {"organization_actions": {"date": "2024-06-01T00:00:00.000Z",
+                                                        "organizations": {"org_1": {"date": "2024-06-02T00:00:00.000Z"}}}}}
+        stream = self.get_stream()
+        organization = {"id": "org_2"}
+        stream.on_parents_started(state)
+
+        stream.write_parent_records(stream.get_parent_records(organization), state, MagicMock(), organization)
+
+        self.assertEqual(self.requests[0]["since"], "2024-06-01T00:00:00.000Z")
+        self.assertEqual(state["bookmarks"]["organization_actions"]["organizations"]["org_2"],
+                         {"date": "2024-06-01T00:00:00.000Z"})
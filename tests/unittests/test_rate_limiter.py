@@ -0,0 +1,175 @@
+import unittest
+from unittest.mock import patch, MagicMock
+
+from tap_trello.client import Client
+from tap_trello.rate_limiter import AdaptiveThrottle, RateLimiter, TokenBucket, get_remaining_ratio
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def make_response(status_code=200, headers=None):
+    return MagicMock(status_code=status_code, headers=headers or {})
+
+
+def make_quota_headers(remaining, maximum=100):
+    return {"x-rate-limit-api-token-remaining": str(remaining), "x-rate-limit-api-token-max": str(maximum),
+            "x-rate-limit-api-key-remaining": "290", "x-rate-limit-api-key-max": "300"}
+
+
+class TestTokenBucket(unittest.TestCase):
+
+    def test_burst_then_paced_within_budget(self):
+        clock = FakeClock()
+        bucket = TokenBucket("token", 100, 10, clock=clock, sleep=clock.sleep)
+
+        for _ in range(200):
+            bucket.acquire()
+
+        # 10 requests pass at once, the other 190 are paced at 9 per second
+        self.assertEqual(len(clock.sleeps), 190)
+        self.assertAlmostEqual(clock.now, 190 / 9)
+        self.assertAlmostEqual(bucket.wait_seconds, sum(clock.sleeps))
+        self.assertEqual(bucket.waited_requests, 190)
+
+    def test_no_wait_under_budget(self):
+        clock = FakeClock()
+        bucket = TokenBucket("token", 100, 10, clock=clock, sleep=clock.sleep)
+
+        for _ in range(50):
+            clock.now += 0.2
+            bucket.acquire()
+
+        self.assertEqual(clock.sleeps, [])
+
+
+class TestRateLimiter(unittest.TestCase):
+
+    def test_default_budgets(self):
+        limiter = RateLimiter.from_config({})
+
+        self.assertEqual([bucket.name for bucket in limiter.buckets], ["api_key", "token"])
+        self.assertEqual([bucket.rate for bucket in limiter.buckets], [27.0, 9.0])
+
+    def test_configured_budgets(self):
+        limiter = RateLimiter.from_config({"rate_limit_key_requests": 0,
+                                           "rate_limit_token_requests": "50",
+                                           "rate_limit_interval": 5})
+
+        self.assertEqual([bucket.name for bucket in limiter.buckets], ["token"])
+        self.assertEqual(limiter.buckets[0].rate, 9.0)
+
+    def test_sleeps_once_for_slowest_bucket(self):
+        clock = FakeClock()
+        buckets = [TokenBucket("api_key", 20, 10, clock=clock), TokenBucket("token", 10, 10, clock=clock)]
+        limiter = RateLimiter(buckets, sleep=clock.sleep)
+
+        for _ in range(3):
+            limiter.acquire()
+
+        # The token bucket allows a single request at once, then one request per 1/0.9 seconds
+        self.assertEqual(len(clock.sleeps), 2)
+        self.assertAlmostEqual(clock.sleeps[0], 1 / 0.9)
+
+    @patch("tap_trello.rate_limiter.metrics.log")
+    def test_wait_time_metrics(self, mock_log):
+        clock = FakeClock()
+        limiter = RateLimiter([TokenBucket("token", 10, 10, clock=clock)], sleep=clock.sleep)
+        limiter.acquire()
+        limiter.acquire()
+
+        limiter.write_metrics()
+
+        point = mock_log.call_args.args[1]
+        self.assertEqual(point.metric, "rate_limit_wait")
+        self.assertAlmostEqual(point.value, 1.111)
+        self.assertEqual(point.tags, {"bucket": "token", "waited_requests": 1})
+
+    @patch("requests.Session.request")
+    def test_client_requests_are_paced(self, mock_request):
+        mock_request.return_value = MagicMock(status_code=200, json=MagicMock(return_value={}))
+        client = Client({"api_key": "key", "api_token": "token"})
+        client.rate_limiter = MagicMock()
+
+        client.get("/members/me")
+
+        client.rate_limiter.acquire.assert_called_once()
+
+
+class TestAdaptiveThrottle(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.throttle = AdaptiveThrottle(4, clock=self.clock, sleep=self.clock.sleep)
+
+    def request(self, response):
+        self.throttle.acquire()
+        self.throttle.release(response)
+
+    def test_remaining_ratio_from_headers(self):
+        self.assertEqual(get_remaining_ratio(make_quota_headers(30)), 0.3)
+        self.assertIsNone(get_remaining_ratio({"x-rate-limit-api-token-remaining": "30"}))
+
+    def test_requests_start_at_max_concurrency(self):
+        for _ in range(4):
+            self.throttle.acquire()
+
+        self.assertEqual(self.throttle.in_flight, 4)
+        self.assertEqual(self.clock.sleeps, [])
+
+    @patch("tap_trello.rate_limiter.metrics.log")
+    def test_concurrency_grows_additively(self, mock_log):
+        self.throttle.concurrency = 1
+        for _ in range(20):
+            self.request(make_response(headers=make_quota_headers(90)))
+
+        self.assertEqual(self.throttle.concurrency, 4)
+        self.assertEqual(self.clock.sleeps, [])
+        self.assertEqual([c.args[1].value for c in mock_log.call_args_list], [2, 3, 4])
+
+    @patch("tap_trello.rate_limiter.metrics.log")
+    def test_low_remaining_halves_concurrency_and_spaces_requests(self, mock_log):
+        self.throttle.concurrency = 4
+
+        self.request(make_response(headers=make_quota_headers(10)))
+        self.request(make_response(headers=make_quota_headers(10)))
+        self.request(make_response(headers=make_quota_headers(90)))
+
+        # Halved twice, the spacing doubled to 0.2s, then shrunk by a step after a successful round
+        self.assertEqual(self.throttle.concurrency, 1)
+        self.assertEqual(self.throttle.spacing, 0.1)
+        self.assertEqual(self.clock.sleeps, [0.1])
+        point = mock_log.call_args.args[1]
+        self.assertEqual(point.metric, "rate_limit_adjustment")
+        self.assertEqual(point.tags, {"direction": "increase", "reason": "success", "spacing": 0.1})
+
+    @patch("tap_trello.rate_limiter.metrics.log")
+    def test_retry_after_pauses_requests(self, mock_log):
+        self.request(make_response(429, {"Retry-After": "3"}))
+        self.throttle.acquire()
+
+        self.assertEqual(self.clock.sleeps, [3.0])
+        self.assertEqual(mock_log.call_args.args[1].tags["reason"], "retry_after")
+
+    @patch("requests.Session.request")
+    def test_client_reports_responses(self, mock_request):
+        response = MagicMock(status_code=200, headers={}, json=MagicMock(return_value={}))
+        mock_request.return_value = response
+        client = Client({"api_key": "key", "api_token": "token"})
+        client.throttle = MagicMock()
+
+        client.get("/members/me")
+
+        client.throttle.acquire.assert_called_once()
+        client.throttle.release.assert_called_once_with(response)
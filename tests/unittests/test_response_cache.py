@@ -0,0 +1,100 @@
+import unittest
+from unittest.mock import patch, MagicMock
+
+from tap_trello.client import Client
+from tap_trello.response_cache import MISSING, ResponseCache, get_cache_key
+from tap_trello.streams import BoardCustomFields, Cards
+
+BASE_URL = "https://api.trello.com/1"
+DEFAULT_CONFIG = {"api_key": "key", "api_token": "token"}
+
+
+def make_response(body):
+    return MagicMock(status_code=200, headers={}, json=MagicMock(return_value=body))
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def test_least_recently_used_evicted(self):
+        cache = ResponseCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+
+        self.assertEqual(cache.get("b"), MISSING)
+        self.assertEqual((cache.get("a"), cache.get("c")), (1, 3))
+        self.assertEqual(cache.get_stats(), {"hits": 3, "misses": 1, "size": 2})
+
+    def test_responses_copied(self):
+        cache = ResponseCache()
+        response = [{"id": "field_1"}]
+        cache.put("key", response)
+        response[0]["boardId"] = "board_1"
+        cache.get("key")[0]["boardId"] = "board_2"
+
+        self.assertEqual(cache.get("key"), [{"id": "field_1"}])
+
+    def test_key_normalized(self):
+        self.assertEqual(get_cache_key(BASE_URL, BASE_URL + "//members/me", {"token": "t", "key": "k"}),
+                         get_cache_key(BASE_URL, "/members/me/", None))
+        self.assertEqual(get_cache_key(BASE_URL, BASE_URL + "/boards/1/cards", {"limit": 10, "fields": "id"}),
+                         ("/boards/1/cards", (("fields", "id"), ("limit", "10"))))
+
+    @patch("tap_trello.response_cache.metrics.log")
+    def test_hit_and_miss_metrics(self, mock_log):
+        cache = ResponseCache()
+        cache.get("key")
+        cache.put("key", {})
+        cache.get("key")
+
+        cache.write_metrics()
+
+        self.assertEqual([(c.args[1].metric, c.args[1].value) for c in mock_log.call_args_list],
+                         [("response_cache_hits", 1), ("response_cache_misses", 1)])
+
+
+@patch("tap_trello.client.session")
+class TestClientMemoization(unittest.TestCase):
+
+    def test_cacheable_requests_sent_once(self, mock_session):
+        mock_session.return_value.request.return_value = make_response({"id": "member_1"})
+        client = Client(DEFAULT_CONFIG)
+
+        responses = [client.get("/members/member_1", cacheable=True) for _ in range(3)]
+
+        self.assertEqual(responses, [{"id": "member_1"}] * 3)
+        self.assertEqual(mock_session.return_value.request.call_count, 1)
+
+    def test_other_requests_always_sent(self, mock_session):
+        mock_session.return_value.request.return_value = make_response({"id": "member_1"})
+        client = Client(DEFAULT_CONFIG)
+        client.get("/members/member_1")
+        client.get("/members/member_1")
+        Client({**DEFAULT_CONFIG, "response_cache_size": 0}).get("/members/member_1", cacheable=True)
+
+        self.assertEqual(mock_session.return_value.request.call_count, 3)
+
+    def test_batch_requests_only_uncached_paths(self, mock_session):
+        client = Client(DEFAULT_CONFIG)
+        client.response_cache.put(get_cache_key(BASE_URL, "/members/1", None), {"id": "1"})
+        mock_session.return_value.request.return_value = make_response([{"200": {"id": "2"}}, {"200": {"id": "3"}}])
+
+        responses = client.get_batch(["/members/1", "/members/2", "/members/3"], {"/members/1", "/members/2"})
+
+        self.assertEqual(responses, [{"id": "1"}, {"id": "2"}, {"id": "3"}])
+        params = mock_session.return_value.request.call_args.kwargs["params"]
+        self.assertEqual(params["urls"], "/members/2,/members/3")
+        self.assertEqual(client.response_cache.get(get_cache_key(BASE_URL, "/members/2", None)), {"id": "2"})
+        self.assertEqual(client.response_cache.get(get_cache_key(BASE_URL, "/members/3", None)), MISSING)
+
+    def test_board_custom_fields_shared_with_cards(self, mock_session):
+        custom_fields = [{"id": "field_1", "name": "Priority", "type": "text"}]
+        mock_session.return_value.request.return_value = make_response(custom_fields)
+        client = Client(DEFAULT_CONFIG)
+
+        Cards(client, DEFAULT_CONFIG, {}).build_custom_fields_maps(parent_id_list=["board_1"])
+        records = list(BoardCustomFields(client, None).get_parent_records({"id": "board_1"}))
+
+        self.assertEqual(records, [{**custom_fields[0], "boardId": "board_1"}])
+        self.assertEqual(mock_session.return_value.request.call_count, 1)
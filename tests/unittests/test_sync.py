@@ -1,7 +1,15 @@
+import threading
+import time
 import unittest
+from urllib.parse import urlparse
 from unittest.mock import patch, MagicMock
 
-from tap_trello.sync import write_schema, sync, update_currently_syncing
+import requests
+
+from tap_trello.client import Client
+from tap_trello.streams.abstracts import LegacyChildStream
+from tap_trello.sync import (write_schema, sync, update_currently_syncing, ChildSync, format_sync_plan,
+                             get_sync_plan)
 
 
 class TestSync(unittest.TestCase):
@@ -72,7 +80,7 @@ class TestSync(unittest.TestCase):
         client = MagicMock()
         config = {}
 
-        mock_sync.return_value = iter([{}])
+        mock_sync.return_value = iter([{"id": "5f0c9a3b1d2e4f0012345678"}])
 
         sync(client, config, mock_catalog, state)
 
@@ -99,7 +107,7 @@ class TestSync(unittest.TestCase):
         client = MagicMock()
         config = {}
 
-        mock_sync.return_value = iter([{}])
+        mock_sync.return_value = iter([{"id": "5f0c9a3b1d2e4f0012345678"}])
 
         sync(client, config, mock_catalog, state)
 
@@ -132,3 +140,323 @@ class TestSync(unittest.TestCase):
         mock_set_currently_syncing.assert_called_once_with(state, "new_stream")
         mock_write_state.assert_called_once_with(state)
         self.assertNotIn("currently_syncing", state)
+
+    @patch("singer.write_schema")
+    @patch("singer.write_state")
+    @patch("singer.write_record")
+    @patch("tap_trello.streams.checklists.Checklists.get_records")
+    @patch("tap_trello.streams.lists.Lists.get_records")
+    @patch("tap_trello.streams.boards.Boards.get_records")
+    def test_boards_listed_once_for_all_children(self, mock_boards, mock_lists, mock_checklists,
+                                                 mock_write_record, mock_write_state, mock_write_schema):
+        mock_catalog = MagicMock()
+        selected = []
+        for name in ["boards", "lists", "checklists"]:
+            catalog_stream = MagicMock()
+            catalog_stream.stream = name
+            selected.append(catalog_stream)
+        mock_catalog.get_selected_streams.return_value = selected
+        mock_catalog.get_stream.return_value.metadata = []
+
+        mock_boards.return_value = iter([{"id": "5f0c9a3b1d2e4f0012345678"},
+                                         {"id": "5a0c9a3b1d2e4f0012345678"}])
+        mock_lists.side_effect = lambda format_values: iter([{"id": "list_" + format_values[0]}])
+        mock_checklists.side_effect = lambda format_values: iter([])
+
+        sync(MagicMock(), {}, mock_catalog, {})
+
+        self.assertEqual(mock_boards.call_count, 1)
+        # Boards are dispatched to each child in creation order
+        self.assertEqual([c.args[0] for c in mock_lists.call_args_list],
+                         [["5a0c9a3b1d2e4f0012345678"], ["5f0c9a3b1d2e4f0012345678"]])
+        self.assertEqual(mock_checklists.call_count, 2)
+
+    @patch("singer.write_schema")
+    @patch("singer.write_state")
+    @patch("singer.write_record")
+    @patch("tap_trello.streams.card_custom_field_items.CardCustomFieldItems.get_parent_records", return_value=iter([]))
+    @patch("tap_trello.streams.card_attachments.CardAttachments.get_parent_records", return_value=iter([]))
+    @patch("tap_trello.streams.cards.Cards.get_records")
+    @patch("tap_trello.streams.boards.Boards.get_records")
+    def test_cards_enumerated_once_for_card_children(self, mock_boards, mock_cards, mock_attachments_sync,
+                                                     mock_custom_field_items_sync, mock_write_record,
+                                                     mock_write_state, mock_write_schema):
+        mock_catalog = MagicMock()
+        selected = []
+        for name in ["card_attachments", "boards", "cards", "card_custom_field_items"]:
+            catalog_stream = MagicMock()
+            catalog_stream.stream = name
+            selected.append(catalog_stream)
+        mock_catalog.get_selected_streams.return_value = selected
+        mock_catalog.get_stream.return_value.metadata = []
+
+        mock_boards.return_value = iter([{"id": "5f0c9a3b1d2e4f0012345678"}])
+        mock_cards.return_value = iter([{"id": "card_1"}, {"id": "card_2"}])
+
+        sync(MagicMock(), {}, mock_catalog, {})
+
+        self.assertEqual(mock_cards.call_count, 1)
+        for mock_child_sync in (mock_attachments_sync, mock_custom_field_items_sync):
+            self.assertEqual([c.args[0] for c in mock_child_sync.call_args_list],
+                             [{"id": "card_1"}, {"id": "card_2"}])
+
+
+class TestChildSync(unittest.TestCase):
+
+    @patch("singer.write_state")
+    @patch("singer.write_record")
+    def test_legacy_child_resumes_from_bookmarked_parent(self, mock_write_record, mock_write_state):
+        stream = MagicMock(spec=LegacyChildStream)
+        stream.skipped_requests = 0
+        stream.get_bookmarked_parent_id.return_value = "board_2"
+        stream.get_parent_records.side_effect = lambda parent_id, parent_record: iter([{"id": parent_id}])
+
+        child = ChildSync("lists", stream, MagicMock(metadata=[]), {}, MagicMock())
+
+        child.start(["board_1", "board_2", "board_3"])
+        for board_id in ["board_1", "board_2", "board_3"]:
+            if child.wants_parent({"id": board_id}):
+                child.write_parent({"id": board_id})
+        child.finish()
+
+        self.assertEqual([c.args[0] for c in stream.checkpoint_parent.call_args_list], ["board_2", "board_3"])
+        self.assertEqual(child.total_records, 2)
+        stream.on_parents_finished.assert_called_once()
+
+    def test_grandchildren_requested_a_few_chunks_ahead(self):
+        cards = MagicMock(spec=LegacyChildStream)
+        cards.get_parent_records.side_effect = lambda parent_id, parent_record: iter(
+            [{"id": "card_{}".format(index)} for index in range(1000)])
+        attachments = MagicMock(parallel_fetch=True, batchable=False)
+        child = ChildSync("cards", cards, MagicMock(metadata=[]), {}, MagicMock())
+        child.children = [ChildSync("card_attachments", attachments, MagicMock(metadata=[]), {}, MagicMock())]
+        executor = MagicMock()
+
+        records = child.fetch_parent({"id": "board_1"}, executor)
+        next(iter(records))
+
+        # A 1000 cards board holds the cards and attachment requests of 3 chunks of 10 cards
+        self.assertEqual(cards.get_parent_records.call_count, 1)
+        self.assertEqual(executor.submit.call_count, 30)
+
+    @patch("singer.write_schema")
+    @patch("singer.write_state")
+    @patch("singer.write_record")
+    @patch("tap_trello.streams.lists.Lists.get_records")
+    @patch("tap_trello.streams.boards.Boards.get_records")
+    def test_concurrent_boards_written_in_order(self, mock_boards, mock_lists, mock_write_record,
+                                                mock_write_state, mock_write_schema):
+        mock_catalog = MagicMock()
+        selected = []
+        for name in ["boards", "lists"]:
+            catalog_stream = MagicMock()
+            catalog_stream.stream = name
+            selected.append(catalog_stream)
+        mock_catalog.get_selected_streams.return_value = selected
+        mock_catalog.get_stream.return_value.metadata = []
+
+        board_ids = ["5a0c9a{:02d}1d2e4f0012345678".format(i) for i in range(10)]
+        mock_boards.return_value = iter([{"id": board_id} for board_id in reversed(board_ids)])
+        written = []
+        mock_lists.side_effect = lambda format_values: iter([{"id": "list_" + format_values[0]}])
+        mock_write_record.side_effect = lambda stream_name, record: written.append((stream_name, record["id"]))
+        # Each board is checkpointed before its lists are written
+        mock_write_state.side_effect = lambda state: written.append(
+            ("state", state.get("bookmarks", {}).get("lists", {}).get("parent_id")))
+        state = {}
+
+        sync(MagicMock(), {"max_workers": 4}, mock_catalog, state)
+
+        self.assertEqual(mock_lists.call_count, 10)
+        expected = []
+        for board_id in board_ids:
+            expected.extend([("state", board_id), ("lists", "list_" + board_id)])
+        self.assertEqual([entry for entry in written if entry[0] != "boards" and entry[1]], expected)
+
+
+def get_catalog(stream_names):
+    mock_catalog = MagicMock()
+    selected = []
+    for name in stream_names:
+        catalog_stream = MagicMock()
+        catalog_stream.stream = name
+        selected.append(catalog_stream)
+    mock_catalog.get_selected_streams.return_value = selected
+    mock_catalog.get_stream.return_value.metadata = []
+    return mock_catalog
+
+
+def fake_trello_request(method, url, **kwargs):
+    """
+    Response of a fake Trello API with boards and organizations, each with a child record
+    """
+    time.sleep(0.001)
+    path = "/" + urlparse(url).path[len("/1"):].lstrip("/")
+    if path == "/members/me":
+        body = {"id": "member_me"}
+    elif path == "/members/member_me/boards":
+        body = [{"id": "5f0c9a3b1d2e4f00123456{:02d}".format(index)} for index in range(5)]
+    elif path == "/members/me/organizations":
+        body = [{"id": "5a0c9a3b1d2e4f00123456{:02d}".format(index)} for index in range(5)]
+    else:
+        body = [{"id": "{}_child".format(path.split("/")[2])}]
+    return MagicMock(status_code=200, headers={}, json=MagicMock(return_value=body))
+
+
+class TestSyncPlan(unittest.TestCase):
+
+    def test_trees_built_from_parent_declarations(self):
+        plan = get_sync_plan(["card_attachments", "organization_members", "lists", "boards", "cards",
+                              "members", "organizations"])
+
+        self.assertEqual(format_sync_plan(plan, concurrent=True).splitlines(), [
+            "Sync plan, 2 tree(s) run concurrently:",
+            "  - boards",
+            "    - lists",
+            "    - cards",
+            "      - card_attachments",
+            "  - organizations",
+            "    - organization_members"])
+
+    @patch("singer.write_schema")
+    @patch("singer.write_record")
+    @patch("tap_trello.streams.boards.Boards.get_records")
+    def test_dry_run_syncs_nothing(self, mock_boards, mock_write_record, mock_write_schema):
+        client = MagicMock()
+
+        with self.assertLogs("root", level="INFO") as logs:
+            sync(client, {"dry_run": "true"}, get_catalog(["boards", "lists"]), {})
+
+        self.assertIn("INFO:root:Sync plan, 1 tree(s) run one after the other:\n  - boards\n    - lists", logs.output)
+        mock_boards.assert_not_called()
+        mock_write_record.assert_not_called()
+        mock_write_schema.assert_not_called()
+
+    @patch("singer.write_schema")
+    @patch("singer.write_state")
+    @patch("singer.write_record")
+    @patch("tap_trello.streams.organization_members.OrganizationMembers.get_parent_records")
+    @patch("tap_trello.streams.organizations.Organizations.get_parent_records")
+    @patch("tap_trello.streams.lists.Lists.get_records")
+    @patch("tap_trello.streams.boards.Boards.get_records")
+    def test_independent_trees_run_concurrently(self, mock_boards, mock_lists, mock_organizations,
+                                                mock_organization_members, mock_write_record,
+                                                mock_write_state, mock_write_schema):
+        both_started = threading.Barrier(2, timeout=5)
+
+        def list_boards(*args, **kwargs):
+            both_started.wait()
+            return iter([{"id": "5f0c9a3b1d2e4f0012345678"}])
+
+        def list_organizations(*args, **kwargs):
+            both_started.wait()
+            return iter([{"id": "5a0c9a3b1d2e4f0012345678"}])
+
+        mock_boards.side_effect = list_boards
+        mock_organizations.side_effect = list_organizations
+        mock_lists.side_effect = lambda format_values: iter([{"id": "list_1"}])
+        mock_organization_members.side_effect = lambda parent_obj: iter([{"id": "member_1"}])
+        state = {}
+
+        sync(MagicMock(), {"concurrent_stream_trees": True},
+             get_catalog(["boards", "lists", "organizations", "organization_members"]), state)
+
+        # Each tree waited for the other to start listing its root records
+        self.assertEqual([(c.args[0], c.args[1]["id"]) for c in mock_write_record.call_args_list],
+                         [("boards", "5f0c9a3b1d2e4f0012345678"), ("lists", "list_1")])
+        mock_organization_members.assert_called_once_with({"id": "5a0c9a3b1d2e4f0012345678"})
+        self.assertNotIn("currently_syncing", state)
+
+    @patch("singer.write_schema")
+    @patch("singer.write_state")
+    @patch("singer.write_record")
+    @patch("tap_trello.streams.organization_members.OrganizationMembers.get_parent_records")
+    @patch("tap_trello.streams.organizations.Organizations.get_parent_records")
+    @patch("tap_trello.streams.lists.Lists.get_records")
+    @patch("tap_trello.streams.boards.Boards.get_records")
+    def test_children_requested_outside_write_lock(self, mock_boards, mock_lists, mock_organizations,
+                                                   mock_organization_members, mock_write_record,
+                                                   mock_write_state, mock_write_schema):
+        both_requesting = threading.Barrier(2, timeout=5)
+
+        def list_lists(*args, **kwargs):
+            both_requesting.wait()
+            return iter([{"id": "list_1"}])
+
+        def list_organization_members(*args, **kwargs):
+            both_requesting.wait()
+            return iter([{"id": "member_1"}])
+
+        mock_boards.side_effect = lambda *args, **kwargs: iter([{"id": "5f0c9a3b1d2e4f0012345678"}])
+        mock_organizations.side_effect = lambda *args, **kwargs: iter([{"id": "5a0c9a3b1d2e4f0012345678"}])
+        mock_lists.side_effect = list_lists
+        mock_organization_members.side_effect = list_organization_members
+
+        # Without workers, the children are requested while their parent is written
+        sync(MagicMock(), {"concurrent_stream_trees": True, "max_workers": 1},
+             get_catalog(["boards", "lists", "organizations", "organization_members"]), {})
+
+        # Each tree waited for the other to request its children's records
+        self.assertIn(("lists", "list_1"), [(c.args[0], c.args[1]["id"]) for c in mock_write_record.call_args_list])
+        self.assertEqual(both_requesting.n_waiting, 0)
+        self.assertFalse(both_requesting.broken)
+
+    @patch("singer.write_schema")
+    @patch("singer.write_state")
+    @patch("singer.write_record")
+    @patch("tap_trello.client.session", side_effect=lambda: time.sleep(0.02) or requests.Session())
+    @patch("requests.Session.request", side_effect=fake_trello_request)
+    def test_trees_share_a_client(self, mock_request, mock_session, mock_write_record, mock_write_state,
+                                  mock_write_schema):
+        config = {"api_key": "key", "api_token": "token", "concurrent_stream_trees": True, "max_workers": 3}
+        catalog = get_catalog(["boards", "lists", "organizations", "organization_members"])
+
+        for _ in range(5):
+            mock_write_record.reset_mock()
+            client = Client(config)
+            # The boards tree requests the member id while the organizations tree waits for the only slot
+            client.throttle.concurrency = 1
+            errors = []
+
+            def run_sync():
+                try:
+                    sync(client, config, catalog, {})
+                except Exception as err: # pylint: disable=broad-except
+                    errors.append(err)
+
+            run = threading.Thread(target=run_sync, daemon=True)
+            run.start()
+            run.join(timeout=10)
+
+            self.assertFalse(run.is_alive(), "the trees deadlocked")
+            self.assertEqual(errors, [])
+            written = {c.args[0] for c in mock_write_record.call_args_list}
+            self.assertTrue({"boards", "lists"}.issubset(written))
+            self.assertEqual(len(client._sessions), len(set(client._sessions)))
+
+    @patch("singer.write_schema")
+    @patch("singer.write_state")
+    @patch("singer.write_record")
+    @patch("tap_trello.streams.organizations.Organizations.get_parent_records")
+    @patch("tap_trello.streams.boards.Boards.get_records")
+    def test_streams_without_children_requested_outside_write_lock(self, mock_boards, mock_organizations,
+                                                                   mock_write_record, mock_write_state,
+                                                                   mock_write_schema):
+        both_requesting = threading.Barrier(2, timeout=5)
+
+        def list_boards(*args, **kwargs):
+            both_requesting.wait()
+            return iter([{"id": "5f0c9a3b1d2e4f0012345678"}])
+
+        def list_organizations(*args, **kwargs):
+            both_requesting.wait()
+            return iter([{"id": "5a0c9a3b1d2e4f0012345678"}])
+
+        mock_boards.side_effect = list_boards
+        mock_organizations.side_effect = list_organizations
+
+        sync(MagicMock(), {"concurrent_stream_trees": True}, get_catalog(["boards", "organizations"]), {})
+
+        self.assertIn(("boards", "5f0c9a3b1d2e4f0012345678"),
+                      [(c.args[0], c.args[1]["id"]) for c in mock_write_record.call_args_list])
+        self.assertFalse(both_requesting.broken)
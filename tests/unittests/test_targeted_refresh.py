@@ -0,0 +1,110 @@
+import unittest
+from unittest.mock import patch, MagicMock
+
+from singer import utils
+
+from tap_trello.exceptions import TrelloNotFoundError
+from tap_trello.streams import Lists
+from tap_trello.sync import sync
+from tap_trello.targeted_refresh import TargetedRefresh
+
+CONFIG = {"start_date": "2020-01-01T00:00:00Z", "targeted_refresh": "true"}
+BOARD = {"id": "5a0c9a3b1d2e4f0012345678", "dateLastActivity": "2024-05-01T00:00:00.000Z"}
+ACTIONS = [{"id": "action_1", "date": "2024-05-01T00:00:00.000Z",
+            "data": {"board": {"id": BOARD["id"]}, "list": {"id": "list_1"}, "card": {"id": "card_1"}}},
+           {"id": "action_2", "date": "2024-04-30T00:00:00.000Z", "data": {"list": {"id": "list_2"}}}]
+
+
+def get_state(streams=("lists",), last_full_reconcile=None):
+    return {"bookmarks": {"boards": {"targeted_refresh_streams": list(streams),
+                                     "last_full_reconcile": last_full_reconcile or utils.strftime(utils.now())}}}
+
+
+class TestTargetedRefresh(unittest.TestCase):
+
+    def test_records_named_by_actions(self):
+        refresh = TargetedRefresh(get_state(), ["lists"])
+        refresh.start_board("board_1")
+        for action in ACTIONS:
+            refresh.add_action("board_1", action)
+
+        self.assertEqual(refresh.get_touched("board_1", "lists"), {"list_1", "list_2"})
+        # A board whose actions were not requested is listed entirely
+        self.assertIsNone(refresh.get_touched("board_2", "lists"))
+
+    def test_untracked_stream_listed(self):
+        refresh = TargetedRefresh(get_state(), ["lists", "cards"])
+        refresh.start_board("board_1")
+
+        self.assertIsNone(refresh.get_touched("board_1", "cards"))
+
+    def test_full_reconcile_when_due(self):
+        state = get_state(last_full_reconcile="2024-01-01T00:00:00.000000Z")
+        refresh = TargetedRefresh(state, ["lists"], reconcile_days=30)
+        refresh.start_board("board_1")
+
+        self.assertIsNone(refresh.get_touched("board_1", "lists"))
+        refresh.commit()
+        self.assertGreater(state["bookmarks"]["boards"]["last_full_reconcile"], "2024-01-01")
+
+    def test_deleted_and_moved_records_left_out(self):
+        client = MagicMock()
+        client.get.side_effect = [TrelloNotFoundError("gone"), {"id": "list_2", "idBoard": "board_2"},
+                                  {"id": "list_3", "idBoard": "board_1"}]
+        stream = Lists(client, CONFIG, {})
+        stream.targeted_refresh = TargetedRefresh(get_state(), ["lists"])
+        stream.targeted_refresh.start_board("board_1")
+        for list_id in ("list_1", "list_2", "list_3"):
+            stream.targeted_refresh.add_action("board_1", {"data": {"list": {"id": list_id}}})
+
+        self.assertEqual(list(stream.get_parent_records("board_1")), [{"id": "list_3", "idBoard": "board_1"}])
+        self.assertEqual([c.args[0] for c in client.get.call_args_list], ["/lists/list_1", "/lists/list_2", "/lists/list_3"])
+
+
+@patch("singer.write_schema")
+@patch("singer.write_state")
+@patch("singer.write_record")
+@patch("tap_trello.streams.abstracts.DateWindowPaginated.get_records")
+@patch("tap_trello.streams.lists.Lists.get_records")
+@patch("tap_trello.streams.boards.Boards.get_records")
+class TestTargetedRefreshSync(unittest.TestCase):
+
+    def run_sync(self, mock_boards, mock_list_board, mock_actions, state, config=CONFIG):
+        mock_boards.return_value = iter([BOARD])
+        mock_actions.side_effect = lambda format_values: iter(ACTIONS)
+        mock_list_board.side_effect = lambda format_values: iter([{"id": "list_0"}])
+        catalog = MagicMock()
+        catalog.get_selected_streams.return_value = [MagicMock(stream=name) for name in ("boards", "lists", "actions")]
+        catalog.get_stream.return_value.metadata = []
+        client = MagicMock()
+        client.get.side_effect = lambda path, params=None: {"id": path.split("/")[-1]}
+        sync(client, config, catalog, state)
+        return client
+
+    def test_lists_named_by_actions_refreshed(self, mock_boards, mock_list_board, mock_actions, mock_write_record, *mocks):
+        state = get_state()
+
+        client = self.run_sync(mock_boards, mock_list_board, mock_actions, state)
+
+        mock_list_board.assert_not_called()
+        self.assertEqual([c.args[0] for c in client.get.call_args_list], ["/lists/list_1", "/lists/list_2"])
+        written = [(c.args[0], c.args[1]["id"]) for c in mock_write_record.call_args_list]
+        # The board's actions are written before the lists they name
+        self.assertEqual(written, [("boards", BOARD["id"]), ("actions", "action_1"), ("actions", "action_2"),
+                                   ("lists", "list_1"), ("lists", "list_2")])
+
+    def test_first_sync_lists_boards(self, mock_boards, mock_list_board, mock_actions, *mocks):
+        state = {}
+
+        client = self.run_sync(mock_boards, mock_list_board, mock_actions, state)
+
+        mock_list_board.assert_called_once()
+        client.get.assert_not_called()
+        self.assertEqual(state["bookmarks"]["boards"]["targeted_refresh_streams"], ["lists"])
+        self.assertIn("last_full_reconcile", state["bookmarks"]["boards"])
+
+    def test_concurrent_parents_wait_for_actions(self, mock_boards, mock_list_board, mock_actions, *mocks):
+        client = self.run_sync(mock_boards, mock_list_board, mock_actions, get_state(), {**CONFIG, "max_workers": 4})
+
+        mock_list_board.assert_not_called()
+        self.assertEqual(len(client.get.call_args_list), 2)